@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import League, Bet, UserBet, LeagueInvite, LeagueEvent
+from .models import League, Bet, UserBet, LeagueInvite, LeagueEvent, OddsApiQuota
 
 class LeagueAdmin(admin.ModelAdmin):
     list_display = ('name', 'sports', 'captain', 'created_at')
@@ -21,8 +21,13 @@ class LeagueEventAdmin(admin.ModelAdmin):
     search_fields = ('event_name', 'league__name')
     list_filter = ('sport',)
 
+class OddsApiQuotaAdmin(admin.ModelAdmin):
+    list_display = ('requests_remaining', 'requests_used', 'last_request_cost', 'updated_at')
+    readonly_fields = ('requests_remaining', 'requests_used', 'last_request_cost', 'updated_at')
+
 admin.site.register(League, LeagueAdmin)
 admin.site.register(Bet, BetAdmin)
 admin.site.register(UserBet, UserBetAdmin)
 admin.site.register(LeagueInvite)
-admin.site.register(LeagueEvent, LeagueEventAdmin) 
\ No newline at end of file
+admin.site.register(LeagueEvent, LeagueEventAdmin)
+admin.site.register(OddsApiQuota, OddsApiQuotaAdmin)
@@ -0,0 +1,64 @@
+"""
+Set-based writes for settlement and the money ledger.
+
+Large payouts touch thousands of rows. These helpers keep that to a bounded
+number of statements: lists are cut into batches of BATCH_SIZE, and per-row
+increments become one UPDATE per batch with a CASE branch per distinct amount.
+"""
+from django.db.models import Case, F, Value, When
+
+# Rows per UPDATE / INSERT
+BATCH_SIZE = 1000
+
+
+def batches(items, size=None):
+    """Split a list into consecutive lists of at most size (BATCH_SIZE) items"""
+    size = size or BATCH_SIZE
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def increment(queryset, field, amounts, output_field, key='id'):
+    """
+    Add a per-row amount to a numeric field with atomic F() updates
+
+    Rows owed the same amount share one CASE branch, so the common case of equal
+    stakes and odds is a single short UPDATE per batch.
+
+    Parameters:
+    queryset (QuerySet): Rows that may be updated
+    field (str): Field to increment
+    amounts (dict): Value of key -> amount to add
+    output_field (Field): Type of the amounts
+    key (str): Field identifying each row
+
+    Returns:
+    int: Rows updated
+    """
+    updated = 0
+    for batch in batches(list(amounts.items())):
+        change = per_row(dict(batch), output_field, key)
+        updated += queryset.filter(**{f'{key}__in': [row_key for row_key, _ in batch]}).update(**{field: F(field) + change})
+    return updated
+
+
+def per_row(values, output_field, key='id', default=0):
+    """
+    A CASE expression giving each row its own value, one branch per distinct value
+
+    Parameters:
+    values (dict): Value of key -> value for that row
+    output_field (Field): Type of the values
+    key (str): Field identifying each row
+    default: Value for rows not in values
+
+    Returns:
+    Case: The expression
+    """
+    by_value = {}
+    for row_key, value in values.items():
+        by_value.setdefault(value, []).append(row_key)
+    return Case(
+        *[When(**{f'{key}__in': row_keys}, then=Value(value)) for value, row_keys in by_value.items()],
+        default=Value(default),
+        output_field=output_field,
+    )
@@ -0,0 +1,144 @@
+"""
+Streaming CSV and NDJSON exports.
+
+Exports read their rows through server-side cursors (QuerySet.iterator) and
+write them out as they arrive with StreamingHttpResponse, so a multi-year
+history streams in constant memory instead of being built up as one response.
+"""
+import csv
+import itertools
+import json
+
+from django.conf import settings
+from django.db.models import CharField, F, FloatField, IntegerField, Q, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.http import StreamingHttpResponse
+
+from . import history
+from .models import UserBet, Wager
+
+# Rows fetched from the database at a time
+EXPORT_CHUNK_SIZE = getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+HISTORY_COLUMNS = ['id', 'date', 'event', 'pick', 'amount', 'result', 'payout', 'league_id', 'event_id']
+
+LEAGUE_WAGER_COLUMNS = [
+    'wager_id', 'source', 'event_id', 'event_name', 'commence_time', 'user_id', 'username', 'kind', 'circuit_id',
+    'outcome', 'amount', 'odds', 'weight', 'result', 'payout', 'points_earned', 'placed_at',
+]
+
+
+class _Echo:
+    """A file-like object whose write() hands back what it was given, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def bet_history_rows(user, **filters):
+    """
+    Every entry of a user's bet history, newest first
+
+    Keys come from one UNION query through a server-side cursor, and each chunk
+    of keys is loaded by primary key as it is reached.
+
+    Parameters:
+    user (User): Whose history
+    filters: league_id, result, since and until, as for history.bet_history_page()
+
+    Yields:
+    dict: History entries
+    """
+    keys = history.history_keys(user, **filters).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    while True:
+        chunk = list(itertools.islice(keys, EXPORT_CHUNK_SIZE))
+        if not chunk:
+            return
+        yield from history.entries(chunk)
+
+
+def league_wager_rows(league):
+    """
+    Every bet placed in a league, by event then in the order placed
+
+    The league's Wager rows and its UserBets (bets posted to the league, and
+    bets placed through the league's events) are read by one UNION query, as
+    for history.history_keys(). UserBets have no odds or payout, and their
+    amount is the points wagered.
+
+    Parameters:
+    league (League): The league
+
+    Yields:
+    dict: One row per bet, with LEAGUE_WAGER_COLUMNS
+    """
+    wagers = _export_columns(
+        Wager.objects.filter(league_event__league=league),
+        wager_id=F('id'), source=Value(history.WAGER), event_id=F('league_event_id'),
+        event_name=F('league_event__event_name'), commence_time=F('league_event__commence_time'),
+        user_id=F('user_id'), username=F('user__username'), kind=F('kind'), circuit_id=F('circuit_id'),
+        outcome=F('outcome'), amount=F('amount'), odds=F('odds'), weight=F('weight'), result=F('result'),
+        payout=F('payout'), points_earned=F('points_earned'), placed_at=F('placed_at'),
+    )
+    user_bets = _export_columns(
+        UserBet.objects.filter(Q(bet__league=league) | Q(league_event__league=league)),
+        wager_id=F('id'), source=Value(history.USER_BET), event_id=F('league_event_id'),
+        event_name=Coalesce('league_event__event_name', 'bet__name'), commence_time=F('league_event__commence_time'),
+        user_id=F('user_id'), username=F('user__username'), kind=Value(None, CharField()),
+        circuit_id=Value(None, IntegerField()),
+        outcome=Coalesce(NullIf('choice', Value('')), Cast('numeric_choice', CharField())),
+        amount=Cast('points_wagered', Wager._meta.get_field('amount')), odds=Value(None, FloatField()),
+        weight=Value(None, IntegerField()), result=F('result'), payout=Value(None, Wager._meta.get_field('payout')),
+        points_earned=F('points_earned'), placed_at=F('created_at'),
+    )
+    rows = wagers.union(user_bets, all=True).order_by('export_event_id', 'export_placed_at', 'export_source', 'export_wager_id')
+    for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield dict(zip(LEAGUE_WAGER_COLUMNS, row))
+
+
+def _export_columns(queryset, **columns):
+    """A queryset's rows as LEAGUE_WAGER_COLUMNS, named apart from its model's fields"""
+    return queryset.order_by().annotate(
+        **{f'export_{name}': columns[name] for name in LEAGUE_WAGER_COLUMNS}
+    ).values_list(*[f'export_{name}' for name in LEAGUE_WAGER_COLUMNS])
+
+
+def _text(value):
+    """Times as ISO 8601, and Decimals and anything else as their string"""
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+def _csv_lines(rows, columns):
+    writer = csv.DictWriter(_Echo(), fieldnames=columns, extrasaction='ignore')
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow({key: _text(value) if value is not None else None for key, value in row.items()})
+
+
+def _ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, default=_text) + '\n'
+
+
+def streaming_export(rows, columns, export_format, filename):
+    """
+    A response streaming rows as CSV or NDJSON
+
+    Parameters:
+    rows (iterable): Row dicts, produced lazily
+    columns (list): CSV columns, in order
+    export_format (str): 'csv' or 'ndjson'
+    filename (str): Download name, without the extension
+
+    Returns:
+    StreamingHttpResponse: The download
+    """
+    lines = _csv_lines(rows, columns) if export_format == 'csv' else _ndjson_lines(rows)
+    response = StreamingHttpResponse(lines, content_type=FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
@@ -0,0 +1,211 @@
+"""
+Users' bet history, a page at a time.
+
+A user's history is their wagers on league events and their UserBets, newest
+first. Both are read by a single UNION query ordered by (time placed, source,
+id) that returns one page of keys, and the page's rows are then loaded by
+primary key. Pages continue from an opaque cursor holding the last key served
+rather than an offset, so every page costs the same however far back it is and
+however many bets the user has made.
+"""
+import base64
+import binascii
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Q, Value
+from django.utils.dateparse import parse_datetime
+
+from .models import UserBet, Wager
+
+PAGE_SIZE = getattr(settings, 'BET_HISTORY_PAGE_SIZE', 50)
+MAX_PAGE_SIZE = getattr(settings, 'BET_HISTORY_MAX_PAGE_SIZE', 200)
+
+# Sources of history entries, as they sort within one instant
+WAGER = 'wager'
+USER_BET = 'userbet'
+
+RESULTS = ('won', 'lost', 'push', 'pending')
+
+
+class InvalidCursor(ValueError):
+    """A cursor that did not come from a previous page"""
+
+
+def encode_cursor(placed_at, source, bet_id):
+    """An opaque cursor for continuing after an entry"""
+    raw = f'{placed_at.isoformat()}|{source}|{bet_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    The entry key inside a cursor
+
+    Raises:
+    InvalidCursor: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        placed, source, bet_id = raw.split('|')
+        placed_at = parse_datetime(placed)
+        if placed_at is None or source not in (WAGER, USER_BET):
+            raise ValueError(raw)
+        return placed_at, source, int(bet_id)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise InvalidCursor(f'Invalid cursor: {cursor}')
+
+
+def _wagers(user, league_id=None, result=None, since=None, until=None):
+    """A user's league event wagers that belong in their history"""
+    wagers = Wager.objects.filter(user=user, kind=Wager.USER).filter(
+        Q(league_event__completed=True) | ~Q(result='pending')
+    )
+    if league_id is not None:
+        wagers = wagers.filter(league_event__league_id=league_id)
+    if result == 'pending':
+        # Shown as pending until the event is completed
+        wagers = wagers.filter(Q(league_event__completed=False) | Q(result='pending'))
+    elif result:
+        wagers = wagers.filter(league_event__completed=True, result__iexact=result)
+    if since:
+        wagers = wagers.filter(placed_at__gte=since)
+    if until:
+        wagers = wagers.filter(placed_at__lt=until)
+    return wagers
+
+
+def _user_bets(user, league_id=None, result=None, since=None, until=None):
+    """A user's UserBets, filtered like _wagers()"""
+    user_bets = UserBet.objects.filter(user=user)
+    if league_id is not None:
+        user_bets = user_bets.filter(bet__league_id=league_id)
+    if result:
+        user_bets = user_bets.filter(result__iexact=result)
+    if since:
+        user_bets = user_bets.filter(created_at__gte=since)
+    if until:
+        user_bets = user_bets.filter(created_at__lt=until)
+    return user_bets
+
+
+def bet_history_page(user, cursor=None, limit=None, league_id=None, result=None, since=None, until=None):
+    """
+    One page of a user's bet history, newest first
+
+    Parameters:
+    user (User): Whose history
+    cursor (str): next_cursor from the previous page; None for the first page
+    limit (int): Entries per page, at most MAX_PAGE_SIZE (default PAGE_SIZE)
+    league_id (int): Only bets in this league
+    result (str): Only bets with this result: won, lost, push or pending
+    since (datetime): Only bets placed at or after this time
+    until (datetime): Only bets placed before this time
+
+    Returns:
+    dict: 'results' (history entries) and 'next_cursor' (None on the last page)
+
+    Raises:
+    InvalidCursor: If cursor is malformed
+    """
+    limit = max(1, min(limit or PAGE_SIZE, MAX_PAGE_SIZE))
+    after = decode_cursor(cursor) if cursor else None
+    filters = {'league_id': league_id, 'result': result, 'since': since, 'until': until}
+
+    keys = list(history_keys(user, after=after, per_branch=limit + 1, **filters)[:limit + 1])
+    more = len(keys) > limit
+    keys = keys[:limit]
+    return {
+        'results': entries(keys),
+        'next_cursor': encode_cursor(*keys[-1]) if more else None,
+    }
+
+
+def history_keys(user, after=None, per_branch=None, **filters):
+    """
+    The keys of a user's history entries, newest first, as one UNION query
+
+    Parameters:
+    user (User): Whose history
+    after (tuple): Only keys after this (placed, source, id) key
+    per_branch (int): Read at most this many keys from each table, where the
+    database allows it
+    filters: league_id, result, since and until, as for bet_history_page()
+
+    Returns:
+    QuerySet: (placed, source, id) tuples
+    """
+    branches = []
+    for source, queryset, placed in (
+        (WAGER, _wagers(user, **filters), 'placed_at'),
+        (USER_BET, _user_bets(user, **filters), 'created_at'),
+    ):
+        if after:
+            # Keys after the cursor in (placed, source, id) descending order
+            placed_at, after_source, after_id = after
+            later = Q(**{f'{placed}__lt': placed_at})
+            if source < after_source:
+                later |= Q(**{placed: placed_at})
+            elif source == after_source:
+                later |= Q(**{placed: placed_at, 'id__lt': after_id})
+            queryset = queryset.filter(later)
+        keys = queryset.annotate(placed=F(placed), source=Value(source)).values_list('placed', 'source', 'id')
+        if per_branch and connection.features.supports_slicing_ordering_in_compound:
+            # Each side stops after a page, using the (user, time) indexes
+            keys = keys.order_by(f'-{placed}', '-id')[:per_branch]
+        branches.append(keys)
+    return branches[0].union(branches[1], all=True).order_by('-placed', '-source', '-id')
+
+
+def entries(keys):
+    """
+    History entries for a list of keys, in the same order
+
+    Parameters:
+    keys (list): (placed, source, id) tuples from history_keys()
+
+    Returns:
+    list: The entries
+    """
+    wagers = Wager.objects.select_related('league_event').in_bulk(
+        [bet_id for _, source, bet_id in keys if source == WAGER]
+    )
+    user_bets = UserBet.objects.select_related('bet', 'league_event').in_bulk(
+        [bet_id for _, source, bet_id in keys if source == USER_BET]
+    )
+    return [
+        wager_entry(wagers[bet_id]) if source == WAGER else user_bet_entry(user_bets[bet_id])
+        for _, source, bet_id in keys
+    ]
+
+
+def wager_entry(bet):
+    """A bet history entry for a user's bet on a league event"""
+    event = bet.league_event
+    won = event.completed and bet.result.lower() == 'won'
+    return {
+        'id': f"{event.id}_{bet.user_id}",
+        'date': bet.placed_at.isoformat(),
+        'event': event.event_name or f"{event.home_team} vs {event.away_team}",
+        'pick': bet.outcome or 'Unknown',
+        'amount': float(bet.amount),
+        'result': bet.result if event.completed and bet.result != 'pending' else 'Pending',
+        'payout': float(bet.payout) if won else 0,
+        'league_id': event.league_id,
+        'event_id': event.id
+    }
+
+
+def user_bet_entry(bet):
+    """A bet history entry for a UserBet"""
+    return {
+        'id': f"userbet_{bet.id}",
+        'date': bet.created_at.strftime('%Y-%m-%d'),
+        'event': bet.bet.name if bet.bet else 'Unknown Event',
+        'pick': bet.choice,
+        'amount': bet.points_wagered,
+        'result': bet.result.capitalize() if bet.result else 'Pending',
+        'payout': bet.points_earned if bet.result == 'won' else 0,
+        'league_id': bet.bet.league_id if bet.bet else None,
+        'event_id': bet.league_event_id
+    }
@@ -0,0 +1,202 @@
+"""
+Durable background jobs stored in the database.
+
+Views enqueue() long writes such as settling an event and answer 202 with the
+job's ID. `manage.py run_workers` claims jobs with SELECT ... FOR UPDATE SKIP
+LOCKED, so any number of workers share the table without a broker, and runs the
+handler registered for each job's kind. A claimed job is invisible to other
+workers until its visibility timeout passes; report_progress() extends it.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+
+
+class JobFailed(Exception):
+    """Raised by a handler to fail its job without retrying, e.g. for invalid input"""
+
+
+def handler(kind):
+    """
+    Register a function as the handler for a kind of job
+
+    The function is called with the claimed Job and returns a JSON-serialisable
+    result, which is stored on the job. Any exception other than JobFailed is
+    retried with backoff until the job runs out of attempts.
+
+    Parameters:
+    kind (str): Job kind, as passed to enqueue()
+
+    Returns:
+    function: The decorator
+    """
+    def register(func):
+        _handlers[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, payload, user=None, key='', max_attempts=None):
+    """
+    Queue a job for the workers
+
+    Parameters:
+    kind (str): Registered handler to run
+    payload (dict): Arguments for the handler
+    user (User): Who asked for the work; only they can read its progress
+    key (str): Identifies duplicate work. While a job with the same kind and key
+        is queued or running, that job is returned instead of a new one.
+    max_attempts (int): Attempts before giving up, default JOBS_MAX_ATTEMPTS
+
+    Returns:
+    Job: The queued (or already active) job
+    """
+    with transaction.atomic():
+        if key:
+            active = Job.objects.select_for_update().filter(
+                kind=kind, key=key, status__in=[Job.QUEUED, Job.RUNNING]
+            ).first()
+            if active:
+                logger.info(f"Job {active.id} {kind} {key} already {active.status}, not queueing another")
+                return active
+        job = Job.objects.create(
+            kind=kind,
+            key=key,
+            payload=payload,
+            created_by=user,
+            max_attempts=max_attempts or getattr(settings, 'JOBS_MAX_ATTEMPTS', 5),
+        )
+    logger.info(f"Queued job {job.id} {kind} {key}")
+    return job
+
+
+def visibility_timeout():
+    """How long a claimed job stays invisible to other workers without a progress report"""
+    return timedelta(seconds=getattr(settings, 'JOBS_VISIBILITY_TIMEOUT_SECONDS', 300))
+
+
+def retry_delay(attempts):
+    """Backoff before retrying a job that has failed `attempts` times"""
+    base = getattr(settings, 'JOBS_RETRY_BACKOFF_SECONDS', 10)
+    cap = getattr(settings, 'JOBS_MAX_RETRY_BACKOFF_SECONDS', 600)
+    return timedelta(seconds=min(base * (2 ** max(attempts - 1, 0)), cap))
+
+
+def claim(worker_id):
+    """
+    Take the next runnable job: a queued job that is due, or a running job whose
+    worker let its visibility timeout pass
+
+    Parameters:
+    worker_id (str): Recorded as locked_by
+
+    Returns:
+    Job: The claimed job, or None if there is nothing to do
+    """
+    while True:
+        now = timezone.now()
+        with transaction.atomic():
+            job = Job.objects.select_for_update(skip_locked=True).filter(
+                Q(status=Job.QUEUED, run_after__lte=now) | Q(status=Job.RUNNING, locked_until__lt=now)
+            ).order_by('run_after', 'id').first()
+            if job is None:
+                return None
+
+            if job.status == Job.RUNNING:
+                logger.warning(f"Job {job.id} {job.kind} timed out on {job.locked_by} (attempt {job.attempts})")
+                if job.attempts >= job.max_attempts:
+                    _finish(job, Job.FAILED, error=f"Timed out on attempt {job.attempts} of {job.max_attempts}")
+                    continue
+
+            job.status = Job.RUNNING
+            job.attempts += 1
+            job.locked_by = worker_id
+            job.locked_until = now + visibility_timeout()
+            job.save(update_fields=['status', 'attempts', 'locked_by', 'locked_until', 'updated_at'])
+            return job
+
+
+def report_progress(job, progress, total=None):
+    """
+    Record how far a running job has got, and extend its visibility timeout
+
+    Call this outside any transaction the handler holds, or the update is not
+    visible until that transaction commits.
+
+    Parameters:
+    job (Job): The job being run
+    progress (int): Units of work done
+    total (int): Units of work in all, if known
+    """
+    job.progress = progress
+    if total is not None:
+        job.total = total
+    job.locked_until = timezone.now() + visibility_timeout()
+    Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+        progress=job.progress, total=job.total, locked_until=job.locked_until, updated_at=timezone.now()
+    )
+
+
+def run(job):
+    """
+    Run a claimed job's handler and record the outcome
+
+    Parameters:
+    job (Job): A job returned by claim()
+
+    Returns:
+    str: The job's status afterwards
+    """
+    func = _handlers.get(job.kind)
+    if func is None:
+        _finish(job, Job.FAILED, error=f"No handler registered for job kind '{job.kind}'")
+        return job.status
+
+    started = timezone.now()
+    try:
+        result = func(job)
+    except JobFailed as e:
+        logger.warning(f"Job {job.id} {job.kind} failed: {e}")
+        _finish(job, Job.FAILED, error=str(e))
+    except Exception as e:
+        logger.error(f"Job {job.id} {job.kind} attempt {job.attempts} raised: {e}", exc_info=True)
+        if job.attempts >= job.max_attempts:
+            _finish(job, Job.FAILED, error=str(e))
+        else:
+            delay = retry_delay(job.attempts)
+            updated = Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+                status=Job.QUEUED, run_after=timezone.now() + delay, locked_by='', locked_until=None,
+                error=str(e), updated_at=timezone.now(),
+            )
+            if updated:
+                job.status = Job.QUEUED
+            logger.info(f"Job {job.id} will be retried in {delay}")
+    else:
+        _finish(job, Job.SUCCEEDED, result=result)
+        logger.info(f"Job {job.id} {job.kind} succeeded in {(timezone.now() - started).total_seconds():.2f}s")
+    return job.status
+
+
+def _finish(job, status, result=None, error=''):
+    """Mark a job done, unless another worker has since reclaimed it"""
+    now = timezone.now()
+    fields = {'status': status, 'error': error, 'locked_until': None, 'finished_at': now, 'updated_at': now}
+    if status == Job.SUCCEEDED:
+        fields['result'] = result
+        if job.total is not None:
+            fields['progress'] = job.total
+    if Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(**fields):
+        for name, value in fields.items():
+            setattr(job, name, value)
+    else:
+        logger.warning(f"Job {job.id} was reclaimed by another worker, discarding this attempt's outcome")
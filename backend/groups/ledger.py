@@ -0,0 +1,174 @@
+"""
+Append-only money ledger.
+
+Every change to User.money is a LedgerEntry written in the same transaction as
+an atomic F() update of the balance, so concurrent payouts and stakes never
+overwrite each other and every balance is explained by its entries. Payouts for
+many users are one bulk INSERT plus one UPDATE per batch.
+
+`manage.py snapshot_balances` periodically records each user's balance with the
+last entry it includes. A balance at any past time is then the nearest snapshot
+adjusted by the entries between it and that time, never the whole history.
+"""
+import logging
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, F, Max, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from users.models import User
+from .bulk import BATCH_SIZE, increment
+from .models import BalanceSnapshot, LedgerEntry
+
+logger = logging.getLogger(__name__)
+
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+
+
+def _money(amount):
+    return Decimal(str(amount)).quantize(Decimal('0.01'))
+
+
+def record(entries):
+    """
+    Apply a batch of signed money movements
+
+    Inserts the entries in bulk and adds each user's total to User.money with
+    F() increments, in one transaction (joining the caller's, if any).
+
+    Parameters:
+    entries (list): Unsaved LedgerEntry objects
+
+    Returns:
+    list: The saved entries; entries for no money are left out
+    """
+    totals = {}
+    for entry in entries:
+        entry.amount = _money(entry.amount)
+    entries = [entry for entry in entries if entry.amount]
+    for entry in entries:
+        totals[entry.user_id] = totals.get(entry.user_id, Decimal('0')) + entry.amount
+    totals = {user_id: amount for user_id, amount in totals.items() if amount}
+    if not entries:
+        return []
+
+    with transaction.atomic():
+        saved = LedgerEntry.objects.bulk_create(entries, batch_size=BATCH_SIZE)
+        increment(User.objects, 'money', totals, MONEY)
+    return saved
+
+
+def credit(user, amount, reason, reference=''):
+    """
+    Add money to a user's balance (a negative amount takes it away unconditionally)
+
+    Parameters:
+    user (User): Whose balance
+    amount (Decimal): Amount to add
+    reason (str): A LedgerEntry reason
+    reference (str): What it was for, e.g. 'circuit:3'
+
+    Returns:
+    LedgerEntry: The entry, or None for an amount of zero
+    """
+    saved = record([LedgerEntry(user_id=user.pk, amount=amount, reason=reason, reference=reference)])
+    user.money = User.objects.values_list('money', flat=True).get(pk=user.pk)
+    return saved[0] if saved else None
+
+
+def debit(user, amount, reason, reference=''):
+    """
+    Take money from a user's balance if they have enough
+
+    The funds check and the deduction are one conditional UPDATE, so two
+    concurrent stakes cannot both spend the same money.
+
+    Parameters:
+    user (User): Whose balance
+    amount (Decimal): Amount to take, positive
+    reason (str): A LedgerEntry reason
+    reference (str): What it was for, e.g. 'league_event:12'
+
+    Returns:
+    LedgerEntry: The entry, or None if the balance was too low
+    """
+    amount = _money(amount)
+    with transaction.atomic():
+        if not User.objects.filter(pk=user.pk, money__gte=amount).update(money=F('money') - amount):
+            return None
+        entry = LedgerEntry.objects.create(user_id=user.pk, amount=-amount, reason=reason, reference=reference)
+    user.money = User.objects.values_list('money', flat=True).get(pk=user.pk)
+    return entry
+
+
+def balance_at(user, when):
+    """
+    A user's balance at a point in time
+
+    Uses the latest snapshot at or before `when` plus the entries made after it
+    up to `when`. Before the user's first snapshot it works back from the
+    earliest snapshot instead, or from the current balance if there is none yet.
+    Times before the ledger began give the balance it started with.
+
+    Parameters:
+    user (User): Whose balance
+    when (datetime): The time
+
+    Returns:
+    Decimal: The balance
+    """
+    if user.date_joined and when < user.date_joined:
+        return Decimal('0.00')
+    entries = LedgerEntry.objects.filter(user=user)
+    total = Coalesce(Sum('amount'), Decimal('0'), output_field=MONEY)
+
+    before = BalanceSnapshot.objects.filter(user=user, taken_at__lte=when).order_by('-taken_at', '-id').first()
+    if before:
+        since = entries.filter(id__gt=before.last_entry_id, created_at__lte=when).aggregate(total=total)['total']
+        return before.balance + since
+
+    after = BalanceSnapshot.objects.filter(user=user, taken_at__gt=when).order_by('taken_at', 'id').first()
+    if after:
+        until = entries.filter(id__lte=after.last_entry_id, created_at__gt=when).aggregate(total=total)['total']
+        return after.balance - until
+
+    current = User.objects.values_list('money', flat=True).get(pk=user.pk)
+    return current - entries.filter(created_at__gt=when).aggregate(total=total)['total']
+
+
+def snapshot_balances(user_ids=None):
+    """
+    Record every user's current balance with the last ledger entry it includes
+
+    Each batch reads balances and last entries in one statement, so they agree.
+
+    Parameters:
+    user_ids (list): Only these users
+
+    Returns:
+    int: Snapshots taken
+    """
+    users = User.objects.order_by('id')
+    if user_ids is not None:
+        users = users.filter(id__in=user_ids)
+    taken = 0
+    last_id = 0
+    while True:
+        now = timezone.now()
+        rows = list(
+            users.filter(id__gt=last_id)
+            .annotate(last_entry=Coalesce(Max('ledger_entries__id'), 0))
+            .values_list('id', 'money', 'last_entry')[:BATCH_SIZE]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        BalanceSnapshot.objects.bulk_create([
+            BalanceSnapshot(user_id=user_id, balance=money, last_entry_id=last_entry, taken_at=now)
+            for user_id, money, last_entry in rows
+        ])
+        taken += len(rows)
+    logger.info(f"Took {taken} balance snapshots")
+    return taken
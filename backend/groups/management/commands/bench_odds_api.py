@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from concurrent.futures import ThreadPoolExecutor
+from groups.odds import get_odds_client, get_pool_stats, single_flight
+from groups.odds_cache import odds_cache
+from groups.odds_quota import quota
+import json
+import time
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = 'Load-tests OddsApiClient (run against fake_odds_api) and reports latency, cache and pool statistics'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sports', default='basketball_nba,americanfootball_nfl', help='Comma separated sport keys')
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=200, help='Total get_sport_events calls')
+
+    def handle(self, *args, **options):
+        client = get_odds_client()
+        sports = [key.strip() for key in options['sports'].split(',') if key.strip()]
+        latencies = []
+        errors = 0
+
+        def call(i):
+            started = time.monotonic()
+            try:
+                client.get_sport_events(sports[i % len(sports)])
+                return time.monotonic() - started, None
+            except Exception as e:
+                return time.monotonic() - started, e
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            for elapsed, error in pool.map(call, range(options['requests'])):
+                latencies.append(elapsed * 1000)
+                errors += error is not None
+        wall = time.monotonic() - started
+
+        report = {
+            'requests': options['requests'],
+            'errors': errors,
+            'wall_seconds': round(wall, 3),
+            'throughput_per_second': round(options['requests'] / wall, 1) if wall else None,
+            'latency_ms': {
+                'p50': round(percentile(latencies, 50), 2),
+                'p95': round(percentile(latencies, 95), 2),
+                'p99': round(percentile(latencies, 99), 2),
+                'max': round(max(latencies), 2),
+            },
+            'pool': get_pool_stats(),
+            'cache': odds_cache.stats(),
+            'coalescing': single_flight.stats(),
+            'quota': quota.stats(),
+        }
+        self.stdout.write(json.dumps(report, indent=2, default=str))
@@ -0,0 +1,99 @@
+from django.core.management.base import BaseCommand
+from groups.odds_fixtures import FakeOddsApi, make_server, synthetic_events, SYNTHETIC_SPORTS
+from groups.odds_stream import iter_events
+import json
+import requests
+import statistics
+import threading
+import time
+import tracemalloc
+
+
+class StaticPayloadApi(FakeOddsApi):
+    """Serves one pre-built body, so the server allocates nothing while parsers are measured"""
+
+    def __init__(self, body):
+        super().__init__()
+        self.body = body
+
+    def _fixture(self, path):
+        return self.body
+
+
+def parse_buffered(response):
+    """The previous path: load the whole body, then copy every event"""
+    return [
+        {
+            'id': event['id'],
+            'sport_key': event['sport_key'],
+            'sport_title': event['sport_key'],
+            'commence_time': event['commence_time'],
+            'home_team': event['home_team'],
+            'away_team': event['away_team'],
+            'event_name': f"{event['away_team']} @ {event['home_team']}",
+            'bookmakers': event['bookmakers'],
+        }
+        for event in response.json()
+    ]
+
+
+def parse_streamed(response):
+    return list(iter_events(response))
+
+
+def count_streamed(response):
+    """Streams without keeping events, as the upcoming-feed search does"""
+    return sum(1 for _ in iter_events(response))
+
+
+class Command(BaseCommand):
+    help = 'Compares memory and latency of buffered and streamed parsing of a large Odds API payload'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=200, help='Events per sport in the upcoming feed')
+        parser.add_argument('--bookmakers', type=int, default=40, help='Bookmakers per event')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per parser')
+
+    def handle(self, *args, **options):
+        events = []
+        for sport in SYNTHETIC_SPORTS:
+            events.extend(synthetic_events(sport['key'], options['events'], options['bookmakers']))
+        body = json.dumps(events).encode()
+        del events
+
+        server = make_server(StaticPayloadApi(body), port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f'http://127.0.0.1:{server.server_address[1]}/v4/sports/upcoming/odds'
+        session = requests.Session()
+
+        def run(parser):
+            with session.get(url, stream=True, timeout=30) as response:
+                response.raise_for_status()
+                return parser(response)
+
+        report = {'payload_bytes': len(body), 'events': len(SYNTHETIC_SPORTS) * options['events']}
+        try:
+            for name, parser in (('buffered', parse_buffered), ('streamed', parse_streamed), ('streamed_search', count_streamed)):
+                run(parser)  # Warm the connection
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    run(parser)
+                    timings.append((time.perf_counter() - started) * 1000)
+
+                tracemalloc.start()
+                result = run(parser)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                del result
+
+                report[name] = {
+                    'latency_ms_median': round(statistics.median(timings), 1),
+                    'latency_ms_max': round(max(timings), 1),
+                    'peak_memory_mb': round(peak / (1024 * 1024), 2),
+                }
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from groups.odds_fixtures import FakeOddsApi, make_server
+
+
+class Command(BaseCommand):
+    help = 'Runs a local stand-in for the Odds API that replays recorded fixtures'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--fixtures', default=None,
+                            help='Fixture directory to replay (defaults to ODDS_API_FIXTURE_DIR); anything missing is synthesised')
+        parser.add_argument('--latency-ms', type=int, default=0, help='Delay added to every response')
+        parser.add_argument('--jitter-ms', type=int, default=0, help='Random extra delay of up to this many ms')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests that fail (0-1)')
+        parser.add_argument('--error-status', type=int, default=503, help='Status code returned for injected failures')
+        parser.add_argument('--events', type=int, default=20, help='Synthetic events per sport')
+        parser.add_argument('--bookmakers', type=int, default=5, help='Synthetic bookmakers per event (payload size)')
+        parser.add_argument('--quota', type=int, default=20000, help='Starting x-requests-remaining')
+        parser.add_argument('--reprice-seconds', type=int, default=60, help='How often synthetic prices move')
+        parser.add_argument('--scores-pending-rate', type=float, default=0.2,
+                            help='Fraction of games the scores feed reports as not yet final (0-1)')
+
+    def handle(self, *args, **options):
+        api = FakeOddsApi(
+            fixture_dir=options['fixtures'] or getattr(settings, 'ODDS_API_FIXTURE_DIR', None),
+            latency_ms=options['latency_ms'],
+            jitter_ms=options['jitter_ms'],
+            error_rate=options['error_rate'],
+            error_status=options['error_status'],
+            events_per_sport=options['events'],
+            bookmakers=options['bookmakers'],
+            quota=options['quota'],
+            reprice_seconds=options['reprice_seconds'],
+            scores_pending_rate=options['scores_pending_rate'],
+        )
+        server = make_server(api, options['host'], options['port'])
+        url = f"http://{options['host']}:{options['port']}"
+        self.stdout.write(self.style.SUCCESS(f'Fake Odds API listening on {url}'))
+        self.stdout.write(f'Point the backend at it with ODDS_API_BASE_URL={url}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f'Served {api.requests} requests')
@@ -0,0 +1,151 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Min, Q
+from django.utils import timezone
+from datetime import timedelta
+from groups.models import League, LeagueEvent
+from groups.odds import get_odds_client
+from groups.odds_cache import odds_cache
+from groups import odds_history
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Games that started this long ago may still be live and are polled at the top rate
+LIVE_WINDOW = timedelta(hours=4)
+
+# (starts within, refresh every). The first tier whose horizon covers the sport's
+# next open game decides how often the sport is refreshed.
+PRIORITY_TIERS = [
+    (timedelta(hours=3), timedelta(minutes=1)),
+    (timedelta(hours=24), timedelta(minutes=5)),
+    (timedelta(days=7), timedelta(minutes=20)),
+]
+
+# Sports a league follows but has no open games in, or games with no start time.
+# Kept inside the cache's stale window so request handlers never fetch synchronously.
+BACKGROUND_INTERVAL = timedelta(minutes=45)
+
+# How often old odds history is pruned
+PRUNE_INTERVAL = timedelta(hours=1)
+
+
+def poll_interval(next_start, now):
+    """
+    How often to refresh a sport given the start time of its next open game
+
+    Parameters:
+    next_start (datetime): Earliest commence_time of the sport's open games, or None
+    now (datetime): Current time
+
+    Returns:
+    timedelta: Time between refreshes
+    """
+    if next_start is None:
+        return BACKGROUND_INTERVAL
+    until_start = next_start - now
+    for horizon, interval in PRIORITY_TIERS:
+        if until_start <= horizon:
+            return interval
+    return BACKGROUND_INTERVAL
+
+
+class Command(BaseCommand):
+    help = 'Keeps cached Odds API snapshots warm, refreshing sports with games starting soon most often'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run a single polling pass and exit')
+        parser.add_argument('--tick', type=int, default=15, help='Seconds to sleep between polling passes')
+        parser.add_argument('--dry-run', action='store_true', help='Print the schedule without calling the Odds API')
+
+    def handle(self, *args, **options):
+        client = get_odds_client()
+        self.stdout.write(self.style.SUCCESS('Odds poller started'))
+        last_prune = None
+
+        while True:
+            try:
+                self.poll(client, dry_run=options['dry_run'])
+                if not options['dry_run'] and (last_prune is None or timezone.now() - last_prune >= PRUNE_INTERVAL):
+                    odds_history.prune()
+                    last_prune = timezone.now()
+            except Exception as e:
+                logger.error(f"Odds polling pass failed: {e}", exc_info=True)
+            if options['once']:
+                break
+            time.sleep(options['tick'])
+
+    def poll(self, client, dry_run=False):
+        """Refresh every sport whose snapshot is older than its priority interval"""
+        now = timezone.now()
+        schedule = self.build_schedule(client, now)
+        keys = {sport_key: client.sport_events_key(sport_key) for sport_key in schedule}
+        fetched_at = odds_cache.fetched_at(list(keys.values()))
+
+        refreshed = 0
+        for sport_key, interval in sorted(schedule.items(), key=lambda item: item[1]):
+            last = fetched_at.get(keys[sport_key])
+            if last is not None and now - last < interval:
+                continue
+            if dry_run:
+                self.stdout.write(f'{sport_key}: due (every {interval})')
+                continue
+            try:
+                if client.refresh_sport_events(sport_key) is None:
+                    logger.info("Odds API quota is low, skipping remaining refreshes this pass")
+                    break
+                refreshed += 1
+            except Exception as e:
+                logger.warning(f"Could not refresh {sport_key}: {e}")
+
+        logger.info(f"Odds poll: {len(schedule)} sports scheduled, {refreshed} refreshed")
+        return refreshed
+
+    def build_schedule(self, client, now):
+        """
+        Work out how often each relevant sport should be refreshed
+
+        Returns:
+        dict: sport_key -> refresh interval
+        """
+        known_sports = []
+        try:
+            known_sports = client.get_sports()['sports']
+        except Exception as e:
+            logger.warning(f"Could not load sports list, scheduling from league events only: {e}")
+        known_keys = {sport['key'] for sport in known_sports}
+
+        schedule = {}
+
+        # Sports leagues say they follow, at the background rate
+        for label in self.league_sport_labels():
+            for sport in known_sports:
+                if sport.get('active') and label in (sport['key'].lower(), sport['title'].lower(), sport['group'].lower()):
+                    schedule[sport['key']] = BACKGROUND_INTERVAL
+
+        # Sports with open Odds API events, prioritised by the next game to start.
+        # Completed events and games long finished are never polled.
+        open_events = LeagueEvent.objects.filter(
+            completed=False,
+            event_id__isnull=False,
+        ).exclude(sport='').filter(
+            Q(commence_time__isnull=True) | Q(commence_time__gte=now - LIVE_WINDOW)
+        ).values('sport').annotate(next_start=Min('commence_time'))
+
+        for row in open_events:
+            sport_key = row['sport']
+            if known_keys and sport_key not in known_keys:
+                continue
+            interval = poll_interval(row['next_start'], now)
+            schedule[sport_key] = min(interval, schedule.get(sport_key, interval))
+
+        return schedule
+
+    def league_sport_labels(self):
+        labels = set()
+        for sports in League.objects.values_list('sports', flat=True):
+            for label in sports or []:
+                if isinstance(label, str) and label.strip():
+                    labels.add(label.strip().lower())
+        return labels
+
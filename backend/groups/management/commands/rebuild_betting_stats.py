@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from groups.stats import rebuild
+import time
+
+
+class Command(BaseCommand):
+    help = 'Recomputes every user\'s betting stats from their bets, a batch of users at a time'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids', help='Only this user (repeatable)')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        written = rebuild(options['user_ids'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt betting stats for {written} users in {time.monotonic() - started:.1f}s'))
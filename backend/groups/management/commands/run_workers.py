@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from groups import jobs
+import groups.settlement  # noqa: F401  Registers the settlement job handlers
+import logging
+import os
+import signal
+import socket
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Runs queued background jobs, such as event settlement, from the job table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=1, help='Jobs to run concurrently in this process')
+        parser.add_argument('--tick', type=float, default=1.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Run jobs until the queue is empty, then exit')
+
+    def handle(self, *args, **options):
+        self.stopping = threading.Event()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, self.stop)
+
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+        threads = [
+            threading.Thread(target=self.work, args=(f'{prefix}:{i}', options), name=f'job-worker-{i}')
+            for i in range(max(1, options['threads']))
+        ]
+        self.stdout.write(self.style.SUCCESS(f'Job workers started ({len(threads)} threads)'))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.stdout.write('Job workers stopped')
+
+    def stop(self, signum, frame):
+        """Finish the jobs in hand, then exit"""
+        logger.info("Stopping job workers after their current jobs")
+        self.stopping.set()
+
+    def work(self, worker_id, options):
+        """Claim and run jobs until stopped; each thread has its own database connection"""
+        try:
+            while not self.stopping.is_set():
+                close_old_connections()
+                try:
+                    job = jobs.claim(worker_id)
+                except Exception as e:
+                    logger.error(f"Could not claim a job: {e}", exc_info=True)
+                    job = None
+                if job is None:
+                    if options['once']:
+                        break
+                    self.stopping.wait(options['tick'])
+                    continue
+                logger.info(f"{worker_id} running job {job.id} {job.kind} (attempt {job.attempts})")
+                jobs.run(job)
+        finally:
+            connection.close()
@@ -0,0 +1,122 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from datetime import timedelta
+from groups.models import LeagueEvent
+from groups.odds import get_odds_client
+from groups.odds_quota import quota
+from groups.odds_scores import decide, expected_duration, SCORES_MAX_DAYS, PENDING, FINAL
+from groups.settlement import settle_events
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+# Wait after a game is found not to be final yet, doubling per attempt up to the cap
+RETRY_BACKOFF = timedelta(minutes=10)
+MAX_RETRY_BACKOFF = timedelta(hours=2)
+
+# Above this many games a sport's scores are fetched unfiltered rather than by eventIds
+MAX_EVENT_IDS = 50
+
+
+def retry_delay(attempts):
+    """Backoff before checking a game again after `attempts` non-final results"""
+    return min(RETRY_BACKOFF * (2 ** max(attempts - 1, 0)), MAX_RETRY_BACKOFF)
+
+
+class Command(BaseCommand):
+    help = 'Settles Odds API league events automatically from the scores feed, polling each sport once per pass'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run a single settlement pass and exit')
+        parser.add_argument('--tick', type=int, default=60, help='Seconds to sleep between passes')
+        parser.add_argument('--dry-run', action='store_true', help='Report results without settling anything')
+
+    def handle(self, *args, **options):
+        client = get_odds_client()
+        # event_id -> (non-final results so far, next check). Kept in memory: after a
+        # restart every game is simply checked again once.
+        self.backoff = {}
+        # event_ids that are final but need a person to settle them
+        self.manual = set()
+        self.stdout.write(self.style.SUCCESS('Event settler started'))
+
+        while True:
+            try:
+                self.settle_pass(client, dry_run=options['dry_run'])
+            except Exception as e:
+                logger.error(f"Settlement pass failed: {e}", exc_info=True)
+            if options['once']:
+                break
+            time.sleep(options['tick'])
+
+    def settle_pass(self, client, dry_run=False):
+        """Fetch scores for every sport with games due a check and settle the final ones"""
+        now = timezone.now()
+        if quota.is_exhausted():
+            logger.warning("Odds API quota exhausted, skipping settlement pass")
+            return []
+
+        due = self.due_events(now)
+        results = []
+        for sport_key, games in due.items():
+            oldest = min(events[0].commence_time for events in games.values())
+            days_from = min(SCORES_MAX_DAYS, max(1, math.ceil((now - oldest).total_seconds() / 86400)))
+            event_ids = list(games)
+            try:
+                feed = client.get_scores(sport_key, event_ids if len(event_ids) <= MAX_EVENT_IDS else None, days_from)
+            except Exception as e:
+                logger.warning(f"Could not fetch scores for {sport_key}: {e}")
+                continue
+            by_id = {game['id']: game for game in feed}
+
+            for event_id, events in games.items():
+                outcome, detail = decide(by_id.get(event_id), events[0].home_team, events[0].away_team)
+                if outcome == PENDING:
+                    attempts = self.backoff.get(event_id, (0, None))[0] + 1
+                    self.backoff[event_id] = (attempts, now + retry_delay(attempts))
+                elif outcome == FINAL:
+                    self.backoff.pop(event_id, None)
+                    results.extend((event, detail) for event in events)
+                else:
+                    self.backoff.pop(event_id, None)
+                    self.manual.add(event_id)
+                    logger.warning(f"Event {event_id} ({events[0].event_name}) needs manual settlement: {detail}")
+
+        if dry_run:
+            for event, winner in results:
+                self.stdout.write(f'{event.id} {event.event_name}: {winner}')
+            return []
+
+        settled = settle_events(results) if results else []
+        logger.info(f"Settlement pass: {sum(len(games) for games in due.values())} games checked in {len(due)} sports, {len(settled)} events settled")
+        return settled
+
+    def due_events(self, now):
+        """
+        Open Odds API events whose game should be over and is due a check
+
+        Returns:
+        dict: sport_key -> {event_id: [LeagueEvent, ...]}; one Odds API game can be
+        posted to several leagues
+        """
+        open_events = LeagueEvent.objects.filter(
+            completed=False,
+            betting_type='standard',
+            event_id__isnull=False,
+            commence_time__lte=now,
+            commence_time__gte=now - timedelta(days=SCORES_MAX_DAYS),
+        ).exclude(event_id='').exclude(sport='').order_by('commence_time')
+
+        due = {}
+        for event in open_events:
+            if event.event_id in self.manual:
+                continue
+            if now < event.commence_time + expected_duration(event.sport):
+                continue
+            next_check = self.backoff.get(event.event_id, (0, None))[1]
+            if next_check is not None and now < next_check:
+                continue
+            due.setdefault(event.sport, {}).setdefault(event.event_id, []).append(event)
+        return due
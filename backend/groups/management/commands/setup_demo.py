@@ -4,8 +4,9 @@ from django.utils import timezone
 from decimal import Decimal
 from groups.models import (
     League, Circuit, LeagueEvent, CircuitComponentEvent, 
-    CircuitParticipant, UserBet, LeagueInvite, Bet
+    CircuitParticipant, UserBet, LeagueInvite, Bet, LedgerEntry
 )
+from groups import ledger, stats
 from users.models import FriendRequest
 import datetime
 import json
@@ -46,6 +47,9 @@ class Command(BaseCommand):
         # Create invite for pikachu (will be accepted during demo)
         self.create_invite(league, slowpoke, pikachu)
         
+        # Recount the demo users' betting stats from the bets just created
+        stats.rebuild([user.id for user in (slowpoke, miles, gwen, pikachu)])
+        
         self.stdout.write(self.style.SUCCESS('Demo setup completed successfully!'))
 
     def clear_existing_data(self):
@@ -85,9 +89,8 @@ class Command(BaseCommand):
             slowpoke.save()
             self.stdout.write(self.style.SUCCESS(f'Created user: {slowpoke.username}'))
         else:
-            # Update money
-            slowpoke.money = Decimal('1000.00')
-            slowpoke.save()
+            # Reset money, through the ledger
+            ledger.credit(slowpoke, Decimal('1000.00') - slowpoke.money, LedgerEntry.ADJUSTMENT, 'setup_demo')
             
         # Create or get miles user
         miles, created = User.objects.get_or_create(
@@ -102,9 +105,8 @@ class Command(BaseCommand):
             miles.save()
             self.stdout.write(self.style.SUCCESS(f'Created user: {miles.username}'))
         else:
-            # Update money
-            miles.money = Decimal('1000.00')
-            miles.save()
+            # Reset money, through the ledger
+            ledger.credit(miles, Decimal('1000.00') - miles.money, LedgerEntry.ADJUSTMENT, 'setup_demo')
             
         # Create or get gwen user
         gwen, created = User.objects.get_or_create(
@@ -119,9 +121,8 @@ class Command(BaseCommand):
             gwen.save()
             self.stdout.write(self.style.SUCCESS(f'Created user: {gwen.username}'))
         else:
-            # Update money
-            gwen.money = Decimal('1000.00')
-            gwen.save()
+            # Reset money, through the ledger
+            ledger.credit(gwen, Decimal('1000.00') - gwen.money, LedgerEntry.ADJUSTMENT, 'setup_demo')
             
         # Create or get pikachu user
         pikachu, created = User.objects.get_or_create(
@@ -136,9 +137,8 @@ class Command(BaseCommand):
             pikachu.save()
             self.stdout.write(self.style.SUCCESS(f'Created user: {pikachu.username}'))
         else:
-            # Update money
-            pikachu.money = Decimal('1000.00')
-            pikachu.save()
+            # Reset money, through the ledger
+            ledger.credit(pikachu, Decimal('1000.00') - pikachu.money, LedgerEntry.ADJUSTMENT, 'setup_demo')
             
         # Set profile pictures
         self.set_profile_pictures([slowpoke, miles, gwen, pikachu])
@@ -336,8 +336,7 @@ class Command(BaseCommand):
             )
             
             # Deduct entry fee
-            participant.money -= circuit.entry_fee
-            participant.save()
+            ledger.debit(participant, circuit.entry_fee, LedgerEntry.CIRCUIT_ENTRY, f'circuit:{circuit.id}')
             
             # Place bets for each participant and update scores accordingly
             if participant == participants[0]:  # slowpoke
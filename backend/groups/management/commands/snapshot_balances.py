@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from groups.ledger import snapshot_balances
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Periodically records every user\'s balance, so balances at past times are read from the nearest snapshot'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Take one round of snapshots and exit')
+        parser.add_argument('--tick', type=int, default=86400, help='Seconds between rounds of snapshots')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('Balance snapshotter started'))
+        while True:
+            try:
+                taken = snapshot_balances()
+                self.stdout.write(f'Took {taken} balance snapshots')
+            except Exception as e:
+                logger.error(f"Balance snapshot round failed: {e}", exc_info=True)
+            if options['once']:
+                break
+            time.sleep(options['tick'])
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.19 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0017_circuitparticipant_completed_bets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OddsApiSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cache_key', models.CharField(max_length=255, unique=True)),
+                ('endpoint', models.CharField(db_index=True, max_length=50)),
+                ('payload', models.JSONField()),
+                ('fetched_at', models.DateTimeField()),
+                ('refresh_lease_until', models.DateTimeField(blank=True, help_text='Set while one worker refreshes this entry in the background.', null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.19 on 2026-10-17 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0018_oddsapisnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OddsEventIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(max_length=255, unique=True)),
+                ('sport_key', models.CharField(max_length=100)),
+                ('commence_time', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
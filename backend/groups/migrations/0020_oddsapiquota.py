@@ -0,0 +1,23 @@
+# Generated by Django 4.2.19 on 2026-10-17 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0019_oddseventindex'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OddsApiQuota',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('requests_remaining', models.IntegerField(blank=True, null=True)),
+                ('requests_used', models.IntegerField(blank=True, null=True)),
+                ('last_request_cost', models.IntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
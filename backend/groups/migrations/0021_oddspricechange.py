@@ -0,0 +1,29 @@
+# Generated by Django 4.2.19 on 2026-10-17 12:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0020_oddsapiquota'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OddsPriceChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(max_length=255)),
+                ('bookmaker', models.CharField(max_length=50)),
+                ('market', models.CharField(max_length=50)),
+                ('outcome', models.CharField(max_length=255)),
+                ('price', models.FloatField()),
+                ('point', models.FloatField(blank=True, null=True)),
+                ('recorded_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['event_id', 'recorded_at'], name='groups_odds_event_i_6753ec_idx'), models.Index(fields=['recorded_at'], name='groups_odds_recorde_65997b_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.19 on 2026-10-17 21:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0021_oddspricechange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='oddseventindex',
+            name='changed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='oddseventindex',
+            name='last_update',
+            field=models.CharField(blank=True, default='', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='oddseventindex',
+            name='removed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='oddseventindex',
+            index=models.Index(fields=['sport_key', 'changed_at'], name='groups_odds_sport_k_3185e9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='oddseventindex',
+            index=models.Index(fields=['sport_key', 'removed_at'], name='groups_odds_sport_k_2aa54d_idx'),
+        ),
+    ]
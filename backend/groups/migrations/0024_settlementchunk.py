@@ -0,0 +1,30 @@
+# Generated by Django 4.2.19 on 2026-10-17 21:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0023_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SettlementChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('part', models.CharField(max_length=20)),
+                ('chunk', models.IntegerField()),
+                ('chunk_size', models.IntegerField()),
+                ('winner', models.CharField(max_length=255)),
+                ('bets', models.IntegerField(default=0)),
+                ('applied_at', models.DateTimeField(auto_now_add=True)),
+                ('league_event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='settlement_chunks', to='groups.leagueevent')),
+            ],
+            options={
+                'unique_together': {('league_event', 'part', 'chunk')},
+            },
+        ),
+    ]
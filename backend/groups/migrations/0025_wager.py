@@ -0,0 +1,43 @@
+# Generated by Django 4.2.19 on 2026-10-17 22:30
+
+from decimal import Decimal
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('groups', '0024_settlementchunk'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Wager',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('user', 'User bet'), ('circuit', 'Circuit bet')], default='user', max_length=10)),
+                ('outcome', models.CharField(blank=True, default='', max_length=255)),
+                ('amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('odds', models.FloatField(default=2.0)),
+                ('weight', models.IntegerField(default=1)),
+                ('result', models.CharField(default='pending', max_length=20)),
+                ('payout', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('points_earned', models.IntegerField(default=0)),
+                ('placed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('legacy_index', models.IntegerField(blank=True, null=True)),
+                ('extra', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('circuit', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='wagers', to='groups.circuit')),
+                ('league_event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='wagers', to='groups.leagueevent')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='wagers', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['league_event', 'user'], name='groups_wage_league__8fde3b_idx'), models.Index(fields=['circuit', 'league_event'], name='groups_wage_circuit_e9b9f7_idx'), models.Index(fields=['user', 'placed_at'], name='groups_wage_user_id_0d2835_idx')],
+                'unique_together': {('league_event', 'kind', 'legacy_index')},
+            },
+        ),
+    ]
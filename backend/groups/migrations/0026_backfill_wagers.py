@@ -0,0 +1,161 @@
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+# Events converted per transaction, and rows per INSERT
+EVENT_BATCH = 200
+ROW_BATCH = 1000
+
+LEGACY_LISTS = {'user_bets': 'user', 'circuit_bets': 'circuit'}
+LEGACY_FIELDS = {
+    'user': {'user_id', 'outcomeKey', 'amount', 'odds', 'result', 'payout', 'bet_time'},
+    'circuit': {'user_id', 'circuit_id', 'outcome', 'weight', 'result', 'points_earned', 'points'},
+}
+
+
+def _convert(Wager, event, kind, index, entry):
+    """An unsaved Wager for a market_data entry, or None if it names no user or circuit"""
+    if not isinstance(entry, dict):
+        return None
+    try:
+        user_id = int(entry.get('user_id'))
+        circuit_id = int(entry.get('circuit_id')) if kind == 'circuit' else None
+    except (TypeError, ValueError):
+        return None
+
+    extra = {key: value for key, value in entry.items() if key not in LEGACY_FIELDS[kind]}
+
+    def parse(key, convert):
+        if entry.get(key) is None:
+            return None
+        try:
+            return convert(entry[key])
+        except (TypeError, ValueError, InvalidOperation):
+            extra[key] = entry[key]
+            return None
+
+    def money(value):
+        return Decimal(str(value)).quantize(Decimal('0.01'))
+
+    wager = Wager(
+        league_event_id=event.id, user_id=user_id, circuit_id=circuit_id, kind=kind,
+        result=str(entry.get('result') or 'pending'), placed_at=event.created_at,
+        legacy_index=index, extra=extra,
+    )
+    if kind == 'user':
+        wager.outcome = str(entry.get('outcomeKey') or '')
+        wager.amount = parse('amount', money) or Decimal('0.00')
+        wager.odds = parse('odds', float) or 2.0
+        wager.payout = parse('payout', money) or Decimal('0.00')
+        placed_at = parse('bet_time', lambda value: parse_datetime(str(value)))
+        if placed_at:
+            wager.placed_at = placed_at if timezone.is_aware(placed_at) else timezone.make_aware(placed_at)
+        elif entry.get('bet_time') is not None:
+            extra['bet_time'] = entry['bet_time']
+    else:
+        wager.outcome = str(entry.get('outcome') or '')
+        wager.weight = parse('weight', int) or 1
+        wager.points_earned = parse('points_earned', int) or parse('points', int) or 0
+    return wager
+
+
+def backfill_wagers(apps, schema_editor):
+    """
+    Move market_data['user_bets'] and ['circuit_bets'] into the Wager table, a
+    batch of events per transaction so a large table is not locked throughout.
+    Entries whose user or circuit no longer exists are left in the lists.
+    """
+    LeagueEvent = apps.get_model('groups', 'LeagueEvent')
+    Wager = apps.get_model('groups', 'Wager')
+    Circuit = apps.get_model('groups', 'Circuit')
+    User = apps.get_model('users', 'User')
+
+    with_bets = Q(market_data__has_key='user_bets') | Q(market_data__has_key='circuit_bets')
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            events = list(
+                LeagueEvent.objects.select_for_update()
+                .filter(with_bets, id__gt=last_id).order_by('id')[:EVENT_BATCH]
+            )
+            if not events:
+                break
+            last_id = events[-1].id
+
+            converted = []  # (event, list name, entry, wager or None)
+            for event in events:
+                for name, kind in LEGACY_LISTS.items():
+                    if event.market_data.get(name) is None:
+                        continue
+                    # Re-running after a partial backfill numbers new entries after the moved ones
+                    last = Wager.objects.filter(league_event_id=event.id, kind=kind).aggregate(last=Max('legacy_index'))['last']
+                    offset = 0 if last is None else last + 1
+                    for index, entry in enumerate(event.market_data.get(name) or []):
+                        converted.append((event, name, entry, _convert(Wager, event, kind, offset + index, entry)))
+
+            wagers = [wager for _, _, _, wager in converted if wager is not None]
+            users = set(User.objects.filter(id__in={w.user_id for w in wagers}).values_list('id', flat=True))
+            circuits = set(Circuit.objects.filter(
+                id__in={w.circuit_id for w in wagers if w.circuit_id}
+            ).values_list('id', flat=True))
+
+            moved, kept = [], {}
+            for event, name, entry, wager in converted:
+                if wager is not None and wager.user_id in users and (wager.circuit_id is None or wager.circuit_id in circuits):
+                    moved.append(wager)
+                else:
+                    kept.setdefault((event.id, name), []).append(entry)
+            Wager.objects.bulk_create(moved, batch_size=ROW_BATCH)
+
+            for event in events:
+                for name in LEGACY_LISTS:
+                    if (event.id, name) in kept:
+                        event.market_data[name] = kept[(event.id, name)]
+                    else:
+                        event.market_data.pop(name, None)
+            LeagueEvent.objects.bulk_update(events, ['market_data'], batch_size=ROW_BATCH)
+
+
+def restore_market_data_lists(apps, schema_editor):
+    """Write every wager back into its event's market_data list"""
+    LeagueEvent = apps.get_model('groups', 'LeagueEvent')
+    Wager = apps.get_model('groups', 'Wager')
+
+    event_ids = list(Wager.objects.order_by('league_event_id').values_list('league_event_id', flat=True).distinct())
+    for start in range(0, len(event_ids), EVENT_BATCH):
+        with transaction.atomic():
+            events = {event.id: event for event in LeagueEvent.objects.select_for_update().filter(id__in=event_ids[start:start + EVENT_BATCH])}
+            lists = {}
+            for wager in Wager.objects.filter(league_event_id__in=list(events)).order_by('id'):
+                if wager.kind == 'user':
+                    entry = {'user_id': wager.user_id, 'outcomeKey': wager.outcome, 'amount': float(wager.amount),
+                             'odds': wager.odds, 'bet_time': wager.placed_at.isoformat()}
+                    if wager.result != 'pending':
+                        entry.update(result=wager.result, payout=float(wager.payout))
+                else:
+                    entry = {'user_id': wager.user_id, 'circuit_id': wager.circuit_id, 'outcome': wager.outcome,
+                             'weight': wager.weight, 'result': wager.result, 'points_earned': wager.points_earned}
+                name = 'user_bets' if wager.kind == 'user' else 'circuit_bets'
+                lists.setdefault((wager.league_event_id, name), []).append({**entry, **wager.extra})
+            for (event_id, name), entries in lists.items():
+                event = events[event_id]
+                event.market_data = event.market_data or {}
+                event.market_data[name] = entries + (event.market_data.get(name) or [])
+            LeagueEvent.objects.bulk_update(list(events.values()), ['market_data'], batch_size=ROW_BATCH)
+            Wager.objects.filter(league_event_id__in=list(events)).delete()
+
+
+class Migration(migrations.Migration):
+    # Each batch of events commits on its own
+    atomic = False
+
+    dependencies = [
+        ('groups', '0025_wager'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_wagers, restore_market_data_lists),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.19 on 2026-10-17 23:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def snapshot_opening_balances(apps, schema_editor):
+    """Record every balance as the ledger starts, so earlier times read as the opening balance"""
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    BalanceSnapshot = apps.get_model('groups', 'BalanceSnapshot')
+    now = django.utils.timezone.now()
+    BalanceSnapshot.objects.bulk_create(
+        (BalanceSnapshot(user_id=user_id, balance=money, last_entry_id=0, taken_at=now)
+         for user_id, money in User.objects.values_list('id', 'money').iterator(chunk_size=1000)),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('groups', '0026_backfill_wagers'),
+        ('users', '0002_user_money'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('reason', models.CharField(choices=[('bet_stake', 'Bet stake'), ('bet_payout', 'Bet payout'), ('circuit_entry', 'Circuit entry fee'), ('circuit_prize', 'Circuit prize'), ('adjustment', 'Adjustment')], max_length=20)),
+                ('reference', models.CharField(blank=True, default='', max_length=100)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'created_at'], name='groups_ledg_user_id_1b5d08_idx'), models.Index(fields=['user', 'id'], name='groups_ledg_user_id_00ba8a_idx'), models.Index(fields=['reference'], name='groups_ledg_referen_94ec69_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BalanceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('last_entry_id', models.BigIntegerField(default=0)),
+                ('taken_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_snapshots', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'taken_at'], name='groups_bala_user_id_9d0e33_idx')],
+            },
+        ),
+        migrations.RunPython(snapshot_opening_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.19 on 2026-10-17 23:55
+
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_user_settings'),
+        ('groups', '0027_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BettingStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='betting_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_bets', models.IntegerField(default=0)),
+                ('won_bets', models.IntegerField(default=0)),
+                ('current_streak', models.IntegerField(default=0)),
+                ('lifetime_winnings', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('level', models.IntegerField(default=1)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.19 on 2026-10-17 23:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0028_betting_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userbet',
+            index=models.Index(fields=['user', 'created_at'], name='groups_user_user_id_31da88_idx'),
+        ),
+    ]
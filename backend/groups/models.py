@@ -1,4 +1,6 @@
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
 from users.models import User
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
@@ -64,6 +66,9 @@ class UserBet(models.Model):
 
     class Meta:
         unique_together = ('user', 'bet') # Need to reconsider if 'bet' FK remains primary link
+        indexes = [
+            models.Index(fields=['user', 'created_at']),  # Bet history, newest first
+        ]
 
     def clean(self):
         # Ensure numeric_choice is provided only for appropriate tiebreaker events
@@ -103,7 +108,7 @@ class LeagueEvent(models.Model):
     BETTING_TYPE_CHOICES = [
         ('standard', 'Standard'), # Standard betting (moneyline, spread, etc.)
         ('tiebreaker_closest', 'Tiebreaker - Closest Guess'), # Guess a number, closest wins
-        ('tiebreaker_unique', 'Tiebreaker - Unique Guess'), # Guess a number, must be unique, closest wins (more complex logic needed)
+        ('tiebreaker_unique', 'Tiebreaker - Unique Guess'), # Guess a number, closest guess no one else made wins (see tiebreaker.py)
     ]
     betting_type = models.CharField(
         max_length=20,
@@ -241,6 +246,254 @@ class CircuitParticipant(models.Model):
     def __str__(self):
         return f"{self.user.username} in Circuit {self.circuit.name} (Score: {self.score})"
 
+class OddsApiSnapshot(models.Model):
+    """Cached Odds API response shared by every worker process."""
+    cache_key = models.CharField(max_length=255, unique=True)  # endpoint:sport:regions:markets:format
+    endpoint = models.CharField(max_length=50, db_index=True)
+    payload = models.JSONField()
+    fetched_at = models.DateTimeField()
+    refresh_lease_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Set while one worker refreshes this entry in the background."
+    )
+
+    def __str__(self):
+        return f"{self.cache_key} (fetched {self.fetched_at})"
+
+class OddsEventIndex(models.Model):
+    """
+    Maps an Odds API event ID to the sport it belongs to, and tracks when the
+    event's odds last changed or it dropped out of the sport's feed so clients
+    can fetch only what changed since their last poll.
+    """
+    event_id = models.CharField(max_length=255, unique=True)
+    sport_key = models.CharField(max_length=100)
+    commence_time = models.DateTimeField(null=True, blank=True)
+    last_update = models.CharField(max_length=40, blank=True, default='')  # Latest bookmaker last_update seen
+    changed_at = models.DateTimeField(null=True, blank=True)  # When we saw last_update change
+    removed_at = models.DateTimeField(null=True, blank=True)  # When the event left the sport's feed
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['sport_key', 'changed_at']),
+            models.Index(fields=['sport_key', 'removed_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id} -> {self.sport_key}"
+
+class OddsApiQuota(models.Model):
+    """Latest Odds API usage reported in response headers. A single row (pk=1)."""
+    requests_remaining = models.IntegerField(null=True, blank=True)
+    requests_used = models.IntegerField(null=True, blank=True)
+    last_request_cost = models.IntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Odds API quota: {self.requests_remaining} remaining, {self.requests_used} used"
+
+class OddsPriceChange(models.Model):
+    """
+    One price movement for an outcome at a bookmaker. Only changes are stored, so the
+    price at any time is the most recent row at or before it.
+    """
+    event_id = models.CharField(max_length=255)  # Odds API event ID
+    bookmaker = models.CharField(max_length=50)
+    market = models.CharField(max_length=50)
+    outcome = models.CharField(max_length=255)
+    price = models.FloatField()
+    point = models.FloatField(null=True, blank=True)  # Spread or total line, if any
+    recorded_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['event_id', 'recorded_at']),
+            models.Index(fields=['recorded_at']),  # Retention pruning
+        ]
+
+    def __str__(self):
+        return f"{self.event_id} {self.bookmaker} {self.market} {self.outcome}: {self.price} at {self.recorded_at}"
+
+class Wager(models.Model):
+    """
+    One bet on a league event, in place of the entries that used to be kept in
+    LeagueEvent.market_data['user_bets'] and ['circuit_bets']. post_league_event
+    inserts a user bet in the same transaction as its stake's ledger debit, and
+    finding a user's or a circuit's bets is an index lookup.
+    """
+    USER = 'user'  # Money staked at odds, from market_data['user_bets']
+    CIRCUIT = 'circuit'  # Circuit prediction scored by weight, from market_data['circuit_bets']
+    KIND_CHOICES = [
+        (USER, 'User bet'),
+        (CIRCUIT, 'Circuit bet'),
+    ]
+
+    league_event = models.ForeignKey(LeagueEvent, related_name='wagers', on_delete=models.CASCADE)
+    user = models.ForeignKey(User, related_name='wagers', on_delete=models.CASCADE)
+    circuit = models.ForeignKey(Circuit, related_name='wagers', on_delete=models.CASCADE, null=True, blank=True)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default=USER)
+    outcome = models.CharField(max_length=255, blank=True, default='')  # Outcome picked
+    amount = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))  # Stake, user bets
+    odds = models.FloatField(default=2.0)  # Decimal odds, user bets
+    weight = models.IntegerField(default=1)  # Points for a correct pick, circuit bets
+    result = models.CharField(max_length=20, default='pending')  # pending, won, lost, pending_tiebreaker
+    payout = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    points_earned = models.IntegerField(default=0)
+    placed_at = models.DateTimeField(default=timezone.now)
+    # Position in the market_data list a backfilled bet came from, so the backfill can be re-run
+    legacy_index = models.IntegerField(null=True, blank=True)
+    extra = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)  # Any other keys of a backfilled entry
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['league_event', 'user']),
+            models.Index(fields=['circuit', 'league_event']),
+            models.Index(fields=['user', 'placed_at']),
+        ]
+        unique_together = ('league_event', 'kind', 'legacy_index')
+
+    def __str__(self):
+        return f"{self.kind} bet by user {self.user_id} on event {self.league_event_id}: {self.outcome} ({self.result})"
+
+class SettlementChunk(models.Model):
+    """
+    One committed slice of an event's settlement, written in the same transaction
+    as the payouts it covers so a retried settlement skips what was already paid.
+    """
+    league_event = models.ForeignKey(LeagueEvent, related_name='settlement_chunks', on_delete=models.CASCADE)
+    part = models.CharField(max_length=20)  # Bets settled: 'user_bets' or 'circuit_bets' (Wager kinds user and circuit)
+    chunk = models.IntegerField()  # Index of the slice of that list
+    chunk_size = models.IntegerField()  # Bets per slice when settlement started, so retries slice the same way
+    winner = models.CharField(max_length=255)
+    bets = models.IntegerField(default=0)  # Bets in this slice
+    applied_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('league_event', 'part', 'chunk')
+
+    def __str__(self):
+        return f"Event {self.league_event_id} {self.part} chunk {self.chunk} ({self.bets} bets, winner {self.winner})"
+
+class LedgerEntry(models.Model):
+    """
+    One signed change to a user's money. Entries are only ever added, in the same
+    transaction as the F() update of User.money they explain (see ledger.py).
+    """
+    BET_STAKE = 'bet_stake'
+    BET_PAYOUT = 'bet_payout'
+    CIRCUIT_ENTRY = 'circuit_entry'
+    CIRCUIT_PRIZE = 'circuit_prize'
+    ADJUSTMENT = 'adjustment'
+    REASON_CHOICES = [
+        (BET_STAKE, 'Bet stake'),
+        (BET_PAYOUT, 'Bet payout'),
+        (CIRCUIT_ENTRY, 'Circuit entry fee'),
+        (CIRCUIT_PRIZE, 'Circuit prize'),
+        (ADJUSTMENT, 'Adjustment'),
+    ]
+
+    user = models.ForeignKey(User, related_name='ledger_entries', on_delete=models.CASCADE)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)  # Negative for money taken
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    reference = models.CharField(max_length=100, blank=True, default='')  # What it was for, e.g. 'league_event:12'
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+            models.Index(fields=['user', 'id']),
+            models.Index(fields=['reference']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.amount:+} {self.reason} {self.reference}"
+
+class BalanceSnapshot(models.Model):
+    """
+    A user's balance as of a ledger entry, taken periodically so a balance at any
+    time is a snapshot plus the entries after it rather than the whole history.
+    """
+    user = models.ForeignKey(User, related_name='balance_snapshots', on_delete=models.CASCADE)
+    balance = models.DecimalField(max_digits=12, decimal_places=2)
+    last_entry_id = models.BigIntegerField(default=0)  # Latest LedgerEntry included in balance
+    taken_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'taken_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} balance {self.balance} at {self.taken_at}"
+
+class BettingStats(models.Model):
+    """
+    A user's betting record, kept current as bets are placed and settled (see
+    stats.py) so a profile reads one row instead of every bet the user made.
+    """
+    user = models.OneToOneField(User, primary_key=True, related_name='betting_stats', on_delete=models.CASCADE)
+    total_bets = models.IntegerField(default=0)
+    won_bets = models.IntegerField(default=0)
+    current_streak = models.IntegerField(default=0)  # Wins in a row, or minus losses in a row
+    lifetime_winnings = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    level = models.IntegerField(default=1)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    @property
+    def win_rate(self):
+        """Percentage of bets won"""
+        return (self.won_bets / self.total_bets) * 100 if self.total_bets else 0
+
+    def __str__(self):
+        return f"{self.user_id}: {self.won_bets}/{self.total_bets} won"
+
+class Job(models.Model):
+    """
+    Background work such as settling an event, run by `manage.py run_workers`.
+    Workers claim queued jobs with SELECT ... FOR UPDATE SKIP LOCKED and hold them
+    until locked_until; a job whose worker dies is claimed again once that passes.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50)  # Name of the registered handler
+    key = models.CharField(max_length=255, blank=True, default='')  # Identifies duplicate work, e.g. the event being settled
+    payload = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)  # Not claimed before this; pushed back between retries
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    locked_until = models.DateTimeField(null=True, blank=True)  # Visibility timeout of the current attempt
+    progress = models.IntegerField(default=0)
+    total = models.IntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True, default='')
+    created_by = models.ForeignKey(User, related_name='jobs', on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after']),  # Claiming queued jobs
+            models.Index(fields=['status', 'locked_until']),  # Reclaiming expired ones
+            models.Index(fields=['kind', 'key']),
+        ]
+
+    def __str__(self):
+        return f"Job {self.id} {self.kind} ({self.status}, attempt {self.attempts}/{self.max_attempts})"
+
 # Ensure LeagueEvent has related name 'circuits_included_in' if needed later
 # models.ManyToManyField('LeagueEvent', ..., related_name='circuits_included_in')
 
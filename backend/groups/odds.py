@@ -1,14 +1,277 @@
+import copy
 import os
+import re
+import threading
+import time
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from django.conf import settings
+from django.utils import timezone
 import logging
+from .odds_cache import odds_cache, make_key
+from .odds_breaker import breaker, mark_served
+from .odds_index import event_index
+from .odds_quota import quota
+from . import odds_history
+from . import pricing
+from .odds_fixtures import load_fixture_response, record_stream, save_fixture
+from .odds_stream import iter_events, project_event, selection
 
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Status codes the Odds API returns for throttling and transient upstream failures
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+class PoolStats:
+    """Thread-safe counters describing how the shared connection pool is used"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.retried = 0
+        self.errors = 0
+        # Latency samples exclude retried requests, whose backoff sleeps would swamp the signal
+        self.timed_new = 0
+        self.timed_reused = 0
+        self.new_connection_seconds = 0.0
+        self.reused_connection_seconds = 0.0
+
+    def record(self, elapsed, opened_connection, retried=False):
+        with self._lock:
+            self.requests += 1
+            if opened_connection:
+                self.new_connections += 1
+            if retried:
+                self.retried += 1
+            elif opened_connection:
+                self.timed_new += 1
+                self.new_connection_seconds += elapsed
+            else:
+                self.timed_reused += 1
+                self.reused_connection_seconds += elapsed
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self):
+        with self._lock:
+            reused = self.requests - self.new_connections
+            avg_new = self.new_connection_seconds / self.timed_new if self.timed_new else None
+            avg_reused = self.reused_connection_seconds / self.timed_reused if self.timed_reused else None
+            # Handshake time saved is estimated as the latency gap between a request that
+            # had to open a connection and one that reused a kept-alive connection
+            saved = None
+            if avg_new is not None and avg_reused is not None:
+                saved = max(avg_new - avg_reused, 0.0) * reused
+            return {
+                'requests': self.requests,
+                'new_connections': self.new_connections,
+                'reused_connections': reused,
+                'retried': self.retried,
+                'errors': self.errors,
+                'avg_new_connection_ms': round(avg_new * 1000, 2) if avg_new is not None else None,
+                'avg_reused_connection_ms': round(avg_reused * 1000, 2) if avg_reused is not None else None,
+                'estimated_handshake_ms_saved': round(saved * 1000, 2) if saved is not None else None,
+            }
+
+
+pool_stats = PoolStats()
+
+
+class _Call:
+    """One in-flight upstream call that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.owner = threading.get_ident()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls so only one of them reaches the Odds API.
+
+    The first caller for a key runs the function; everyone else asking for the same
+    key while it runs blocks until it finishes and receives the same result (or
+    exception). A nested call for a key the current thread is already fetching
+    runs directly instead of waiting on itself.
+    """
+
+    def __init__(self, wait_timeout=None):
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            if call is not None and call.owner != threading.get_ident():
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls.setdefault(key, call)
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            if not call.done.wait(self.wait_timeout):
+                raise TimeoutError(f"Timed out waiting for in-flight Odds API call {key}")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls),
+            }
+
+
+single_flight = SingleFlight(wait_timeout=getattr(settings, 'ODDS_API_COALESCE_WAIT_SECONDS', 60))
+
+
+def _build_session():
+    """Create a requests session with a bounded keep-alive pool and jittered retries"""
+    retry = Retry(
+        total=getattr(settings, 'ODDS_API_MAX_RETRIES', 3),
+        connect=getattr(settings, 'ODDS_API_MAX_RETRIES', 3),
+        read=0,  # Never replay a request whose response may already have been billed
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(['GET']),
+        backoff_factor=getattr(settings, 'ODDS_API_BACKOFF_FACTOR', 0.5),
+        backoff_jitter=getattr(settings, 'ODDS_API_BACKOFF_JITTER', 0.25),
+        backoff_max=getattr(settings, 'ODDS_API_BACKOFF_MAX', 8),
+        respect_retry_after_header=True,
+        raise_on_status=False,  # Hand the last response back so raise_for_status() reports it
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,  # Only one upstream host
+        pool_maxsize=getattr(settings, 'ODDS_API_POOL_MAXSIZE', 10),
+        pool_block=getattr(settings, 'ODDS_API_POOL_BLOCK', True),
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session():
+    """Return the process-wide pooled session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def _open_connection_count(session):
+    """Total number of connections the session's pools have opened so far"""
+    total = 0
+    for adapter in set(session.adapters.values()):
+        pools = getattr(adapter, 'poolmanager', None)
+        if pools is None:
+            continue
+        for key in list(pools.pools.keys()):
+            pool = pools.pools.get(key)
+            if pool is not None:
+                total += pool.num_connections
+    return total
+
+
+def get_pool_stats():
+    """
+    Get usage statistics for the shared Odds API connection pool
+
+    Returns:
+    dict: Request counts, connection reuse and estimated handshake time saved
+    """
+    stats = pool_stats.snapshot()
+    stats['pool_maxsize'] = getattr(settings, 'ODDS_API_POOL_MAXSIZE', 10)
+    stats['connect_timeout'] = getattr(settings, 'ODDS_API_CONNECT_TIMEOUT', 3.05)
+    stats['read_timeout'] = getattr(settings, 'ODDS_API_READ_TIMEOUT', 10)
+    return stats
+
+
+def get_odds_client():
+    """Return the per-process OddsApiClient shared by all views"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = OddsApiClient()
+    return _shared_client
+
+
+_SELECTION_TOKEN = re.compile(r'^[a-z0-9_]+$')
+
+
+def _normalise_selection(value, kind, allowed=None):
+    """
+    Validate a comma separated selection and put it in canonical order
+
+    Parameters:
+    value (str): e.g. 'totals, h2h'
+    kind (str): What is being selected, for the error message
+    allowed (set): Accepted values, or None to only check the format
+
+    Returns:
+    str: Sorted, de-duplicated selection, e.g. 'h2h,totals'
+
+    Raises:
+    ValueError: If a value is unknown or malformed
+    """
+    parts = sorted({part.strip().lower() for part in value.split(',') if part.strip()})
+    for part in parts:
+        if (allowed is not None and part not in allowed) or not _SELECTION_TOKEN.match(part):
+            raise ValueError(f"Unknown {kind} '{part}'")
+    if not parts:
+        raise ValueError(f"No {kind} selected")
+    return ','.join(parts)
+
+
+def _is_upstream_failure(error):
+    """True for errors caused by the Odds API being down, slow or throttling, rather than a bad request"""
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return error.response.status_code in RETRY_STATUS_CODES
+    return True
+
+
 class OddsApiClient:
     SUPPORTED_SPORTS_GROUPS = {
         'American Football': ['NFL', 'NCAAF'],
@@ -18,13 +281,116 @@ class OddsApiClient:
         'Soccer': ['EPL', 'UEFA Champions League', 'MLS'],
     }
 
+    DEFAULT_REGIONS = 'us'
+    DEFAULT_MARKETS = 'h2h,spreads,totals'
+    # Featured markets the /odds endpoints accept; each one costs a quota credit per region
+    MARKETS = {'h2h', 'spreads', 'totals', 'outrights', 'h2h_lay', 'outrights_lay'}
+    REGIONS = {'us', 'us2', 'uk', 'au', 'eu'}
+
     def __init__(self):
         self.base_url = settings.ODDS_API_BASE_URL.rstrip('/')
         api_key = os.getenv('ODDS_API_KEY') or settings.ODDS_API_KEY
         self.api_key = api_key
-        self.regions = 'us'  # Default to US odds
+        self.regions = self.DEFAULT_REGIONS  # Default to US odds
         self.odds_format = 'american'  # Default to american odds format
         self.date_format = 'iso'  # Default to ISO date format
+        self.markets = self.DEFAULT_MARKETS  # Common betting markets
+        self.bookmakers = None  # Keep every bookmaker in the selected regions
+        self.session = get_session()
+        self.timeout = (
+            getattr(settings, 'ODDS_API_CONNECT_TIMEOUT', 3.05),
+            getattr(settings, 'ODDS_API_READ_TIMEOUT', 10),
+        )
+        # 'record' saves every successful response as a fixture, 'replay' serves
+        # fixtures instead of calling the network (see odds_fixtures.py)
+        self.fixture_mode = getattr(settings, 'ODDS_API_FIXTURE_MODE', None)
+        self.fixture_dir = getattr(settings, 'ODDS_API_FIXTURE_DIR', None)
+
+    def with_options(self, markets=None, regions=None, bookmakers=None):
+        """
+        A client for a narrower or different selection of odds
+
+        The copy shares this client's session, caches and quota tracking. Selections
+        are normalised, so 'totals,h2h' and 'h2h, totals' share one cache entry.
+
+        Parameters:
+        markets (str): Comma separated markets, e.g. 'h2h'; None keeps this client's
+        regions (str): Comma separated bookmaker regions, e.g. 'us,uk'
+        bookmakers (str): Comma separated bookmaker keys; replaces regions upstream
+
+        Returns:
+        OddsApiClient: The configured copy
+
+        Raises:
+        ValueError: For an unknown market or region, or a malformed bookmaker key
+        """
+        client = copy.copy(self)
+        if markets:
+            client.markets = _normalise_selection(markets, 'market', self.MARKETS)
+        if regions:
+            client.regions = _normalise_selection(regions, 'region', self.REGIONS)
+        if bookmakers:
+            client.bookmakers = _normalise_selection(bookmakers, 'bookmaker')
+        return client
+
+    def is_default_selection(self):
+        """True when this client requests the markets and regions the poller keeps warm"""
+        return self.markets == self.DEFAULT_MARKETS and self.regions == self.DEFAULT_REGIONS and not self.bookmakers
+
+    def _selection_params(self):
+        """The markets and regions (or bookmakers) query parameters for an odds request"""
+        if self.bookmakers:
+            # The Odds API bills a bookmakers request like regions, one per 10 books
+            return {'bookmakers': self.bookmakers, 'markets': self.markets}
+        return {'regions': self.regions, 'markets': self.markets}
+
+    def _selection_key(self, endpoint, sport_key, **extra):
+        """Cache key for an odds request made with this client's selection"""
+        if self.bookmakers:
+            extra['bookmakers'] = self.bookmakers
+        return make_key(endpoint, sport_key, self.regions, self.markets, self.odds_format, **extra)
+
+    def _get(self, url, params, stream=False):
+        """
+        Issue a GET through the shared pooled session
+
+        Parameters:
+        url (str): Absolute URL to request
+        params (dict): Query string parameters
+        stream (bool): Leave the body unread so it can be parsed incrementally;
+            the caller must close the response
+
+        Returns:
+        requests.Response: The final response after any retries
+        """
+        if self.fixture_mode == 'replay':
+            return load_fixture_response(self.fixture_dir, url)
+
+        probe = breaker.before_call()
+        connections_before = _open_connection_count(self.session)
+        started = time.monotonic()
+        try:
+            response = self.session.get(url, params=params, timeout=self.timeout, stream=stream)
+        except requests.exceptions.RequestException:
+            pool_stats.record_error()
+            breaker.record_failure(probe)
+            raise
+        if response.status_code in RETRY_STATUS_CODES:
+            breaker.record_failure(probe)
+        else:
+            breaker.record_success(time.monotonic() - started, probe)
+        quota.record(response.headers)
+        opened_connection = _open_connection_count(self.session) > connections_before
+        retries = getattr(response.raw, 'retries', None)
+        retried = bool(retries and retries.history)
+        pool_stats.record(time.monotonic() - started, opened_connection, retried)
+        if self.fixture_mode == 'record' and response.ok:
+            if stream:
+                # Recorded chunk by chunk as the caller parses it, so the body is still streamed
+                record_stream(self.fixture_dir, url, response)
+            else:
+                save_fixture(self.fixture_dir, url, response.content)
+        return response
 
     def get_sports(self, all_sports=False):
         """
@@ -36,6 +402,11 @@ class OddsApiClient:
         Returns:
         list: List of sport objects with keys, groups, titles, etc.
         """
+        key = make_key('sports', all=str(all_sports).lower())
+        return self._serve(key, lambda: single_flight.do(key, lambda: odds_cache.get_or_fetch('sports', key, lambda: self._fetch_sports(all_sports))))
+
+    def _fetch_sports(self, all_sports):
+        """Fetch the sports list from the Odds API, bypassing the cache"""
         url = f'{self.base_url}/v4/sports'
         params = {
             'api_key': self.api_key,
@@ -45,7 +416,7 @@ class OddsApiClient:
         logger.debug(f"Fetching sports from Odds API: {url} with params: {params}")
         
         try:
-            response = requests.get(url, params=params)
+            response = self._get(url, params)
             response.raise_for_status()
             
             sports_data = response.json()
@@ -85,11 +456,94 @@ class OddsApiClient:
         Returns:
         list: List of events for the specified sport
         """
+        key = self.sport_events_key(sport_key)
+        return self._serve(key, lambda: single_flight.do(key, lambda: self._cached_sport_events(sport_key, key)))
+
+    def _cached_sport_events(self, sport_key, key):
+        """Cached events for this selection, cut from the default snapshot when that is fresh"""
+        derived = self._events_from_default(sport_key)
+        if derived is not None:
+            return derived
+        return odds_cache.get_or_fetch('sport_events', key, lambda: self._fetch_sport_events(sport_key))
+
+    def _events_from_default(self, sport_key):
+        """
+        Project a fresh default-selection snapshot down to this client's markets
+
+        The poller keeps the default selection warm, so a request for a subset of its
+        markets in the same region costs no quota credits at all.
+
+        Parameters:
+        sport_key (str): The key of the sport
+
+        Returns:
+        list: The projected events, or None if this selection cannot be served that way
+        """
+        markets = selection(self.markets)
+        if (self.is_default_selection() or self.bookmakers or self.regions != self.DEFAULT_REGIONS
+                or not markets <= selection(self.DEFAULT_MARKETS)):
+            return None
+        events = odds_cache.get_fresh('sport_events', self.default_sport_events_key(sport_key))
+        if events is None:
+            return None
+        projected = []
+        for event in events:
+            narrowed = project_event(event, markets)
+            narrowed['event_name'] = event.get('event_name')
+            narrowed['consensus'] = {
+                market: summary for market, summary in (event.get('consensus') or {}).items() if market in markets
+            }
+            projected.append(narrowed)
+        return projected
+
+    def get_sport_events_since(self, sport_key, since=None):
+        """
+        Get the events of a sport that changed after a cursor
+
+        Parameters:
+        sport_key (str): The key of the sport to fetch events for
+        since (datetime): Cursor from a previous call, or None for every event
+
+        Returns:
+        dict: 'cursor' to pass as since next time, 'events' whose odds changed and
+        'removed' IDs of events no longer listed
+        """
+        keys = [self.sport_events_key(sport_key), self.default_sport_events_key(sport_key)]
+        # Read before the events so the cursor is never newer than the data served;
+        # at worst a client is sent a change it already has. Narrow selections can be
+        # served from either snapshot, so take the older.
+        fetched = odds_cache.fetched_at(keys).values()
+        cursor = min(fetched) if fetched else timezone.now()
+        events = self.get_sport_events(sport_key)
+        if since is None:
+            return {'cursor': cursor, 'events': events, 'removed': []}
+
+        changed, removed = event_index.changes_since(sport_key, since)
+        return {
+            'cursor': cursor,
+            'events': [event for event in events if event['id'] in changed],
+            'removed': removed,
+        }
+
+    def refresh_sport_events(self, sport_key):
+        """
+        Re-fetch a sport's events into the shared cache, ignoring its TTL
+
+        Parameters:
+        sport_key (str): The key of the sport to refresh
+
+        Returns:
+        list: The fresh events, or None if the refresh was refused to save quota
+        """
+        key = self.sport_events_key(sport_key)
+        return single_flight.do(key, lambda: odds_cache.refresh('sport_events', key, lambda: self._fetch_sport_events(sport_key)))
+
+    def _fetch_sport_events(self, sport_key):
+        """Fetch events for a sport from the Odds API, bypassing the cache"""
         url = f'{self.base_url}/v4/sports/{sport_key}/odds'
         params = {
             'api_key': self.api_key,
-            'regions': self.regions,
-            'markets': 'h2h,spreads,totals',  # Common betting markets
+            **self._selection_params(),
             'oddsFormat': self.odds_format,
             'dateFormat': self.date_format
         }
@@ -97,25 +551,23 @@ class OddsApiClient:
         logger.debug(f"Fetching events for sport {sport_key} from Odds API: {url}")
         
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            
-            events_data = response.json()
-            
-            # Format events data with necessary information
+            # Streamed and parsed one event at a time, keeping only the fields we use
             formatted_events = []
-            for event in events_data:
-                formatted_event = {
-                    'id': event['id'],
-                    'sport_key': event['sport_key'],
-                    'sport_title': sport_key,  # We might want to fetch this separately
-                    'commence_time': event['commence_time'],
-                    'home_team': event['home_team'],
-                    'away_team': event['away_team'],
-                    'event_name': f"{event['away_team']} @ {event['home_team']}",
-                    'bookmakers': event['bookmakers']
-                }
-                formatted_events.append(formatted_event)
+            with self._get(url, params, stream=True) as response:
+                response.raise_for_status()
+                for event in iter_events(response, selection(self.markets), selection(self.bookmakers)):
+                    event['sport_title'] = sport_key  # We might want to fetch this separately
+                    event['event_name'] = f"{event['away_team']} @ {event['home_team']}"
+                    formatted_events.append(event)
+            
+            # Priced once per fetch so every cached read carries the cross-book consensus
+            pricing.attach_consensus(formatted_events, self.odds_format)
+            if self.is_default_selection():
+                # Change tracking and history follow the one selection the poller refreshes
+                event_index.record_snapshot(sport_key, formatted_events)
+                self._record_price_history(sport_key, formatted_events)
+            else:
+                event_index.add_events(formatted_events)
             
             logger.debug(f"Successfully fetched {len(formatted_events)} events for sport {sport_key}")
             
@@ -130,6 +582,16 @@ class OddsApiClient:
             logger.error(f"Unexpected error when fetching events for sport {sport_key}: {e}")
             raise
 
+    def _record_price_history(self, sport_key, events):
+        """Write the price changes since the previously cached snapshot of this sport"""
+        try:
+            previous = odds_cache.peek(self.sport_events_key(sport_key))
+            changed = odds_history.record_changes(previous, events)
+            logger.debug(f"Recorded {changed} price changes for sport {sport_key}")
+        except Exception as e:
+            # History is best effort; never fail a fetch because of it
+            logger.warning(f"Could not record price history for sport {sport_key}: {e}")
+
     def get_event_odds(self, event_id):
         """
         Get detailed odds for a specific event
@@ -140,21 +602,157 @@ class OddsApiClient:
         Returns:
         dict: Detailed odds information for the event
         """
-        # First we need to find which sport this event belongs to
-        # Since the Odds API doesn't have a direct endpoint for event by ID,
-        # we would need to search across sports
-        
-        # As a workaround, we can extract the sport key from the event ID
-        # or require the caller to provide the sport key along with the event ID
-        
-        # For simplicity, we'll use the /sports/upcoming endpoint which returns
-        # events across all sports, and filter for our event ID
-        
+        mark_served(None)
+        sport_key = event_index.lookup(event_id)
+
+        if sport_key:
+            # Known sport: reuse the sport's cached snapshot if it is fresh, otherwise
+            # ask the per-event endpoint instead of downloading every upcoming game
+            events = odds_cache.get_fresh('sport_events', self.sport_events_key(sport_key))
+            if events is None:
+                events = self._events_from_default(sport_key)
+            for event in events or []:
+                if event['id'] == event_id:
+                    logger.debug(f"Found event {event_id} in cached {sport_key} snapshot")
+                    return event
+
+            key = self._selection_key('event_odds', sport_key, event=event_id)
+            return self._serve(
+                key,
+                lambda: single_flight.do(key, lambda: odds_cache.get_or_fetch('event_odds', key, lambda: self._fetch_event_odds(sport_key, event_id))),
+                fallback=lambda: odds_cache.last_good(key) or self._event_from_snapshot(sport_key, event_id),
+            )
+
+        # Cold miss: we have never seen this event, so search the upcoming feed once,
+        # unless a recent search already failed to find it
+        if odds_cache.get_fresh('event_not_found', make_key('event_not_found', event=event_id)) is not None:
+            logger.debug(f"Event {event_id} was not found in a recent search, not searching again")
+            raise ValueError(f"Event with ID {event_id} not found")
+        key = self._selection_key('upcoming_search', 'upcoming', event=event_id)
+        return single_flight.do(key, lambda: self._search_upcoming_events(event_id))
+
+    def _serve(self, key, fetch, fallback=None):
+        """
+        Run fetch(), falling back to the last good snapshot when the Odds API is down
+
+        Parameters:
+        key (str): Cache key of the snapshot to fall back to
+        fetch (callable): The normal cached read
+        fallback (callable): Returns (payload, fetched_at) or None; defaults to the snapshot under key
+
+        Returns:
+        The payload. Whether it was a stale fallback is available from odds_breaker.served_stale().
+        """
+        mark_served(None)
+        try:
+            return fetch()
+        except requests.exceptions.RequestException as e:
+            if not _is_upstream_failure(e):
+                raise
+            last_good = fallback() if fallback else odds_cache.last_good(key)
+            if last_good is None:
+                raise
+            payload, fetched_at = last_good
+            logger.warning(f"Odds API unavailable ({e}), serving snapshot {key} fetched at {fetched_at}")
+            mark_served(fetched_at)
+            return payload
+
+    def _event_from_snapshot(self, sport_key, event_id):
+        """Find an event in the last good snapshot of its sport, returning (event, fetched_at) or None"""
+        last_good = odds_cache.last_good(self.sport_events_key(sport_key))
+        if last_good is None:
+            return None
+        events, fetched_at = last_good
+        for event in events:
+            if event['id'] == event_id:
+                return event, fetched_at
+        return None
+
+    def get_scores(self, sport_key, event_ids=None, days_from=None):
+        """
+        Get live and recently completed games with their scores
+
+        Not cached: the settlement job decides how often each sport is polled.
+
+        Parameters:
+        sport_key (str): The key of the sport to fetch scores for
+        event_ids (list): Only return these games, or None for every game
+        days_from (int): Also return games completed up to this many days ago (1-3)
+
+        Returns:
+        list: Games with 'completed' and 'scores' ([{'name', 'score'}] or None)
+        """
+        url = f'{self.base_url}/v4/sports/{sport_key}/scores'
+        params = {
+            'api_key': self.api_key,
+            'dateFormat': self.date_format
+        }
+        if days_from:
+            params['daysFrom'] = days_from
+        if event_ids:
+            params['eventIds'] = ','.join(event_ids)
+
+        logger.debug(f"Fetching scores for sport {sport_key} from Odds API ({len(event_ids or [])} events)")
+
+        try:
+            response = self._get(url, params)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.HTTPError as e:
+            logger.error(f"HTTP error when fetching scores for sport {sport_key}: {e}, Response: {e.response.text if hasattr(e.response, 'text') else 'No response text'}")
+            raise
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Request error when fetching scores for sport {sport_key}: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error when fetching scores for sport {sport_key}: {e}")
+            raise
+
+    def sport_events_key(self, sport_key):
+        """Cache key for this client's get_sport_events(sport_key) response"""
+        return self._selection_key('sport_events', sport_key)
+
+    def default_sport_events_key(self, sport_key):
+        """Cache key for the default selection's get_sport_events(sport_key) response"""
+        return make_key('sport_events', sport_key, self.DEFAULT_REGIONS, self.DEFAULT_MARKETS, self.odds_format)
+
+    def _fetch_event_odds(self, sport_key, event_id):
+        """Fetch a single event from the per-event odds endpoint"""
+        url = f'{self.base_url}/v4/sports/{sport_key}/events/{event_id}/odds'
+        params = {
+            'api_key': self.api_key,
+            **self._selection_params(),
+            'oddsFormat': self.odds_format,
+            'dateFormat': self.date_format
+        }
+
+        logger.debug(f"Fetching event {event_id} for sport {sport_key} from Odds API")
+
+        try:
+            response = self._get(url, params)
+            response.raise_for_status()
+
+            event_detail = project_event(response.json(), selection(self.markets), selection(self.bookmakers))
+
+            logger.debug(f"Successfully fetched event {event_id}")
+
+            return event_detail
+        except requests.exceptions.HTTPError as e:
+            logger.error(f"HTTP error when fetching event {event_id}: {e}, Response: {e.response.text if hasattr(e.response, 'text') else 'No response text'}")
+            raise
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Request error when fetching event {event_id}: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error when fetching event {event_id}: {e}")
+            raise
+
+    def _search_upcoming_events(self, event_id):
+        """Find an event of unknown sport in the upcoming feed, indexing everything it returns"""
         url = f'{self.base_url}/v4/sports/upcoming/odds'
         params = {
             'api_key': self.api_key,
-            'regions': self.regions,
-            'markets': 'h2h,spreads,totals',
+            **self._selection_params(),
             'oddsFormat': self.odds_format,
             'dateFormat': self.date_format
         }
@@ -162,20 +760,22 @@ class OddsApiClient:
         logger.debug(f"Searching for event {event_id} across all sports from Odds API")
         
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            
-            events_data = response.json()
+            # The upcoming feed is the largest response: stream it, index every event
+            # and keep only the one we are looking for
+            seen = []
             event_detail = None
-            
-            # Find the specific event
-            for event in events_data:
-                if event['id'] == event_id:
-                    event_detail = event
-                    break
+            with self._get(url, params, stream=True) as response:
+                response.raise_for_status()
+                for event in iter_events(response, selection(self.markets), selection(self.bookmakers)):
+                    seen.append({'id': event['id'], 'sport_key': event['sport_key'], 'commence_time': event['commence_time']})
+                    if event['id'] == event_id:
+                        event_detail = event
+            event_index.add_events(seen)
             
             if not event_detail:
                 logger.error(f"Event with ID {event_id} not found")
+                # Remember briefly, so unknown or expired IDs do not download the feed every time
+                odds_cache.store('event_not_found', make_key('event_not_found', event=event_id), {'event_id': event_id})
                 raise ValueError(f"Event with ID {event_id} not found")
             
             logger.debug(f"Successfully found event {event_id}")
@@ -199,9 +799,13 @@ class OddsApiClient:
         event (dict): The event data from the API
         
         Returns:
-        dict: Formatted event data
+        dict: Formatted event data, with cross-bookmaker best price and consensus under 'consensus'
         """
-        # Extract the first bookmaker's odds (could improve to average or select preferred bookmaker)
+        consensus = event.get('consensus')
+        if consensus is None:
+            consensus = pricing.consensus_for_events([event], self.odds_format)[0]
+
+        # The first bookmaker's odds are still shown as the headline line
         bookmaker = event['bookmakers'][0] if event['bookmakers'] else None
         markets = {}
         
@@ -222,5 +826,6 @@ class OddsApiClient:
             'event_name': f"{event['away_team']} @ {event['home_team']}",
             'bookmaker': bookmaker['key'] if bookmaker else None,
             'last_update': bookmaker['last_update'] if bookmaker else None,
-            'markets': markets
+            'markets': markets,
+            'consensus': consensus
         } 
\ No newline at end of file
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from .odds import get_odds_client
+from .odds_breaker import served_stale
+
+logger = logging.getLogger(__name__)
+
+
+def _in_worker_thread(fn):
+    """
+    Run a blocking client call on asgiref's thread pool. The shared client's pooled
+    session, cache, request coalescing and quota tracking are all thread-safe, so
+    concurrent calls share them exactly as sync views do.
+    """
+    def call(*args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            # Pool threads outlive the request; release their DB connections
+            close_old_connections()
+    return sync_to_async(call, thread_sensitive=False)
+
+
+class AsyncOddsApiClient:
+    """
+    asyncio front end for OddsApiClient, for async Django views under ASGI (or WSGI,
+    where Django runs each async view in its own event loop).
+
+    Has the same methods as OddsApiClient plus get_many_sport_events(), which fans
+    out across sports concurrently with at most max_concurrency upstream calls.
+    """
+
+    def __init__(self, client=None, max_concurrency=None):
+        self.client = client or get_odds_client()
+        self.max_concurrency = max_concurrency or getattr(settings, 'ODDS_API_ASYNC_CONCURRENCY', 4)
+
+    async def get_sports(self, all_sports=False):
+        return await _in_worker_thread(self.client.get_sports)(all_sports)
+
+    async def get_sport_events(self, sport_key):
+        return await _in_worker_thread(self.client.get_sport_events)(sport_key)
+
+    async def get_event_odds(self, event_id):
+        return await _in_worker_thread(self.client.get_event_odds)(event_id)
+
+    async def get_sport_events_with_staleness(self, sport_key):
+        """
+        Returns:
+        tuple: (events, fetched_at of the last good snapshot if the API was unavailable, else None)
+        """
+        def call():
+            # Staleness is tracked per thread, so read it on the worker that made the call
+            return self.client.get_sport_events(sport_key), served_stale()
+        return await _in_worker_thread(call)()
+
+    def format_event_for_display(self, event):
+        return self.client.format_event_for_display(event)
+
+    async def get_many_sport_events(self, sport_keys):
+        """
+        Get events for several sports concurrently
+
+        Parameters:
+        sport_keys (list): Keys of the sports to fetch
+
+        Returns:
+        dict: sport_key -> {'events': [...]} or {'error': message} for sports that failed.
+        Sports served from the last good snapshot also have 'stale': True and 'fetched_at'.
+        """
+        # Created per call: a semaphore is bound to the event loop it is first used in
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(sport_key):
+            async with semaphore:
+                try:
+                    events, stale_fetched_at = await self.get_sport_events_with_staleness(sport_key)
+                    if stale_fetched_at is not None:
+                        return sport_key, {'events': events, 'stale': True, 'fetched_at': stale_fetched_at.isoformat()}
+                    return sport_key, {'events': events}
+                except Exception as e:
+                    logger.error(f"Error fetching events for sport {sport_key}: {e}")
+                    return sport_key, {'error': str(e)}
+
+        results = await asyncio.gather(*(fetch(sport_key) for sport_key in dict.fromkeys(sport_keys)))
+        return dict(results)
@@ -0,0 +1,132 @@
+import logging
+import threading
+import time
+
+import requests
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class OddsApiUnavailable(requests.exceptions.RequestException):
+    """Raised without calling upstream while the Odds API circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Fails Odds API calls fast once the upstream looks unhealthy.
+
+    Closed: calls go through. A call that errors, returns 429/5xx, or takes longer
+    than slow_call_seconds counts as a failure; failure_threshold consecutive
+    failures open the breaker.
+
+    Open: calls raise OddsApiUnavailable immediately for reset_seconds.
+
+    Half-open: after reset_seconds a single probe call is let through while others
+    keep failing fast. A healthy probe closes the breaker, a failed one re-opens it.
+    Only the probe can: calls that started before the breaker opened and finish
+    after it are ignored.
+
+    State is per worker process, like the connection pool.
+    """
+
+    def __init__(self, failure_threshold=None, slow_call_seconds=None, reset_seconds=None):
+        self.failure_threshold = failure_threshold or getattr(settings, 'ODDS_API_BREAKER_FAILURE_THRESHOLD', 5)
+        self.slow_call_seconds = slow_call_seconds or getattr(settings, 'ODDS_API_BREAKER_SLOW_CALL_SECONDS', 5)
+        self.reset_seconds = reset_seconds or getattr(settings, 'ODDS_API_BREAKER_RESET_SECONDS', 30)
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+        self.times_opened = 0
+        self.short_circuited = 0
+
+    def before_call(self):
+        """
+        Claim permission to call upstream
+
+        Returns:
+        bool: Whether this call is the half-open probe; pass it to record_success/record_failure
+
+        Raises:
+        OddsApiUnavailable: While open, or half-open with a probe already in flight
+        """
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = HALF_OPEN
+                logger.info("Odds API circuit half-open, probing upstream")
+            if self.state == CLOSED:
+                return False
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.short_circuited += 1
+            retry_in = max(0, self.reset_seconds - (time.monotonic() - self.opened_at))
+        raise OddsApiUnavailable(f"Odds API circuit is open, retrying upstream in {retry_in:.0f}s")
+
+    def record_success(self, elapsed, probe=False):
+        """Record a completed call; slow calls count as failures"""
+        if elapsed > self.slow_call_seconds:
+            logger.warning(f"Odds API call took {elapsed:.1f}s")
+            self.record_failure(probe)
+            return
+        with self._lock:
+            if self.state != CLOSED and not probe:
+                return  # Started before the breaker opened
+            if self.state != CLOSED:
+                logger.info("Odds API circuit closed, upstream recovered")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self, probe=False):
+        with self._lock:
+            if self.state != CLOSED and not probe:
+                return  # Started before the breaker opened
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.times_opened += 1
+                    logger.warning(
+                        f"Odds API circuit opened after {self.consecutive_failures} consecutive failures, "
+                        f"failing fast for {self.reset_seconds}s"
+                    )
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def is_open(self):
+        with self._lock:
+            return self.state == OPEN and time.monotonic() - self.opened_at < self.reset_seconds
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'times_opened': self.times_opened,
+                'short_circuited': self.short_circuited,
+            }
+
+
+breaker = CircuitBreaker()
+
+_served = threading.local()
+
+
+def mark_served(stale_fetched_at=None):
+    """Remember, for the current thread, whether the last Odds API read was a stale fallback"""
+    _served.stale_fetched_at = stale_fetched_at
+
+
+def served_stale():
+    """
+    When the current thread's last Odds API read fell back to an old snapshot,
+    the time that snapshot was fetched; otherwise None
+    """
+    return getattr(_served, 'stale_fetched_at', None)
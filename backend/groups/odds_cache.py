@@ -0,0 +1,204 @@
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OddsApiSnapshot
+from .odds_quota import quota
+
+logger = logging.getLogger(__name__)
+
+def make_key(endpoint, sport_key=None, regions=None, markets=None, odds_format=None, **extra):
+    """
+    Build the cache key for an Odds API request
+
+    Parameters:
+    endpoint (str): Logical endpoint name, e.g. 'sports' or 'sport_events'
+    sport_key (str): Sport the request is scoped to, if any
+    regions (str): Comma separated bookmaker regions
+    markets (str): Comma separated markets
+    odds_format (str): 'american' or 'decimal'
+    extra: Any other parameters that change the response
+
+    Returns:
+    str: A key unique to the combination of parameters
+    """
+    parts = [endpoint, sport_key or '-', regions or '-', markets or '-', odds_format or '-']
+    parts.extend(f'{name}={extra[name]}' for name in sorted(extra))
+    return ':'.join(str(part) for part in parts)
+
+
+class OddsApiQuotaExhausted(Exception):
+    """Raised when a response is needed but the Odds API quota is used up"""
+
+
+def ttl_for(endpoint):
+    """
+    Fresh lifetime in seconds for an endpoint, from the ODDS_API_CACHE_TTLS setting;
+    endpoints it does not list get the 'sport_events' TTL. TTLs are stretched while
+    the Odds API quota is running low.
+    """
+    ttls = settings.ODDS_API_CACHE_TTLS
+    return ttls.get(endpoint, ttls['sport_events']) * quota.ttl_factor()
+
+
+class OddsCache:
+    """
+    TTL cache for Odds API responses backed by the OddsApiSnapshot table, so every
+    gunicorn worker shares the same entries.
+
+    Entries younger than their TTL are served directly. Entries past their TTL but
+    inside the stale window are served as-is while exactly one worker, holding a
+    lease on the row, refreshes them in a background thread. Anything older, or
+    missing, is fetched synchronously.
+
+    While the quota is low, background and non-essential refreshes are refused and
+    any cached copy, however old, is served instead of spending a request.
+    """
+
+    def __init__(self):
+        self.stale_seconds = getattr(settings, 'ODDS_API_CACHE_STALE_SECONDS', 60 * 60)
+        self.lease_seconds = getattr(settings, 'ODDS_API_CACHE_LEASE_SECONDS', 30)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.background_refreshes = 0
+        self.polled_refreshes = 0
+
+    def get_or_fetch(self, endpoint, key, fetch, essential=True):
+        """
+        Return the cached payload for key, calling fetch() when it must be refreshed
+
+        Parameters:
+        endpoint (str): Logical endpoint name used to pick the TTL
+        key (str): Cache key from make_key()
+        fetch (callable): Returns a fresh JSON-serialisable payload
+        essential (bool): False for refreshes nobody is waiting on, such as polling;
+            these are skipped while the quota is low
+
+        Returns:
+        The cached or freshly fetched payload (None for a refused non-essential miss)
+        """
+        now = timezone.now()
+        entry = OddsApiSnapshot.objects.filter(cache_key=key).first()
+        budget_low = quota.is_low()
+
+        if entry is not None:
+            age = (now - entry.fetched_at).total_seconds()
+            ttl = ttl_for(endpoint)
+            if age < ttl:
+                self._count('hits')
+                return entry.payload
+            if budget_low or age < ttl + self.stale_seconds * quota.ttl_factor():
+                self._count('stale_hits')
+                if budget_low:
+                    quota.refuse_refresh()
+                elif self._acquire_lease(entry, now):
+                    self._refresh_in_background(endpoint, key, fetch)
+                return entry.payload
+
+        if not essential and budget_low:
+            quota.refuse_refresh()
+            return None
+        if quota.is_exhausted():
+            raise OddsApiQuotaExhausted("Odds API quota exhausted and no cached data is available")
+
+        self._count('misses')
+        payload = fetch()
+        self.store(endpoint, key, payload)
+        return payload
+
+    def refresh(self, endpoint, key, fetch):
+        """
+        Fetch and store a payload now, regardless of its age. Used by the background
+        poller, so it is treated as non-essential and skipped while the quota is low.
+
+        Returns:
+        The fresh payload, or None if the refresh was refused
+        """
+        if quota.is_low():
+            quota.refuse_refresh()
+            return None
+        payload = fetch()
+        self.store(endpoint, key, payload)
+        self._count('polled_refreshes')
+        return payload
+
+    def fetched_at(self, keys):
+        """Map each cached key in keys to the time it was last fetched"""
+        return dict(OddsApiSnapshot.objects.filter(cache_key__in=keys).values_list('cache_key', 'fetched_at'))
+
+    def get_fresh(self, endpoint, key):
+        """Return the cached payload for key if it is still within its TTL, or None"""
+        entry = OddsApiSnapshot.objects.filter(cache_key=key).first()
+        if entry is None or (timezone.now() - entry.fetched_at).total_seconds() >= ttl_for(endpoint):
+            return None
+        self._count('hits')
+        return entry.payload
+
+    def peek(self, key):
+        """Return the cached payload for key regardless of age, or None"""
+        entry = OddsApiSnapshot.objects.filter(cache_key=key).only('payload').first()
+        return entry.payload if entry is not None else None
+
+    def last_good(self, key):
+        """Return (payload, fetched_at) for the stored copy of key however old, or None"""
+        entry = OddsApiSnapshot.objects.filter(cache_key=key).only('payload', 'fetched_at').first()
+        return (entry.payload, entry.fetched_at) if entry is not None else None
+
+    def store(self, endpoint, key, payload):
+        """Write a freshly fetched payload and release any refresh lease"""
+        OddsApiSnapshot.objects.update_or_create(
+            cache_key=key,
+            defaults={
+                'endpoint': endpoint,
+                'payload': payload,
+                'fetched_at': timezone.now(),
+                'refresh_lease_until': None,
+            }
+        )
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'background_refreshes': self.background_refreshes,
+                'polled_refreshes': self.polled_refreshes,
+            }
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _acquire_lease(self, entry, now):
+        """Atomically claim the right to refresh an entry; only one worker wins"""
+        claimed = OddsApiSnapshot.objects.filter(
+            pk=entry.pk
+        ).filter(
+            Q(refresh_lease_until__isnull=True) | Q(refresh_lease_until__lt=now)
+        ).update(refresh_lease_until=now + timedelta(seconds=self.lease_seconds))
+        return claimed == 1
+
+    def _refresh_in_background(self, endpoint, key, fetch):
+        def refresh():
+            try:
+                self.store(endpoint, key, fetch())
+                self._count('background_refreshes')
+            except Exception as e:
+                # Leave the lease to expire so another worker can retry later
+                logger.warning(f"Background refresh failed for {key}: {e}")
+            finally:
+                # The thread opened its own DB connection
+                connection.close()
+
+        threading.Thread(target=refresh, name=f'odds-refresh:{key}', daemon=True).start()
+
+
+odds_cache = OddsCache()
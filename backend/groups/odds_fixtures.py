@@ -0,0 +1,405 @@
+"""
+Recorded Odds API fixtures and a stand-in server that replays them.
+
+Fixtures are stored as JSON files mirroring the API path under a fixture directory:
+
+    <dir>/sports.json
+    <dir>/sports/<sport_key>/odds.json
+    <dir>/sports/upcoming/odds.json
+    <dir>/sports/<sport_key>/events/<event_id>/odds.json
+    <dir>/sports/<sport_key>/scores.json
+
+OddsApiClient writes this layout when ODDS_API_FIXTURE_MODE is 'record' and reads
+it instead of the network when it is 'replay'. The fake_odds_api command serves
+the same layout over HTTP, synthesising data for anything not recorded.
+"""
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = '/v4/'
+
+
+def fixture_path(fixture_dir, url_path):
+    """
+    Where the fixture for an API path lives
+
+    Parameters:
+    fixture_dir (str): Root fixture directory
+    url_path (str): Request path or URL, e.g. /v4/sports/basketball_nba/odds
+
+    Returns:
+    str: Path of the JSON fixture file
+    """
+    path = urlsplit(url_path).path
+    if path.startswith(API_PREFIX):
+        path = path[len(API_PREFIX):]
+    path = path.strip('/')
+    parts = [part for part in path.split('/') if part not in ('', '.', '..')]
+    if not parts:
+        raise ValueError(f"Not an Odds API path: {url_path}")
+    return os.path.join(fixture_dir, *parts) + '.json'
+
+
+def save_fixture(fixture_dir, url, body):
+    """Record a response body under fixture_dir"""
+    path = fixture_path(fixture_dir, url)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(body)
+    logger.debug(f"Recorded Odds API fixture {path}")
+
+
+def record_stream(fixture_dir, url, response):
+    """
+    Record a streamed response body as the caller reads it
+
+    Wraps response.iter_content() so each chunk is also written to a temporary
+    file beside the fixture, which replaces the fixture once the body has been
+    read to the end. A body that is only partly read is not recorded.
+
+    Parameters:
+    fixture_dir (str): Root fixture directory
+    url (str): Request URL
+    response (requests.Response): Response opened with stream=True
+
+    Returns:
+    requests.Response: The same response
+    """
+    path = fixture_path(fixture_dir, url)
+    iter_content = response.iter_content
+
+    def recording_iter_content(chunk_size=1, decode_unicode=False):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        partial = f'{path}.{os.getpid()}.{threading.get_ident()}.part'
+        try:
+            with open(partial, 'wb') as f:
+                for chunk in iter_content(chunk_size=chunk_size, decode_unicode=decode_unicode):
+                    f.write(chunk.encode() if isinstance(chunk, str) else chunk)
+                    yield chunk
+            os.replace(partial, path)
+            logger.debug(f"Recorded Odds API fixture {path}")
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+    response.iter_content = recording_iter_content
+    return response
+
+
+def load_fixture_response(fixture_dir, url):
+    """
+    Build a requests.Response from a recorded fixture, with no network access
+
+    Returns:
+    requests.Response: 200 with the fixture body, or 404 if nothing was recorded
+    """
+    response = requests.Response()
+    response.url = url
+    response.headers['Content-Type'] = 'application/json'
+    path = fixture_path(fixture_dir, url)
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            response._content = f.read()
+        response.status_code = 200
+        response.reason = 'OK'
+    else:
+        response._content = json.dumps({'message': f'No fixture recorded for {urlsplit(url).path}'}).encode()
+        response.status_code = 404
+        response.reason = 'Not Found'
+    response._content_consumed = True  # There is no raw stream; iter_content() serves _content
+    return response
+
+
+def _american_price(rng):
+    price = rng.randint(-250, 250)
+    if -100 < price < 100:
+        price = 100 if price >= 0 else -110
+    return price
+
+
+def synthetic_events(sport_key, count, bookmakers, seed=0):
+    """
+    Generate plausible odds events for load testing
+
+    Parameters:
+    sport_key (str): Sport the events belong to
+    count (int): Number of events
+    bookmakers (int): Bookmakers per event, which drives payload size
+    seed (int): Vary to move prices between polls
+
+    Returns:
+    list: Events in the /v4/sports/{sport}/odds response shape
+    """
+    rng = random.Random(f'{sport_key}:{seed}')
+    start = datetime.now(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+    last_update = datetime.now(dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    events = []
+    for i in range(count):
+        home, away = f'{sport_key} Home {i}', f'{sport_key} Away {i}'
+        spread = rng.choice([1.5, 2.5, 3.5, 6.5, 7.5])
+        total = rng.choice([41.5, 44.5, 210.5, 8.5, 5.5])
+        books = []
+        for b in range(bookmakers):
+            books.append({
+                'key': f'book{b}',
+                'title': f'Book {b}',
+                'last_update': last_update,
+                'markets': [
+                    {'key': 'h2h', 'last_update': last_update, 'outcomes': [
+                        {'name': home, 'price': _american_price(rng)},
+                        {'name': away, 'price': _american_price(rng)},
+                    ]},
+                    {'key': 'spreads', 'last_update': last_update, 'outcomes': [
+                        {'name': home, 'price': -110, 'point': -spread},
+                        {'name': away, 'price': -110, 'point': spread},
+                    ]},
+                    {'key': 'totals', 'last_update': last_update, 'outcomes': [
+                        {'name': 'Over', 'price': -110, 'point': total},
+                        {'name': 'Under', 'price': -110, 'point': total},
+                    ]},
+                ],
+            })
+        events.append({
+            'id': f'{sport_key}-{i:05d}',
+            'sport_key': sport_key,
+            'sport_title': sport_key,
+            'commence_time': (start + timedelta(hours=i % 72)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'home_team': home,
+            'away_team': away,
+            'bookmakers': books,
+        })
+    return events
+
+
+# Plausible final score range per sport key prefix
+SCORE_RANGES = {
+    'americanfootball': (3, 45),
+    'baseball': (0, 12),
+    'basketball': (85, 130),
+    'icehockey': (0, 7),
+    'soccer': (0, 4),
+}
+
+
+def synthetic_scores(sport_key, event_ids, pending_rate=0.0):
+    """
+    Generate a scores feed for settlement testing
+
+    Each game's score is fixed by its ID, so repeated polls agree. Events from
+    synthetic_events() keep their team names; any other ID gets 'Home Team' and
+    'Away Team'.
+
+    Parameters:
+    sport_key (str): Sport the games belong to
+    event_ids (list): Games to report
+    pending_rate (float): Fraction of games reported as not final, re-rolled per call
+
+    Returns:
+    list: Games in the /v4/sports/{sport}/scores response shape
+    """
+    low, high = SCORE_RANGES.get(sport_key.split('_')[0], (0, 10))
+    last_update = datetime.now(dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    games = []
+    for event_id in event_ids:
+        prefix, _, number = event_id.rpartition('-')
+        if prefix == sport_key and number.isdigit():
+            home, away = f'{sport_key} Home {int(number)}', f'{sport_key} Away {int(number)}'
+        else:
+            home, away = 'Home Team', 'Away Team'
+        rng = random.Random(event_id)
+        completed = random.random() >= pending_rate
+        games.append({
+            'id': event_id,
+            'sport_key': sport_key,
+            'sport_title': sport_key,
+            'commence_time': (datetime.now(dt_timezone.utc) - timedelta(hours=4)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'completed': completed,
+            'home_team': home,
+            'away_team': away,
+            'scores': [
+                {'name': home, 'score': str(rng.randint(low, high))},
+                {'name': away, 'score': str(rng.randint(low, high))},
+            ] if completed else None,
+            'last_update': last_update,
+        })
+    return games
+
+
+SYNTHETIC_SPORTS = [
+    {'key': 'americanfootball_nfl', 'group': 'American Football', 'title': 'NFL', 'description': 'US Football', 'active': True, 'has_outrights': False},
+    {'key': 'basketball_nba', 'group': 'Basketball', 'title': 'NBA', 'description': 'US Basketball', 'active': True, 'has_outrights': False},
+    {'key': 'baseball_mlb', 'group': 'Baseball', 'title': 'MLB', 'description': 'Major League Baseball', 'active': True, 'has_outrights': False},
+    {'key': 'icehockey_nhl', 'group': 'Ice Hockey', 'title': 'NHL', 'description': 'US Ice Hockey', 'active': True, 'has_outrights': False},
+    {'key': 'soccer_epl', 'group': 'Soccer', 'title': 'EPL', 'description': 'Premier League', 'active': True, 'has_outrights': False},
+]
+
+
+class FakeOddsApi:
+    """
+    Behaviour of the stand-in server: where fixtures come from, how slow and how
+    unreliable it is, and the quota it reports.
+    """
+
+    def __init__(self, fixture_dir=None, latency_ms=0, jitter_ms=0, error_rate=0.0, error_status=503,
+                 events_per_sport=20, bookmakers=5, quota=20000, reprice_seconds=60, scores_pending_rate=0.2):
+        self.fixture_dir = fixture_dir
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.events_per_sport = events_per_sport
+        self.bookmakers = bookmakers
+        self.reprice_seconds = reprice_seconds
+        self.scores_pending_rate = scores_pending_rate
+        self._lock = threading.Lock()
+        self.remaining = quota
+        self.used = 0
+        self.requests = 0
+
+    def respond(self, path):
+        """
+        Produce (status, body, headers) for a request path
+        """
+        with self._lock:
+            self.requests += 1
+        delay = self.latency_ms + (random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay:
+            time.sleep(delay / 1000.0)
+
+        if self.error_rate and random.random() < self.error_rate:
+            return self.error_status, {'message': 'Injected failure'}, {}
+
+        body = self._fixture(path)
+        if body is None:
+            body = self._synthesise(path)
+        if body is None:
+            return 404, {'message': f'Unknown path {path}'}, {}
+
+        cost = self._cost(path)
+        with self._lock:
+            self.remaining -= cost
+            self.used += cost
+            headers = {
+                'x-requests-remaining': str(self.remaining),
+                'x-requests-used': str(self.used),
+                'x-requests-last': str(cost),
+            }
+        return 200, body, headers
+
+    def _cost(self, path):
+        """Quota credits a request uses, following the Odds API's pricing"""
+        url = urlsplit(path)
+        if url.path.rstrip('/') == '/v4/sports':
+            return 0
+        query = parse_qs(url.query)
+        if url.path.rstrip('/').endswith('/scores'):
+            return 2 if 'daysFrom' in query else 1
+        if url.path.rstrip('/').endswith('/odds'):
+            # One credit per market per region; every 10 bookmakers count as a region
+            markets = len(_query_list(query, 'markets')) or 1
+            bookmakers = _query_list(query, 'bookmakers')
+            regions = math.ceil(len(bookmakers) / 10) if bookmakers else len(_query_list(query, 'regions')) or 1
+            return markets * regions
+        return 1
+
+    def _fixture(self, path):
+        if not self.fixture_dir:
+            return None
+        try:
+            file_path = fixture_path(self.fixture_dir, path)
+        except ValueError:
+            return None
+        if not os.path.exists(file_path):
+            return None
+        with open(file_path, 'rb') as f:
+            return f.read()
+
+    def _synthesise(self, path):
+        url = urlsplit(path)
+        parts = url.path.strip('/').split('/')
+        if parts[:2] != ['v4', 'sports']:
+            return None
+        seed = int(time.time() // self.reprice_seconds) if self.reprice_seconds else 0
+        if len(parts) == 2:
+            return SYNTHETIC_SPORTS
+        if len(parts) == 4 and parts[3] == 'scores':
+            event_ids = [event_id for value in parse_qs(url.query).get('eventIds', []) for event_id in value.split(',') if event_id]
+            if not event_ids:
+                event_ids = [event['id'] for event in synthetic_events(parts[2], self.events_per_sport, 0)]
+            return synthetic_scores(parts[2], event_ids, self.scores_pending_rate)
+        query = parse_qs(url.query)
+        if len(parts) == 4 and parts[3] in ('odds', 'events'):
+            if parts[2] == 'upcoming':
+                events = []
+                for sport in SYNTHETIC_SPORTS:
+                    events.extend(synthetic_events(sport['key'], self.events_per_sport, self.bookmakers, seed))
+            else:
+                events = synthetic_events(parts[2], self.events_per_sport, self.bookmakers, seed)
+            return [_select(event, query) for event in events]
+        if len(parts) == 6 and parts[3] == 'events' and parts[5] == 'odds':
+            for event in synthetic_events(parts[2], self.events_per_sport, self.bookmakers, seed):
+                if event['id'] == parts[4]:
+                    return _select(event, query)
+        return None
+
+
+def _query_list(query, name):
+    """Values of a comma separated query parameter"""
+    return [item for value in query.get(name, []) for item in value.split(',') if item]
+
+
+def _select(event, query):
+    """Trim a synthetic event to the markets and bookmakers a request asked for"""
+    markets = set(_query_list(query, 'markets'))
+    bookmakers = set(_query_list(query, 'bookmakers'))
+    books = []
+    for book in event['bookmakers']:
+        if bookmakers and book['key'] not in bookmakers:
+            continue
+        if markets:
+            book = dict(book, markets=[market for market in book['markets'] if market['key'] in markets])
+        books.append(book)
+    return dict(event, bookmakers=books)
+
+
+def make_handler(api):
+    """Build a request handler class bound to a FakeOddsApi"""
+
+    class FakeOddsApiHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep-alive, so connection pooling can be measured
+
+        def do_GET(self):
+            status, body, headers = api.respond(self.path)
+            if not isinstance(body, (bytes, bytearray)):
+                body = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(f"fake odds api: {format % args}")
+
+    return FakeOddsApiHandler
+
+
+def make_server(api, host='127.0.0.1', port=8765):
+    """Create (but do not start) a threaded HTTP server for a FakeOddsApi"""
+    server = ThreadingHTTPServer((host, port), make_handler(api))
+    server.daemon_threads = True
+    return server
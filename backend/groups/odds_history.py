@@ -0,0 +1,99 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import OddsPriceChange
+
+logger = logging.getLogger(__name__)
+
+
+def _flatten(events):
+    """
+    Map every priced outcome in a list of events to its (price, point)
+
+    Returns:
+    dict: (event_id, bookmaker, market, outcome) -> (price, point)
+    """
+    prices = {}
+    for event in events or []:
+        for bookmaker in event.get('bookmakers') or []:
+            for market in bookmaker.get('markets') or []:
+                for outcome in market.get('outcomes') or []:
+                    if outcome.get('price') is None:
+                        continue
+                    key = (event['id'], bookmaker['key'], market['key'], outcome['name'])
+                    prices[key] = (float(outcome['price']), outcome.get('point'))
+    return prices
+
+
+def record_changes(previous_events, current_events, recorded_at=None):
+    """
+    Store the prices in current_events that differ from previous_events
+
+    Parameters:
+    previous_events (list): The last snapshot of the sport's events, or None
+    current_events (list): The snapshot just fetched
+    recorded_at (datetime): When current_events was fetched, defaults to now
+
+    Returns:
+    int: Number of price changes written
+    """
+    recorded_at = recorded_at or timezone.now()
+    before = _flatten(previous_events)
+    rows = [
+        OddsPriceChange(
+            event_id=event_id,
+            bookmaker=bookmaker,
+            market=market,
+            outcome=outcome,
+            price=price,
+            point=point,
+            recorded_at=recorded_at,
+        )
+        for (event_id, bookmaker, market, outcome), (price, point) in _flatten(current_events).items()
+        if before.get((event_id, bookmaker, market, outcome)) != (price, point)
+    ]
+    if rows:
+        OddsPriceChange.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def price_history(event_id, since=None, until=None):
+    """
+    Price movements for an event, grouped into one series per outcome
+
+    Parameters:
+    event_id (str): Odds API event ID
+    since (datetime): Only include changes at or after this time
+    until (datetime): Only include changes at or before this time
+
+    Returns:
+    list: One dict per (bookmaker, market, outcome) with its ordered changes
+    """
+    changes = OddsPriceChange.objects.filter(event_id=event_id)
+    if since is not None:
+        changes = changes.filter(recorded_at__gte=since)
+    if until is not None:
+        changes = changes.filter(recorded_at__lte=until)
+
+    series = {}
+    for bookmaker, market, outcome, price, point, recorded_at in changes.order_by('recorded_at').values_list(
+        'bookmaker', 'market', 'outcome', 'price', 'point', 'recorded_at'
+    ):
+        key = (bookmaker, market, outcome)
+        if key not in series:
+            series[key] = {'bookmaker': bookmaker, 'market': market, 'outcome': outcome, 'points': []}
+        series[key]['points'].append({'time': recorded_at, 'price': price, 'point': point})
+    return list(series.values())
+
+
+def prune(retention_days=None):
+    """Delete price changes older than ODDS_HISTORY_RETENTION_DAYS. Returns rows deleted."""
+    retention_days = retention_days or getattr(settings, 'ODDS_HISTORY_RETENTION_DAYS', 180)
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    deleted, _ = OddsPriceChange.objects.filter(recorded_at__lt=cutoff).delete()
+    if deleted:
+        logger.info(f"Pruned {deleted} odds price changes older than {retention_days} days")
+    return deleted
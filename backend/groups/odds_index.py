@@ -0,0 +1,166 @@
+import logging
+import threading
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import LeagueEvent, OddsEventIndex
+
+logger = logging.getLogger(__name__)
+
+
+def event_last_update(event):
+    """Latest last_update across an event's bookmakers, or '' if it has none"""
+    return max((bookmaker.get('last_update') or '' for bookmaker in event.get('bookmakers') or []), default='')
+
+
+class EventIndex:
+    """
+    Lookup from Odds API event ID to sport key.
+
+    Entries are kept in the OddsEventIndex table so every worker benefits from a
+    sport fetch made by any other, with a bounded in-process dict in front of it.
+    LeagueEvent rows are used as a fallback for events posted before they were
+    ever seen in a fetch.
+    """
+
+    def __init__(self, max_local_entries=50000):
+        self.max_local_entries = max_local_entries
+        self._local = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, event_id):
+        """
+        Find the sport an event belongs to
+
+        Parameters:
+        event_id (str): Odds API event ID
+
+        Returns:
+        str: The sport key, or None if the event has never been seen
+        """
+        sport_key = self._local.get(event_id)
+        if sport_key:
+            return sport_key
+
+        sport_key = OddsEventIndex.objects.filter(event_id=event_id).values_list('sport_key', flat=True).first()
+        if not sport_key:
+            sport_key = LeagueEvent.objects.filter(
+                event_id=event_id
+            ).exclude(sport='').values_list('sport', flat=True).first()
+            if sport_key:
+                OddsEventIndex.objects.update_or_create(event_id=event_id, defaults={'sport_key': sport_key})
+
+        if sport_key:
+            self._remember({event_id: sport_key})
+        return sport_key
+
+    def add_events(self, events):
+        """
+        Record the sport of every event in an Odds API response
+
+        Parameters:
+        events (list): Events with 'id', 'sport_key' and optionally 'commence_time'
+        """
+        rows = [
+            OddsEventIndex(
+                event_id=event['id'],
+                sport_key=event['sport_key'],
+                commence_time=parse_datetime(event['commence_time']) if event.get('commence_time') else None,
+            )
+            for event in events
+            if event.get('id') and event.get('sport_key')
+        ]
+        if not rows:
+            return
+        try:
+            OddsEventIndex.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['event_id'],
+                update_fields=['sport_key', 'commence_time', 'updated_at'],
+            )
+        except Exception as e:
+            # The index is an optimisation; never fail a fetch because of it
+            logger.warning(f"Could not update event index: {e}")
+        self._remember({row.event_id: row.sport_key for row in rows})
+
+    def record_snapshot(self, sport_key, events, at=None):
+        """
+        Index a sport's events and note which changed or disappeared since the last snapshot
+
+        An event has changed when the latest last_update of its bookmakers differs
+        from the one indexed. Events of the sport that are no longer listed are
+        marked removed.
+
+        Parameters:
+        sport_key (str): Sport the snapshot is for
+        events (list): Every event in the sport's feed
+        at (datetime): Time to record the changes at, defaults to now
+        """
+        at = at or timezone.now()
+        current = {event['id']: event_last_update(event) for event in events if event.get('id')}
+        try:
+            known = {
+                event_id: (last_update, removed_at)
+                for event_id, last_update, removed_at in OddsEventIndex.objects.filter(
+                    Q(sport_key=sport_key, removed_at__isnull=True) | Q(event_id__in=list(current))
+                ).values_list('event_id', 'last_update', 'removed_at')
+            }
+            rows = [
+                OddsEventIndex(
+                    event_id=event['id'],
+                    sport_key=event.get('sport_key') or sport_key,
+                    commence_time=parse_datetime(event['commence_time']) if event.get('commence_time') else None,
+                    last_update=current[event['id']],
+                    changed_at=at,
+                    removed_at=None,
+                )
+                for event in events
+                if event.get('id') and known.get(event['id']) != (current[event['id']], None)
+            ]
+            if rows:
+                OddsEventIndex.objects.bulk_create(
+                    rows,
+                    update_conflicts=True,
+                    unique_fields=['event_id'],
+                    update_fields=['sport_key', 'commence_time', 'last_update', 'changed_at', 'removed_at', 'updated_at'],
+                    batch_size=1000,
+                )
+            removed = [event_id for event_id, (_, removed_at) in known.items() if removed_at is None and event_id not in current]
+            if removed:
+                OddsEventIndex.objects.filter(event_id__in=removed).update(removed_at=at)
+            logger.debug(f"Indexed {sport_key}: {len(rows)} changed, {len(removed)} removed")
+        except Exception as e:
+            # The index is an optimisation; never fail a fetch because of it
+            logger.warning(f"Could not update event index for {sport_key}: {e}")
+        self._remember({event_id: sport_key for event_id in current})
+
+    def changes_since(self, sport_key, since):
+        """
+        Events of a sport that changed or were removed after a point in time
+
+        Parameters:
+        sport_key (str): Sport to look at
+        since (datetime): Cursor from a previous response
+
+        Returns:
+        tuple: (set of changed event IDs, list of removed event IDs)
+        """
+        changed = set(OddsEventIndex.objects.filter(
+            sport_key=sport_key, changed_at__gt=since
+        ).values_list('event_id', flat=True))
+        removed = list(OddsEventIndex.objects.filter(
+            sport_key=sport_key, removed_at__gt=since
+        ).values_list('event_id', flat=True))
+        return changed, removed
+
+    def _remember(self, mapping):
+        with self._lock:
+            if len(self._local) + len(mapping) > self.max_local_entries:
+                self._local.clear()
+            self._local.update(mapping)
+
+
+event_index = EventIndex()
@@ -0,0 +1,127 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+from .models import OddsApiQuota
+
+logger = logging.getLogger(__name__)
+
+
+def _header_int(headers, name):
+    value = headers.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class QuotaTracker:
+    """
+    Tracks the Odds API usage quota reported in x-requests-* response headers.
+
+    Every upstream response updates the OddsApiQuota row so all workers see the same
+    budget. Reads are served from memory and re-read from the database at most once
+    every few seconds.
+    """
+
+    def __init__(self):
+        self.low_threshold = getattr(settings, 'ODDS_API_QUOTA_LOW_THRESHOLD', 500)
+        self.ttl_multiplier = getattr(settings, 'ODDS_API_QUOTA_TTL_MULTIPLIER', 4)
+        self.reload_seconds = getattr(settings, 'ODDS_API_QUOTA_RELOAD_SECONDS', 10)
+        self._lock = threading.Lock()
+        self._remaining = None
+        self._used = None
+        self._last_cost = None
+        self._loaded_at = 0.0
+        self.refused_refreshes = 0
+
+    def record(self, headers):
+        """
+        Store the usage reported by an Odds API response
+
+        Parameters:
+        headers (Mapping): Response headers
+        """
+        remaining = _header_int(headers, 'x-requests-remaining')
+        used = _header_int(headers, 'x-requests-used')
+        last_cost = _header_int(headers, 'x-requests-last')
+        if remaining is None and used is None:
+            return
+
+        with self._lock:
+            self._remaining = remaining
+            self._used = used
+            self._last_cost = last_cost
+            self._loaded_at = time.monotonic()
+
+        try:
+            OddsApiQuota.objects.update_or_create(
+                pk=1,
+                defaults={
+                    'requests_remaining': remaining,
+                    'requests_used': used,
+                    'last_request_cost': last_cost,
+                }
+            )
+        except Exception as e:
+            logger.warning(f"Could not persist Odds API quota: {e}")
+
+        if remaining is not None and remaining < self.low_threshold:
+            logger.warning(f"Odds API quota is low: {remaining} requests remaining")
+
+    def remaining(self):
+        """Requests remaining in the current quota period, or None if unknown"""
+        self._reload_if_due()
+        return self._remaining
+
+    def is_low(self):
+        """True when the remaining budget is below ODDS_API_QUOTA_LOW_THRESHOLD"""
+        remaining = self.remaining()
+        return remaining is not None and remaining < self.low_threshold
+
+    def is_exhausted(self):
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def ttl_factor(self):
+        """Multiplier applied to cache TTLs; stretched while the budget is low"""
+        return self.ttl_multiplier if self.is_low() else 1
+
+    def refuse_refresh(self):
+        """Count a refresh that was skipped to save quota"""
+        with self._lock:
+            self.refused_refreshes += 1
+
+    def stats(self):
+        self._reload_if_due()
+        with self._lock:
+            return {
+                'requests_remaining': self._remaining,
+                'requests_used': self._used,
+                'last_request_cost': self._last_cost,
+                'low_threshold': self.low_threshold,
+                'is_low': self._remaining is not None and self._remaining < self.low_threshold,
+                'refused_refreshes': self.refused_refreshes,
+            }
+
+    def _reload_if_due(self):
+        if time.monotonic() - self._loaded_at < self.reload_seconds:
+            return
+        try:
+            row = OddsApiQuota.objects.filter(pk=1).first()
+        except Exception as e:
+            logger.warning(f"Could not load Odds API quota: {e}")
+            return
+        with self._lock:
+            self._loaded_at = time.monotonic()
+            if row is not None:
+                self._remaining = row.requests_remaining
+                self._used = row.requests_used
+                self._last_cost = row.last_request_cost
+
+
+quota = QuotaTracker()
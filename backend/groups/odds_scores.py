@@ -0,0 +1,66 @@
+"""
+Turning Odds API scores into settlement results.
+"""
+from datetime import timedelta
+
+# The scores endpoint only returns games completed up to this many days ago
+SCORES_MAX_DAYS = 3
+
+PENDING = 'pending'    # Not final yet, ask again later
+FINAL = 'final'        # Decided, with a winning outcome
+MANUAL = 'manual'      # Final but cannot be settled automatically
+
+# Rough length of a game, by sport key prefix. Scores are first requested this
+# long after commence_time.
+EXPECTED_DURATION = {
+    'americanfootball': timedelta(hours=3, minutes=15),
+    'baseball': timedelta(hours=3),
+    'basketball': timedelta(hours=2, minutes=15),
+    'icehockey': timedelta(hours=2, minutes=30),
+    'soccer': timedelta(hours=1, minutes=55),
+}
+DEFAULT_DURATION = timedelta(hours=3)
+
+# Sports whose moneyline has a Draw outcome; a tie anywhere else needs a person
+DRAW_SPORT_PREFIXES = ('soccer',)
+
+
+def expected_duration(sport_key):
+    """How long after commence_time a game of this sport is usually over"""
+    return EXPECTED_DURATION.get((sport_key or '').split('_')[0], DEFAULT_DURATION)
+
+
+def decide(game, home_team=None, away_team=None):
+    """
+    Work out the winning outcome of a game from the scores feed
+
+    Parameters:
+    game (dict): Game from /v4/sports/{sport}/scores, or None if it was not returned
+    home_team (str): Home team of the event being settled, to check the feed matches
+    away_team (str): Away team of the event being settled
+
+    Returns:
+    tuple: (PENDING, None), (FINAL, winning outcome name) or (MANUAL, reason)
+    """
+    if not game or not game.get('completed'):
+        return PENDING, None
+
+    scores = {}
+    for entry in game.get('scores') or []:
+        try:
+            scores[entry['name']] = float(entry['score'])
+        except (KeyError, TypeError, ValueError):
+            return MANUAL, f"unreadable score {entry}"
+    if len(scores) != 2:
+        return MANUAL, f"expected two scores, got {len(scores)}"
+
+    teams = {team.lower() for team in (home_team, away_team) if team}
+    if teams and {name.lower() for name in scores} != teams:
+        return MANUAL, f"scores are for {sorted(scores)}, event is {home_team} vs {away_team}"
+
+    (first, first_score), (second, second_score) = scores.items()
+    if first_score == second_score:
+        if (game.get('sport_key') or '').startswith(DRAW_SPORT_PREFIXES):
+            return FINAL, 'Draw'
+        return MANUAL, "tied game"
+    return FINAL, first if first_score > second_score else second
@@ -0,0 +1,159 @@
+"""
+Incremental parsing of Odds API responses.
+
+/v4/sports/{sport}/odds and /v4/sports/upcoming/odds return one JSON array that
+can run to several MB with many bookmakers. iter_json_array() decodes it one
+element at a time from the streamed body, and project_event() keeps only the
+fields the app uses, so a worker never holds the whole body or the unused parts
+of it in memory.
+"""
+import codecs
+import json
+
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+def iter_json_array(chunks):
+    """
+    Yield the elements of a top-level JSON array as they arrive
+
+    Parameters:
+    chunks (iterable): Bytes of the document, in any chunking
+
+    Returns:
+    generator: Each decoded element in order
+
+    Raises:
+    ValueError: If the document is not a JSON array or is malformed
+    """
+    text = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    pos = 0
+    started = finished = False
+    after_element = after_comma = False
+    chunks = iter(chunks)
+    eof = False
+
+    while True:
+        # Skip separators, then decode as many complete elements as the buffer holds
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+            if not started:
+                if char != '[':
+                    raise ValueError(f"Expected a JSON array, got {buffer[pos:pos + 40]!r}")
+                started = True
+                pos += 1
+                continue
+            if finished:
+                raise ValueError(f"Unexpected data after JSON array: {buffer[pos:pos + 40]!r}")
+            if char == ']':
+                if after_comma:
+                    raise ValueError("Trailing comma in JSON array")
+                finished = True
+                pos += 1
+                continue
+            if char == ',':
+                if not after_element:
+                    raise ValueError(f"Missing element in JSON array before {buffer[pos:pos + 40]!r}")
+                after_element, after_comma = False, True
+                pos += 1
+                continue
+            if after_element:
+                raise ValueError(f"Expected ',' or ']' in JSON array, got {buffer[pos:pos + 40]!r}")
+            try:
+                element, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                break  # Element not complete yet
+            if end == len(buffer) and not eof:
+                break  # A number or literal might continue in the next chunk
+            yield element
+            pos = end
+            after_element, after_comma = True, False
+
+        if eof:
+            break
+
+        # Drop what has been consumed so the buffer only ever holds one partial element
+        buffer = buffer[pos:]
+        pos = 0
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+            buffer += text.decode(b'', final=True)
+        elif chunk:
+            buffer += text.decode(chunk)
+
+    if not started or not finished:
+        raise ValueError("Truncated JSON array")
+
+
+def project_event(event, markets=None, bookmakers=None):
+    """
+    Copy only the fields of an Odds API event that the app uses
+
+    Parameters:
+    event (dict): Event as returned by the Odds API
+    markets (set): Market keys to keep, or None for all
+    bookmakers (set): Bookmaker keys to keep, or None for all
+
+    Returns:
+    dict: id, sport_key, sport_title, commence_time, teams and the selected
+    bookmakers with their selected markets
+    """
+    projected_books = []
+    for bookmaker in event.get('bookmakers') or []:
+        if bookmakers is not None and bookmaker['key'] not in bookmakers:
+            continue
+        # Market and outcome dicts are already minimal and freshly parsed, so they
+        # are kept as they are rather than copied
+        projected_markets = [
+            market for market in bookmaker.get('markets') or []
+            if markets is None or market['key'] in markets
+        ]
+        projected_books.append({
+            'key': bookmaker['key'],
+            'title': bookmaker.get('title'),
+            'last_update': bookmaker.get('last_update'),
+            'markets': projected_markets,
+        })
+    return {
+        'id': event['id'],
+        'sport_key': event['sport_key'],
+        'sport_title': event.get('sport_title'),
+        'commence_time': event['commence_time'],
+        'home_team': event.get('home_team'),
+        'away_team': event.get('away_team'),
+        'bookmakers': projected_books,
+    }
+
+
+def iter_events(response, markets=None, bookmakers=None):
+    """
+    Stream and project the events of an Odds API array response
+
+    Parameters:
+    response (requests.Response): Response opened with stream=True
+    markets (set): Market keys to keep, or None for all
+    bookmakers (set): Bookmaker keys to keep, or None for all
+
+    Returns:
+    generator: Projected events
+    """
+    for event in iter_json_array(response.iter_content(chunk_size=CHUNK_SIZE)):
+        yield project_event(event, markets, bookmakers)
+
+
+def selection(value):
+    """Turn a comma separated selection such as 'h2h,spreads' into a set, or None for all"""
+    if not value:
+        return None
+    return {part.strip() for part in value.split(',') if part.strip()}
@@ -0,0 +1,206 @@
+"""
+Cross-bookmaker pricing for Odds API events.
+
+Every (event, market, outcome) quoted by any bookmaker becomes one row of a
+price matrix with one column per bookmaker, so a whole sport's snapshot is
+priced in a single vectorized pass:
+
+    best price      highest decimal price on offer, and the book offering it
+    consensus       median price and median line (point) across books
+    implied prob.   1 / consensus decimal price
+    fair odds       implied probabilities normalised within each market so they
+                    sum to 1, i.e. with the bookmakers' margin (vig) removed
+"""
+import logging
+import warnings
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def to_decimal(prices, odds_format='american'):
+    """
+    Convert prices to decimal odds
+
+    Parameters:
+    prices (ndarray): Prices in odds_format, NaN where not quoted
+    odds_format (str): 'american' or 'decimal'
+
+    Returns:
+    ndarray: Decimal odds, NaN where not quoted
+    """
+    if odds_format == 'decimal':
+        return prices
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(prices > 0, 1 + prices / 100.0, 1 + 100.0 / -prices)
+
+
+def from_decimal(decimal, odds_format='american'):
+    """Convert decimal odds back to odds_format; american prices are rounded to whole numbers"""
+    if odds_format == 'decimal':
+        return np.round(decimal, 3)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.round(np.where(decimal >= 2, (decimal - 1) * 100.0, -100.0 / (decimal - 1)))
+
+
+def pack_events(events):
+    """
+    Lay out every bookmaker quote in a list of events as price/point matrices
+
+    Parameters:
+    events (list): Events in the Odds API response shape
+
+    Returns:
+    dict: prices and points (rows x bookmakers, NaN where a book has no quote),
+    plus row labels (event index, market, outcome name), each row's market group,
+    and the bookmaker key of each column
+    """
+    rows = {}
+    groups = {}
+    books = {}
+    row_idx, book_idx, prices, points = [], [], [], []
+
+    for e, event in enumerate(events):
+        for bookmaker in event.get('bookmakers') or []:
+            b = books.setdefault(bookmaker['key'], len(books))
+            for market in bookmaker.get('markets') or []:
+                for outcome in market.get('outcomes') or []:
+                    if outcome.get('price') is None:
+                        continue
+                    row_idx.append(rows.setdefault((e, market['key'], outcome['name']), len(rows)))
+                    book_idx.append(b)
+                    prices.append(outcome['price'])
+                    points.append(outcome.get('point', np.nan))
+
+    labels = list(rows)
+    price_matrix = np.full((len(rows), len(books)), np.nan)
+    point_matrix = np.full((len(rows), len(books)), np.nan)
+    if row_idx:
+        price_matrix[row_idx, book_idx] = prices
+        point_matrix[row_idx, book_idx] = np.asarray(points, dtype=float)
+
+    group = np.fromiter(
+        (groups.setdefault((e, market), len(groups)) for e, market, _ in labels),
+        dtype=np.intp,
+        count=len(labels),
+    )
+    return {
+        'prices': price_matrix,
+        'points': point_matrix,
+        'labels': labels,
+        'group': group,
+        'group_labels': list(groups),
+        'bookmakers': list(books),
+    }
+
+
+def compute(packed, odds_format='american'):
+    """
+    Best price, consensus and vig-free fair odds for every row of a packed snapshot
+
+    Parameters:
+    packed (dict): Output of pack_events
+    odds_format (str): Format of the packed prices, also used for the results
+
+    Returns:
+    dict: One array per statistic, aligned with packed['labels'], plus the
+    overround (sum of implied probabilities) of each market group
+    """
+    prices, points, group = packed['prices'], packed['points'], packed['group']
+    quoted = ~np.isnan(prices)
+    decimal = to_decimal(prices, odds_format)
+
+    best_col = np.argmax(np.where(quoted, decimal, -np.inf), axis=1)
+    rows = np.arange(len(prices))
+
+    with warnings.catch_warnings():
+        # Rows without any point (h2h) have an all-NaN median, which is what we want
+        warnings.simplefilter('ignore', RuntimeWarning)
+        consensus_decimal = np.nanmedian(decimal, axis=1)
+        consensus_point = np.nanmedian(points, axis=1)
+
+    implied = 1.0 / consensus_decimal
+    overround = np.bincount(group, weights=implied, minlength=len(packed['group_labels']))
+    fair_probability = implied / overround[group]
+
+    return {
+        'books': quoted.sum(axis=1),
+        'best_price': prices[rows, best_col],
+        'best_col': best_col,
+        'consensus_price': from_decimal(consensus_decimal, odds_format),
+        'consensus_point': consensus_point,
+        'implied_probability': implied,
+        'fair_probability': fair_probability,
+        'fair_price': from_decimal(1.0 / fair_probability, odds_format),
+        'overround': overround,
+    }
+
+
+def _none_if_nan(values):
+    return [None if v != v else v for v in values]
+
+
+def consensus_for_events(events, odds_format='american'):
+    """
+    Price every outcome of every event across all of its bookmakers
+
+    Parameters:
+    events (list): Events in the Odds API response shape
+    odds_format (str): Format of the event prices
+
+    Returns:
+    list: One dict per event, market key -> {'overround': float, 'outcomes': [...]}
+    """
+    result = [{} for _ in events]
+    packed = pack_events(events)
+    if not packed['labels']:
+        return result
+    stats = compute(packed, odds_format)
+
+    for (e, market_key), overround in zip(packed['group_labels'], np.round(stats['overround'], 4).tolist()):
+        result[e][market_key] = {'overround': overround, 'outcomes': []}
+
+    bookmakers = np.asarray(packed['bookmakers'], dtype=object)[stats['best_col']].tolist()
+    price_type = int if odds_format == 'american' else float
+    columns = zip(
+        packed['labels'],
+        stats['books'].tolist(),
+        stats['best_price'].astype(price_type).tolist(),
+        bookmakers,
+        stats['consensus_price'].astype(price_type).tolist(),
+        _none_if_nan(stats['consensus_point'].tolist()),
+        np.round(stats['implied_probability'], 4).tolist(),
+        np.round(stats['fair_probability'], 4).tolist(),
+        stats['fair_price'].astype(price_type).tolist(),
+    )
+    for (e, market_key, name), books, best, best_book, price, point, implied, fair_prob, fair_price in columns:
+        result[e][market_key]['outcomes'].append({
+            'name': name,
+            'books': books,
+            'best_price': best,
+            'best_bookmaker': best_book,
+            'consensus_price': price,
+            'consensus_point': point,
+            'implied_probability': implied,
+            'fair_probability': fair_prob,
+            'fair_price': fair_price,
+        })
+    return result
+
+
+def attach_consensus(events, odds_format='american'):
+    """
+    Add a 'consensus' entry to each event in place
+
+    Pricing is best effort: if it fails the events are returned without it.
+
+    Returns:
+    list: The same events
+    """
+    try:
+        for event, consensus in zip(events, consensus_for_events(events, odds_format)):
+            event['consensus'] = consensus
+    except Exception as e:
+        logger.warning(f"Could not compute consensus prices for {len(events)} events: {e}")
+    return events
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import League, Bet, UserBet, LeagueEvent, LeagueInvite, ChatMessage, Circuit, CircuitParticipant, CircuitComponentEvent
+from .models import League, Bet, UserBet, LeagueEvent, LeagueInvite, ChatMessage, Circuit, CircuitParticipant, CircuitComponentEvent, Job
 from users.serializers import UserSerializer
 
 class LeagueSerializer(serializers.ModelSerializer):
@@ -262,4 +262,10 @@ class CircuitDetailSerializer(serializers.ModelSerializer):
 class UserBetSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserBet
-        fields = ('id', 'user', 'bet', 'choice', 'points_wagered', 'result', 'created_at', 'league_event', 'numeric_choice', 'points_earned') 
\ No newline at end of file
+        fields = ('id', 'user', 'bet', 'choice', 'points_wagered', 'result', 'created_at', 'league_event', 'numeric_choice', 'points_earned') 
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = ('id', 'kind', 'status', 'attempts', 'max_attempts', 'progress', 'total', 'result', 'error', 'created_at', 'updated_at', 'finished_at')
+        read_only_fields = fields
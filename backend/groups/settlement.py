@@ -0,0 +1,739 @@
+import logging
+import math
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField
+from django.db.models.functions import Lower, Trim
+
+from users.models import Notification
+from .bulk import BATCH_SIZE, batches, increment
+from . import ledger, stats
+from .jobs import handler, report_progress, JobFailed
+from .models import UserBet, LeagueEvent, Circuit, CircuitComponentEvent, CircuitParticipant, SettlementChunk, Wager, LedgerEntry
+from .serializers import LeagueEventSerializer, CircuitDetailSerializer
+from .tiebreaker import resolve_tiebreaker
+from .wagers import absorb_legacy_bets
+
+logger = logging.getLogger(__name__)
+
+TIEBREAKER_TYPES = ('tiebreaker_closest', 'tiebreaker_unique')
+
+# Wagers settled by settle_league_event, in order: SettlementChunk part -> Wager kind
+SETTLEMENT_PARTS = {'user_bets': Wager.USER, 'circuit_bets': Wager.CIRCUIT}
+
+
+def settle_league_event(event, winner, progress=None, parts=None):
+    """
+    Complete a league event and settle every bet placed on it
+
+    Winning user bets are paid out at their odds and winning circuit bets score
+    their weight in points. Everyone who bet is notified.
+
+    Bets are the event's Wager rows, settled in chunks of BATCH_SIZE in ID
+    order, each committed together with a SettlementChunk record keyed by
+    (event, part, chunk). A settlement that is interrupted and run again, or
+    run by two workers at once, applies every chunk exactly once. Within a
+    chunk payouts are bulk inserted ledger entries with F() balance increments,
+    scores are F() increments, results are set with UPDATEs grouped by result
+    and notifications are bulk inserted. The event is marked completed once
+    every chunk is recorded, in the same transaction as its pending UserBets
+    are resolved.
+
+    Parameters:
+    event (LeagueEvent): The event to complete
+    winner (str): The winning outcome, compared case-insensitively with each bet's choice
+    progress (callable): Called with (chunks done, chunks in all) as chunks commit
+    parts (list): Which SETTLEMENT_PARTS to settle, default all; settle_events()
+    leaves out circuit bets once settle_circuit_event() has scored them
+
+    Returns:
+    LeagueEvent: The completed event
+
+    Raises:
+    ValueError: If the event was completed, or started settling, with another winner
+    """
+    event = LeagueEvent.objects.get(pk=event.pk)
+    if event.completed:
+        if (event.market_data or {}).get('winner', '').lower() == winner.lower():
+            return event  # Settled already, e.g. by an earlier attempt of the same job
+        raise ValueError('Event is already completed')
+
+    while True:
+        absorb_legacy_bets(event)
+        recorded = {
+            (chunk.part, chunk.chunk): chunk
+            for chunk in SettlementChunk.objects.filter(league_event=event)
+        }
+        for chunk in recorded.values():
+            if chunk.winner.lower() != winner.lower():
+                raise ValueError(f"Event is already being settled with winner '{chunk.winner}'")
+        # Chunk boundaries must not move between attempts
+        size = next(iter(recorded.values())).chunk_size if recorded else BATCH_SIZE
+
+        plan = _chunk_plan(event, size, parts)
+        done = sum(1 for key in plan if key in recorded)
+        if progress:
+            progress(done, len(plan))
+        for part, index in plan:
+            if (part, index) in recorded:
+                continue
+            if _apply_chunk(event, part, index, size, winner):
+                logger.info(f"Settled {part} chunk {index} of event {event.id}")
+            done += 1
+            if progress:
+                progress(done, len(plan))
+
+        with transaction.atomic():
+            event = LeagueEvent.objects.select_for_update().get(pk=event.pk)
+            if event.completed:
+                return event  # Another worker finished it
+            applied = set(SettlementChunk.objects.filter(league_event=event).values_list('part', 'chunk'))
+            if not set(_chunk_plan(event, size, parts)) <= applied:
+                continue  # Bets were added while settling; settle those too
+
+            # Mark the event as completed; each wager's result was recorded with its chunk
+            _settle_event_user_bets(event, winner)
+            market_data = event.market_data or {}
+            market_data['winner'] = winner
+            event.market_data = market_data
+            event.completed = True
+            event.save(update_fields=['completed', 'market_data'])
+
+        logger.info(f"Settled event {event.id} ({event.event_name}) in {len(applied)} chunks")
+        return event
+
+
+def _chunk_plan(event, size, parts=None):
+    """The (part, chunk index) pairs needed to settle an event's wagers"""
+    counts = dict(
+        Wager.objects.filter(league_event=event).order_by().values_list('kind').annotate(count=Count('id'))
+    )
+    return [
+        (part, index)
+        for part, kind in SETTLEMENT_PARTS.items() if parts is None or part in parts
+        for index in range(math.ceil(counts.get(kind, 0) / size))
+    ]
+
+
+def _apply_chunk(event, part, index, size, winner):
+    """
+    Settle one slice of an event's bets and record it, in one transaction
+
+    Returns:
+    bool: False if the chunk had already been applied, e.g. by another worker
+    """
+    # New wagers get higher IDs, so a chunk's slice is the same on every attempt
+    bets = list(Wager.objects.filter(league_event=event, kind=SETTLEMENT_PARTS[part]).order_by('id')[index * size:(index + 1) * size])
+    try:
+        with transaction.atomic():
+            # The unique (event, part, chunk) record is written first: a concurrent
+            # attempt at the same chunk waits here and then fails instead of paying twice
+            SettlementChunk.objects.create(
+                league_event=event, part=part, chunk=index, chunk_size=size, winner=winner, bets=len(bets)
+            )
+            if part == 'user_bets':
+                notifications = _settle_user_bets(event, bets, winner)
+            else:
+                notifications = _settle_circuit_bets(event, bets, winner)
+            Notification.objects.bulk_create(notifications, batch_size=BATCH_SIZE)
+    except IntegrityError:
+        logger.info(f"{part} chunk {index} of event {event.id} was already settled")
+        return False
+    return True
+
+
+def _user_bet_outcome(wager, winner):
+    """
+    Work out a user wager's result
+
+    Returns:
+    tuple: (user_id, result, amount, payout), or None for incomplete bet data
+    """
+    # Get user bet details
+    choice = wager.outcome
+    amount = wager.amount
+    if not choice or amount <= 0:
+        return None
+
+    # Check if the user bet matches the winning outcome
+    if str(choice).lower() == winner.lower():
+        # Calculate payout with odds
+        return wager.user_id, 'won', amount, (amount * Decimal(str(wager.odds))).quantize(Decimal('0.01'))
+    return wager.user_id, 'lost', amount, Decimal('0.00')
+
+
+def _settle_event_user_bets(event, winner):
+    """
+    Resolve an event's pending UserBets, each by its own choice
+
+    The winning test is done by the database, as in settle_circuit_event(), so
+    every UserBet is settled whether or not its bettor also holds a Wager.
+
+    Parameters:
+    event (LeagueEvent): The event being completed
+    winner (str): The winning outcome
+    """
+    pending = UserBet.objects.filter(league_event=event, result='pending')
+    won = pending.annotate(clean_choice=Lower(Trim('choice'))).filter(clean_choice=winner.strip().lower())
+    before = list(pending.order_by('id').values_list('id', 'user_id', 'points_wagered'))
+    won_ids = set(won.values_list('id', flat=True))
+    won.update(result='won')
+    pending.update(result='lost')
+    stats.record_results([
+        (user_id, 'pending', 'won' if bet_id in won_ids else 'lost', points_wagered * 2 if bet_id in won_ids else 0)
+        for bet_id, user_id, points_wagered in before
+    ])
+
+
+def _circuit_bet_outcome(wager, winner):
+    """
+    Work out a circuit wager's result
+
+    Returns:
+    tuple: (user_id, circuit_id, result, points), or None for incomplete bet data
+    """
+    # Get circuit bet details
+    choice = wager.outcome
+    if not wager.circuit_id or not choice:
+        return None
+
+    # Check if the user bet matches the winning outcome
+    if str(choice).lower() == winner.lower():
+        # Calculate points with weight
+        return wager.user_id, wager.circuit_id, 'won', 1 * wager.weight
+    return wager.user_id, wager.circuit_id, 'lost', 0
+
+
+def _settle_user_bets(event, wagers, winner):
+    """
+    Pay out a slice of an event's user wagers
+
+    Parameters:
+    event (LeagueEvent): The event being settled
+    wagers (list): Wager rows of kind user
+    winner (str): The winning outcome
+
+    Returns:
+    list: Unsaved Notification objects for the bettors
+    """
+    payouts = []   # Ledger entries for winning bets
+    by_payout = {}  # (result, payout) -> wager IDs
+    settled = []   # (user_id, result, amount, payout)
+    changes = []   # (user_id, result before, result after, change in winnings) for the stats
+
+    for wager in wagers:
+        outcome = _user_bet_outcome(wager, winner)
+        if outcome is None:
+            logger.warning(f"Incomplete bet data: wager {wager.id}")
+            continue
+        user_id, result, amount, payout = outcome
+        if result == 'won':
+            payouts.append(LedgerEntry(user_id=user_id, amount=payout, reason=LedgerEntry.BET_PAYOUT,
+                                       reference=f'league_event:{event.id}'))
+        by_payout.setdefault((result, payout), []).append(wager.id)
+        settled.append(outcome)
+        changes.append((user_id, wager.result, result, payout - (wager.payout if wager.result == 'won' else 0)))
+
+    # Balances: ledger entries in bulk and one F() increment per batch, in the chunk's transaction
+    ledger.record(payouts)
+
+    # Wager results: one UPDATE per batch of wagers with the same outcome and payout
+    for (result, payout), wager_ids in by_payout.items():
+        for batch in batches(wager_ids):
+            Wager.objects.filter(id__in=batch).update(result=result, payout=payout)
+
+    stats.record_results(changes)
+
+    notifications = []
+    for user_id, result, amount, payout in settled:
+        if result == 'won':
+            message = f"You won ${payout:.2f} on {event.event_name}!"
+        else:
+            message = f"You lost your bet of ${amount:.2f} on {event.event_name}"
+        notifications.append(Notification(user_id=user_id, message=message, notification_type='info'))
+    return notifications
+
+
+def _settle_circuit_bets(event, wagers, winner):
+    """
+    Score a slice of an event's circuit wagers
+
+    Parameters:
+    event (LeagueEvent): The event being settled
+    wagers (list): Wager rows of kind circuit
+    winner (str): The winning outcome
+
+    Returns:
+    list: Unsaved Notification objects for the bettors
+    """
+    settled = []   # (user_id, circuit_id, result, points)
+    by_points = {}  # (result, points) -> wager IDs
+    for wager in wagers:
+        outcome = _circuit_bet_outcome(wager, winner)
+        if outcome is None:
+            logger.warning(f"Incomplete circuit bet data: wager {wager.id}")
+            continue
+        settled.append(outcome)
+        by_points.setdefault((outcome[2], outcome[3]), []).append(wager.id)
+
+    circuit_names = dict(Circuit.objects.filter(
+        id__in={circuit_id for _, circuit_id, _, _ in settled}
+    ).values_list('id', 'name'))
+    participants = set(CircuitParticipant.objects.filter(
+        circuit_id__in=list(circuit_names),
+        user_id__in={user_id for user_id, _, _, _ in settled},
+    ).values_list('circuit_id', 'user_id'))
+
+    for (result, points), wager_ids in by_points.items():
+        for batch in batches(wager_ids):
+            Wager.objects.filter(id__in=batch).update(result=result, points_earned=points)
+
+    # Scores: one F() increment per circuit, keyed by participant
+    scores = {}
+    notifications = []
+    for user_id, circuit_id, result, points in settled:
+        circuit_name = circuit_names.get(circuit_id)
+        if result == 'won':
+            if (circuit_id, user_id) not in participants:
+                logger.warning(f"Could not update circuit participant score: user {user_id} is not in circuit {circuit_id}")
+                continue
+            scores.setdefault(circuit_id, {})
+            scores[circuit_id][user_id] = scores[circuit_id].get(user_id, 0) + points
+            message = f"Your prediction for {event.event_name} in circuit {circuit_name} was correct! (+{points} points)"
+        else:
+            message = f"Your prediction for {event.event_name} in circuit {circuit_name} was incorrect."
+        notifications.append(Notification(user_id=user_id, message=message, notification_type='info'))
+
+    for circuit_id, points_by_user in scores.items():
+        increment(CircuitParticipant.objects.filter(circuit_id=circuit_id), 'score', points_by_user,
+                   IntegerField(), key='user_id')
+    return notifications
+
+
+def settle_circuit_event(circuit, event, component_event, winning_outcome, correct_numeric_value=None, complete=True):
+    """
+    Complete an event within a circuit and score the circuit's participants
+
+    Runs in one transaction in a fixed number of queries however many people
+    entered the circuit: bet results are set by two UPDATEs joined to the
+    participants, and scores by one UPDATE over the participants holding a
+    winning bet, each scoring the component's weight. Bettors' stats take one
+    UPDATE per batch of users (see stats.py).
+
+    Parameters:
+    circuit (Circuit): The circuit being scored
+    event (LeagueEvent): The component event to complete
+    component_event (CircuitComponentEvent): Link between the two, carrying the weight
+    winning_outcome (str): The winning outcome
+    correct_numeric_value (float): The actual value, for tiebreaker events
+    complete (bool): Mark the event completed; False leaves that to a league
+    settlement still to come, recording only the winner and this circuit
+
+    Returns:
+    dict: user_id -> {'points', 'username'} for participants who scored, or None
+    if the event had already been settled in this circuit
+
+    Raises:
+    ValueError: If the event was already completed with a different winner
+    """
+    weight = component_event.weight
+    winning_outcome_clean = (winning_outcome or '').strip()
+    pending_tiebreaker = event.betting_type in TIEBREAKER_TYPES and correct_numeric_value is not None
+
+    with transaction.atomic():
+        # Serialise with any other settlement of this event, and look again under the lock
+        LeagueEvent.objects.select_for_update().get(pk=event.pk)
+        absorb_legacy_bets(event)
+        event.refresh_from_db(fields=['completed', 'market_data'])
+        if circuit_event_settled(event, circuit):
+            logger.info(f"Event {event.id} was already settled in circuit {circuit.id}")
+            return None
+        if event.completed and (event.market_data or {}).get('winner') != winning_outcome:
+            raise ValueError(f"Event was already completed with winner '{event.market_data.get('winner')}'")
+
+        # Mark the event as completed, unless its league bets are settled next
+        if complete:
+            event.completed = True
+        if event.market_data is None:
+            event.market_data = {}
+
+        # Update market data with winning outcome, and that this circuit is scored
+        event.market_data['winner'] = winning_outcome
+        event.market_data['settled_circuits'] = event.market_data.get('settled_circuits', []) + [circuit.id]
+        if correct_numeric_value is not None:
+            event.market_data['correct_numeric_value'] = correct_numeric_value
+
+        # Circuit bets already recorded for this circuit, by user
+        this_circuit_bets = {}
+        for wager in Wager.objects.filter(league_event=event, circuit=circuit, kind=Wager.CIRCUIT).order_by('id'):
+            this_circuit_bets.setdefault(wager.user_id, wager)
+
+        usernames = dict(circuit.participants.order_by().values_list('user_id', 'user__username'))
+
+        # The participants' bets on this event, with the winning test done by the database
+        # so the UPDATEs below and the rows read here agree
+        participant_bets = UserBet.objects.filter(
+            league_event=event,
+            user__circuit_participations__circuit=circuit,
+        )
+        before = list(participant_bets.order_by('id').values_list('id', 'user_id', 'result', 'points_wagered'))
+        if pending_tiebreaker:
+            # Numeric guesses are ranked later by the tiebreaker resolution
+            participant_bets.update(result='pending_tiebreaker')
+            won = participant_bets.none()
+        else:
+            won = participant_bets.annotate(clean_choice=Lower(Trim('choice'))).filter(
+                clean_choice=winning_outcome_clean.lower()
+            )
+            won.update(result='won', points_earned=weight)
+            participant_bets.exclude(pk__in=won.values('pk')).update(result='lost', points_earned=0)
+
+            # Participants score once, however many winning bets they hold; only their
+            # bets in this circuit count, not wins settled elsewhere on the event
+            CircuitParticipant.objects.filter(
+                circuit=circuit,
+                user_id__in=won.values('user_id'),
+            ).update(score=F('score') + weight)
+
+        won_ids = set(won.values_list('id', flat=True))
+        winners = {user_id for bet_id, user_id, _, _ in before if bet_id in won_ids}
+        changes = []
+        for bet_id, user_id, result, points_wagered in before:
+            after = 'pending_tiebreaker' if pending_tiebreaker else 'won' if bet_id in won_ids else 'lost'
+            changes.append((user_id, result, after, points_wagered * 2 * ((after == 'won') - (result == 'won'))))
+        stats.record_results(changes)
+        bettors = {}
+        for user_id, choice, numeric_choice in participant_bets.order_by('id').values_list('user_id', 'choice', 'numeric_choice'):
+            bettors[user_id] = (choice, numeric_choice)
+
+        participant_updates = {}
+        new_wagers = []
+        for user_id, (choice, numeric_choice) in bettors.items():
+            if user_id in winners:
+                participant_updates[user_id] = {'points': weight, 'username': usernames.get(user_id)}
+
+            # Record the circuit bet if it is not already there
+            if user_id in this_circuit_bets:
+                continue
+            if pending_tiebreaker:
+                outcome, result, points = str(numeric_choice) if numeric_choice is not None else choice, 'pending_tiebreaker', 0
+            else:
+                won_bet = user_id in winners
+                outcome, result, points = (choice or '').strip(), 'won' if won_bet else 'lost', weight if won_bet else 0
+            new_wagers.append(Wager(
+                league_event=event, user_id=user_id, circuit=circuit, kind=Wager.CIRCUIT,
+                outcome=outcome or '', weight=weight, result=result, points_earned=points,
+            ))
+        Wager.objects.bulk_create(new_wagers, batch_size=BATCH_SIZE)
+
+        # Participants with no UserBet may still have a circuit bet recorded
+        pending, legacy_won, legacy_lost = [], [], []
+        for user_id, wager in this_circuit_bets.items():
+            if user_id in bettors or user_id not in usernames:
+                continue
+            if pending_tiebreaker:
+                pending.append(wager.id)
+            elif wager.outcome.strip().lower() == winning_outcome_clean.lower():
+                legacy_won.append(wager)
+                participant_updates[user_id] = {'points': weight, 'username': usernames[user_id]}
+            else:
+                legacy_lost.append(wager.id)
+        for batch in batches(pending):
+            Wager.objects.filter(id__in=batch).update(result='pending_tiebreaker')
+        for batch in batches(legacy_lost):
+            Wager.objects.filter(id__in=batch).update(result='lost', points_earned=0)
+        for batch in batches(legacy_won):
+            Wager.objects.filter(id__in=[wager.id for wager in batch]).update(result='won', points_earned=weight)
+            CircuitParticipant.objects.filter(
+                circuit=circuit, user_id__in=[wager.user_id for wager in batch]
+            ).update(score=F('score') + weight)
+
+        event.save()
+
+        # Add notifications for users who earned points
+        Notification.objects.bulk_create([
+            Notification(
+                user_id=user_id,
+                message=f"Your prediction for {event.event_name} in circuit {circuit.name} was correct! (+{update['points']} points)",
+                notification_type='info'
+            )
+            for user_id, update in participant_updates.items()
+        ], batch_size=BATCH_SIZE)
+
+    logger.info(f"Settled event {event.id} in circuit {circuit.id}: {len(usernames)} participants, {len(participant_updates)} correct")
+    return participant_updates
+
+
+def circuit_event_settled(event, circuit):
+    """
+    Whether an event has already been settled in a circuit
+
+    Parameters:
+    event (LeagueEvent): The event, freshly read (and locked, when about to settle it)
+    circuit (Circuit): The circuit
+
+    Returns:
+    bool: True if the circuit's participants were already scored on it
+    """
+    settled = (event.market_data or {}).get('settled_circuits')
+    if settled is None:
+        # Completed before circuits were recorded: treat it as settled everywhere
+        return event.completed
+    return circuit.id in settled
+
+
+@handler('settle_league_event')
+def settle_league_event_job(job):
+    """
+    Background settlement queued by complete_league_event
+
+    Parameters:
+    job (Job): payload {'event_id', 'winner'}
+
+    Returns:
+    dict: The message and completed event, as the endpoint used to return them
+    """
+    try:
+        event = LeagueEvent.objects.get(id=job.payload['event_id'])
+    except LeagueEvent.DoesNotExist:
+        raise JobFailed('Event not found')
+    try:
+        event = settle_league_event(event, job.payload['winner'],
+                                    progress=lambda done, total: report_progress(job, done, total))
+    except ValueError as e:
+        raise JobFailed(str(e))
+    return {
+        'message': 'Event marked as completed successfully',
+        'event': LeagueEventSerializer(event).data
+    }
+
+
+@handler('settle_circuit_event')
+def settle_circuit_event_job(job):
+    """
+    Background settlement queued by complete_circuit_event
+
+    Parameters:
+    job (Job): payload {'circuit_id', 'event_id', 'winning_outcome', 'numeric_value'}
+
+    Returns:
+    dict: The updated circuit with 'completed_event' and 'participant_updates',
+    as the endpoint used to return them
+    """
+    payload = job.payload
+    try:
+        circuit = Circuit.objects.get(id=payload['circuit_id'])
+        event = LeagueEvent.objects.get(id=payload['event_id'])
+        component_event = CircuitComponentEvent.objects.get(circuit=circuit, league_event=event)
+    except (Circuit.DoesNotExist, LeagueEvent.DoesNotExist, CircuitComponentEvent.DoesNotExist) as e:
+        raise JobFailed(str(e))
+    winning_outcome = payload['winning_outcome']
+    correct_numeric_value = payload.get('numeric_value')
+    if circuit.status == 'completed':
+        raise JobFailed('This circuit has already been completed')
+
+    # settle_circuit_event checks under the event lock whether this circuit is already scored
+    report_progress(job, 0, 1)
+    if correct_numeric_value is not None:
+        event.tiebreaker_correct_value = correct_numeric_value
+    try:
+        participant_updates = settle_circuit_event(circuit, event, component_event, winning_outcome, correct_numeric_value)
+    except ValueError as e:
+        raise JobFailed(str(e))
+    if participant_updates is None:
+        if (event.market_data or {}).get('winner') != winning_outcome:
+            raise JobFailed('This event has already been completed')
+        # Settled by an earlier attempt, or by another run: report what it scored
+        participant_updates = {
+            user_id: {'points': component_event.weight, 'username': username}
+            for user_id, username in UserBet.objects.filter(
+                league_event=event, result='won', user__circuit_participations__circuit=circuit,
+            ).values_list('user_id', 'user__username')
+        }
+
+    # Fetch updated circuit data for response
+    response_data = dict(CircuitDetailSerializer(Circuit.objects.get(id=circuit.id)).data)
+    response_data['completed_event'] = {
+        'id': event.id,
+        'name': event.event_name,
+        'winning_outcome': winning_outcome,
+        'numeric_value': correct_numeric_value,
+        'weight': component_event.weight
+    }
+    response_data['participant_updates'] = participant_updates
+    return response_data
+
+
+def complete_circuit_with_tiebreaker(circuit, tiebreaker_event, tiebreaker_value):
+    """
+    Complete a circuit, breaking any tie for first place on a tiebreaker event
+
+    Completes the tiebreaker event if need be, then pays the winners their share
+    of the entry fees and marks the circuit completed in one transaction.
+
+    Parameters:
+    circuit (Circuit): The circuit
+    tiebreaker_event (LeagueEvent): The event whose result breaks ties
+    tiebreaker_value (str): The tiebreaker event's result
+
+    Returns:
+    dict: The winners and prizes, or None if the circuit was already completed
+
+    Raises:
+    ValueError: If the circuit has no participants
+    """
+    with transaction.atomic():
+        event = LeagueEvent.objects.select_for_update().get(pk=tiebreaker_event.pk)
+        if not event.completed:
+            logger.info(f"Completing tiebreaker event {event.id} with value {tiebreaker_value}")
+            event.market_data = {**(event.market_data or {}), 'winner': tiebreaker_value}
+            event.completed = True
+            event.save()
+
+    # Find participants with the highest score and break any tie on the tiebreaker guesses
+    participants = CircuitParticipant.objects.filter(circuit=circuit)
+    resolution = resolve_tiebreaker(circuit, event, tiebreaker_value)
+    if not resolution['tied']:
+        raise ValueError('No participants found in this circuit')
+    logger.info(
+        f"{len(resolution['tied'])} participants tied in circuit {circuit.id} with score {resolution['score']}; "
+        f"{len(resolution['winners'])} won by {resolution['reason']} ({resolution['method']})"
+    )
+    winners = list(participants.filter(user_id__in=resolution['winners']).select_related('user'))
+
+    # If there's only one winner, they get the full prize; otherwise, split the prize equally
+    total_prize = circuit.entry_fee * participants.count()
+    prize_per_winner = total_prize / len(winners)
+    if len(winners) == 1:
+        message = "Congratulations! You won circuit '{name}' with {score} points and earned ${prize}!"
+    else:
+        message = "Congratulations! You tied for 1st place in circuit '{name}' with {score} points and earned ${prize}!"
+
+    with transaction.atomic():
+        # Only one completion of the circuit pays out
+        if Circuit.objects.select_for_update().get(pk=circuit.pk).status == 'completed':
+            return None
+
+        # Pay every winner in one ledger write, and notify them
+        ledger.record([
+            LedgerEntry(user_id=winner.user_id, amount=prize_per_winner, reason=LedgerEntry.CIRCUIT_PRIZE, reference=f'circuit:{circuit.id}')
+            for winner in winners
+        ])
+        Notification.objects.bulk_create([
+            Notification(
+                user_id=winner.user_id,
+                message=message.format(name=circuit.name, score=winner.score, prize=prize_per_winner),
+                notification_type='info'
+            )
+            for winner in winners
+        ])
+        circuit.status = 'completed'
+        circuit.save()
+    logger.info(f"Circuit {circuit.id} completed; {prize_per_winner} awarded to each of {len(winners)} winners")
+
+    return _circuit_prizes(circuit, total_prize, prize_per_winner, [(winner.user, winner.score) for winner in winners])
+
+
+def _circuit_prizes(circuit, total_prize, prize_per_winner, winners):
+    """The response for a completed circuit, from its (user, score) winners"""
+    return {
+        'message': 'Circuit completed successfully',
+        'circuit_id': circuit.id,
+        'circuit_name': circuit.name,
+        'total_prize': total_prize,
+        'prize_per_winner': prize_per_winner,
+        'winners': [
+            {'id': user.id, 'username': user.username, 'score': score, 'prize': prize_per_winner}
+            for user, score in winners
+        ],
+    }
+
+
+@handler('complete_circuit_with_tiebreaker')
+def complete_circuit_with_tiebreaker_job(job):
+    """
+    Background circuit completion queued by complete_circuit_with_tiebreaker
+
+    Parameters:
+    job (Job): payload {'circuit_id', 'event_id', 'tiebreaker_value'}
+
+    Returns:
+    dict: The winners and prizes, as the endpoint used to return them
+    """
+    payload = job.payload
+    try:
+        circuit = Circuit.objects.get(id=payload['circuit_id'])
+        tiebreaker_event = LeagueEvent.objects.get(id=payload['event_id'])
+    except (Circuit.DoesNotExist, LeagueEvent.DoesNotExist) as e:
+        raise JobFailed(str(e))
+
+    report_progress(job, 0, 1)
+    result = None
+    if circuit.status != 'completed':
+        try:
+            result = complete_circuit_with_tiebreaker(circuit, tiebreaker_event, payload['tiebreaker_value'])
+        except ValueError as e:
+            raise JobFailed(str(e))
+    if result is not None:
+        return result
+
+    # Completed by an earlier attempt, or by another run: report the prizes it paid
+    prizes = list(
+        LedgerEntry.objects.filter(reason=LedgerEntry.CIRCUIT_PRIZE, reference=f'circuit:{circuit.id}')
+        .select_related('user').order_by('id')
+    )
+    if not prizes:
+        raise JobFailed('This circuit has already been completed')
+    scores = dict(CircuitParticipant.objects.filter(circuit=circuit).values_list('user_id', 'score'))
+    return _circuit_prizes(
+        circuit,
+        circuit.entry_fee * len(scores),
+        prizes[0].amount,
+        [(prize.user, scores.get(prize.user_id)) for prize in prizes],
+    )
+
+
+def settle_events(results):
+    """
+    Settle a batch of decided events, each independently of the others
+
+    Events that are components of active circuits are scored in each of those
+    circuits, and their money bets and UserBets are then settled as for any
+    other event, which completes them. Events already completed,
+    and tiebreaker events (which need a numeric result), are skipped.
+
+    Parameters:
+    results (list): (LeagueEvent, winning outcome) pairs
+
+    Returns:
+    list: IDs of the events settled
+    """
+    settled = []
+    for event, winner in results:
+        try:
+            event = LeagueEvent.objects.get(pk=event.pk)
+            if event.completed or event.betting_type in TIEBREAKER_TYPES:
+                continue
+            components = list(CircuitComponentEvent.objects.filter(
+                league_event=event
+            ).exclude(circuit__status='completed').select_related('circuit'))
+            if components:
+                with transaction.atomic():
+                    event = LeagueEvent.objects.select_for_update().get(pk=event.pk)
+                    if event.completed:
+                        continue
+                    # Score the circuits first, leaving the event open for its league bets
+                    for component_event in components:
+                        settle_circuit_event(component_event.circuit, event, component_event, winner, complete=False)
+                # Then pay the money bets, which completes the event; a run cut short
+                # between the two finds the circuits already scored and carries on here
+                settle_league_event(event, winner, parts=['user_bets'])
+            else:
+                # Checkpointed per chunk, so it runs outside any outer transaction
+                settle_league_event(event, winner)
+            settled.append(event.id)
+            logger.info(f"Settled event {event.id} ({event.event_name}) with winner '{winner}'")
+        except Exception as e:
+            logger.error(f"Could not settle event {event.id}: {str(e)}", exc_info=True)
+    return settled
@@ -0,0 +1,290 @@
+"""
+Per-user betting stats.
+
+Profiles used to work out win rate, streak and winnings by reading every bet a
+user had made. BettingStats keeps those numbers in one row per user instead:
+placing a bet adds to total_bets, and settlement applies each batch of results
+with F() updates inside its own transaction. A user without a row gets one built
+from their bets the first time it is needed, and `manage.py
+rebuild_betting_stats` recomputes every row from scratch.
+
+Counted, as the profile always has: a user's wagers on league events and their
+UserBets. A won wager earns its payout and a won UserBet twice the points
+wagered. The streak follows results as they are settled: wins in a row count up,
+losses in a row count down, and a push resets it to zero.
+"""
+import heapq
+import itertools
+import logging
+from collections import Counter
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Now
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+
+from users.models import User
+from .bulk import BATCH_SIZE, batches, per_row
+from .ledger import MONEY
+from .models import BettingStats, UserBet, Wager
+
+logger = logging.getLogger(__name__)
+
+# Results that end a bet; anything else (pending, pending_tiebreaker) is still open
+SETTLED = ('won', 'lost', 'push')
+
+# Bets needed for each level, highest first
+LEVELS = [(50, 5), (30, 4), (15, 3), (5, 2)]
+# Winning more than 65% of bets (13 in 20) is worth a level
+WIN_RATE_BONUS = (13, 20)
+
+
+def user_level(total_bets, won_bets):
+    """
+    A user's level from their record
+
+    Parameters:
+    total_bets (int): Bets placed
+    won_bets (int): Bets won
+
+    Returns:
+    int: Level 1 to 6
+    """
+    level = next((level for bets, level in LEVELS if total_bets > bets), 1)
+    wins, out_of = WIN_RATE_BONUS
+    return level + (1 if won_bets * out_of > total_bets * wins else 0)
+
+
+def _level_expression(total_bets, won_bets):
+    """user_level() as SQL, for updates that change the counts"""
+    wins, out_of = WIN_RATE_BONUS
+    return Case(
+        *[When(GreaterThan(total_bets, bets), then=Value(level)) for bets, level in LEVELS],
+        default=Value(1),
+    ) + Case(
+        When(GreaterThan(won_bets * out_of, total_bets * wins), then=Value(1)),
+        default=Value(0),
+    )
+
+
+def for_user(user_id):
+    """
+    A user's stats row, built from their bets if they have none yet
+
+    Parameters:
+    user_id (int): The user
+
+    Returns:
+    BettingStats: Their stats
+    """
+    stats = BettingStats.objects.filter(pk=user_id).first()
+    if stats is None:
+        rebuild([user_id])
+        stats = BettingStats.objects.get(pk=user_id)
+    return stats
+
+
+def record_placed(user_ids):
+    """
+    Count newly placed bets
+
+    Call once the bets are saved; users without a row are built from them.
+
+    Parameters:
+    user_ids (list): The bettor of each new bet
+    """
+    counts = Counter(user_ids)
+    existing = _existing(list(counts))
+    for batch in batches(sorted(existing)):
+        added = per_row({user_id: counts[user_id] for user_id in batch}, IntegerField(), key='user_id')
+        BettingStats.objects.filter(user_id__in=batch).update(
+            total_bets=F('total_bets') + added,
+            level=_level_expression(F('total_bets') + added, F('won_bets')),
+            updated_at=Now(),
+        )
+
+
+def record_results(changes):
+    """
+    Apply bet results to their users' stats
+
+    Call after the bets are updated, in the same transaction, so the stats
+    commit with them; users without a row are built from the updated bets.
+
+    Parameters:
+    changes (list): (user_id, result before, result after, change in winnings)
+    for each bet, in the order they were settled
+    """
+    by_user = {}
+    for user_id, before, after, winnings in changes:
+        by_user.setdefault(user_id, []).append((before, after, winnings))
+    existing = _existing(list(by_user))
+
+    wins, money, streaks = {}, {}, {}
+    for user_id in existing:
+        streak = None
+        for before, after, winnings in by_user[user_id]:
+            wins[user_id] = wins.get(user_id, 0) + (after == 'won') - (before == 'won')
+            money[user_id] = money.get(user_id, Decimal('0')) + Decimal(str(winnings))
+            if before not in SETTLED and after in SETTLED:
+                streak = _extend(streak, after)
+        if streak is not None:
+            streaks[user_id] = streak
+
+    changed = sorted(user_id for user_id in existing if wins[user_id] or money[user_id] or user_id in streaks)
+    for batch in batches(changed):
+        won = per_row({user_id: wins[user_id] for user_id in batch}, IntegerField(), key='user_id')
+        BettingStats.objects.filter(user_id__in=batch).update(
+            won_bets=F('won_bets') + won,
+            lifetime_winnings=F('lifetime_winnings') + per_row(
+                {user_id: money[user_id] for user_id in batch}, MONEY, key='user_id'
+            ),
+            current_streak=_streak_expression({user_id: streaks[user_id] for user_id in batch if user_id in streaks}),
+            level=_level_expression(F('total_bets'), F('won_bets') + won),
+            updated_at=Now(),
+        )
+
+
+def _extend(streak, result):
+    """
+    Fold one more settled result into a streak change
+
+    A change is ('run', n): add n to a streak running the same way, or start
+    again at n; or ('set', n): the streak becomes n whatever it was.
+    """
+    if result == 'push':
+        return ('set', 0)
+    step = 1 if result == 'won' else -1
+    if streak is None:
+        return ('run', step)
+    kind, value = streak
+    if value * step > 0:
+        return (kind, value + step)
+    return ('set', step)
+
+
+def _streak_expression(streaks):
+    """The new current_streak for each user, from their streak changes"""
+    if not streaks:
+        return F('current_streak')
+    by_change = {}
+    for user_id, change in streaks.items():
+        by_change.setdefault(change, []).append(user_id)
+    branches = []
+    for (kind, value), user_ids in by_change.items():
+        if kind == 'set':
+            then = Value(value)
+        else:
+            same_way = Q(current_streak__gt=0) if value > 0 else Q(current_streak__lt=0)
+            then = Case(When(same_way, then=F('current_streak') + value), default=Value(value))
+        branches.append(When(user_id__in=user_ids, then=then))
+    return Case(*branches, default=F('current_streak'))
+
+
+def _existing(user_ids):
+    """Which users already have a stats row; the rest are built from their bets"""
+    existing = set(BettingStats.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True))
+    missing = [user_id for user_id in user_ids if user_id not in existing]
+    if missing:
+        rebuild(missing)
+    return existing
+
+
+def rebuild(user_ids=None):
+    """
+    Recompute stats from users' bets, a batch of users per transaction
+
+    Each batch locks its users' existing rows before reading their bets, so a
+    settlement running alongside applies its results after the rebuilt values
+    rather than being overwritten by them.
+
+    Parameters:
+    user_ids (list): Only these users; defaults to everyone
+
+    Returns:
+    int: Rows written
+    """
+    users = User.objects.order_by('id').values_list('id', flat=True)
+    if user_ids is not None:
+        users = users.filter(id__in=user_ids)
+    written = 0
+    last_id = 0
+    while True:
+        batch = list(users.filter(id__gt=last_id)[:BATCH_SIZE])
+        if not batch:
+            break
+        last_id = batch[-1]
+        with transaction.atomic():
+            list(BettingStats.objects.select_for_update().filter(user_id__in=batch).values_list('pk', flat=True))
+            rows = _compute(batch)
+            BettingStats.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['user'],
+                update_fields=['total_bets', 'won_bets', 'current_streak', 'lifetime_winnings', 'level', 'updated_at'],
+            )
+        written += len(rows)
+    if user_ids is None:
+        logger.info(f"Rebuilt betting stats for {written} users")
+    return written
+
+
+def _compute(user_ids):
+    """Unsaved BettingStats for some users, from aggregates over their bets"""
+    totals = {user_id: [0, 0, Decimal('0')] for user_id in user_ids}
+    won = Q(result='won')
+    wagers = (
+        Wager.objects.filter(user_id__in=user_ids, kind=Wager.USER)
+        .values('user_id').order_by()
+        .annotate(total=Count('id'), won=Count('id', filter=won), winnings=Sum('payout', filter=won))
+    )
+    user_bets = (
+        UserBet.objects.filter(user_id__in=user_ids)
+        .values('user_id').order_by()
+        .annotate(total=Count('id'), won=Count('id', filter=won), winnings=Sum(F('points_wagered') * 2, filter=won))
+    )
+    for row in itertools.chain(wagers, user_bets):
+        counts = totals[row['user_id']]
+        counts[0] += row['total']
+        counts[1] += row['won']
+        counts[2] += Decimal(str(row['winnings'] or 0))
+
+    now = timezone.now()
+    streaks = _streaks(user_ids)
+    return [
+        BettingStats(
+            user_id=user_id, total_bets=total, won_bets=won_bets, current_streak=streaks.get(user_id, 0),
+            lifetime_winnings=winnings, level=user_level(total, won_bets), updated_at=now,
+        )
+        for user_id, (total, won_bets, winnings) in totals.items()
+    ]
+
+
+def _streaks(user_ids):
+    """Each user's current streak, from their settled bets newest first"""
+    wagers = (
+        Wager.objects.filter(user_id__in=user_ids, kind=Wager.USER, result__in=SETTLED)
+        .order_by('user_id', '-placed_at', '-id').values_list('user_id', 'placed_at', 'result')
+    )
+    user_bets = (
+        UserBet.objects.filter(user_id__in=user_ids, result__in=SETTLED)
+        .order_by('user_id', '-created_at', '-id').values_list('user_id', 'created_at', 'result')
+    )
+    merged = heapq.merge(
+        wagers.iterator(chunk_size=BATCH_SIZE), user_bets.iterator(chunk_size=BATCH_SIZE),
+        key=lambda bet: (bet[0], -bet[1].timestamp()),
+    )
+    streaks = {}
+    for user_id, bets in itertools.groupby(merged, key=lambda bet: bet[0]):
+        latest = None
+        streak = 0
+        for _, _, result in bets:
+            if latest is None:
+                latest = result
+            if result != latest or result == 'push':
+                break
+            streak += 1 if result == 'won' else -1
+        streaks[user_id] = streak
+    return streaks
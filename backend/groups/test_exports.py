@@ -0,0 +1,61 @@
+import csv
+import io
+import json
+from decimal import Decimal
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from users.models import User
+from .models import Bet, League, LeagueEvent, UserBet, Wager
+
+
+class LeagueExportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='exporter', password='testpass123')
+        self.league = League.objects.create(name='Export League', captain=self.user)
+        self.league.members.add(self.user)
+        self.client.force_authenticate(self.user)
+        self.event = LeagueEvent.objects.create(league=self.league, event_key='evt', event_name='Home vs Away', sport='nba')
+        other = League.objects.create(name='Other League', captain=self.user)
+        LeagueEvent.objects.create(league=other, event_key='evt', event_name='Elsewhere', sport='nba')
+        self.wager = Wager.objects.create(league_event=self.event, user=self.user, outcome='Home', amount=Decimal('12.50'), odds=1.8)
+        # A bet posted to the league, and one placed through its event
+        self.posted = UserBet.objects.create(
+            user=self.user, choice='Away', points_wagered=20,
+            bet=Bet.objects.create(league=self.league, name='posted', type='h2h', points=20, deadline=timezone.now()),
+        )
+        self.placed = UserBet.objects.create(
+            user=self.user, league_event=self.event, choice='Home', points_wagered=10,
+            bet=Bet.objects.create(league=self.league, name='evt', type='h2h', points=10, deadline=timezone.now()),
+        )
+        UserBet.objects.create(
+            user=self.user, choice='Home', points_wagered=5,
+            bet=Bet.objects.create(league=other, name='elsewhere', type='h2h', points=5, deadline=timezone.now()),
+        )
+
+    def export(self, **params):
+        response = self.client.get(reverse('export-league-wagers', args=[self.league.id]), params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_includes_wagers_and_user_bets(self):
+        rows = list(csv.DictReader(io.StringIO(self.export())))
+        self.assertEqual(
+            sorted((row['source'], row['wager_id']) for row in rows),
+            sorted([('wager', str(self.wager.id)), ('userbet', str(self.posted.id)), ('userbet', str(self.placed.id))]),
+        )
+        placed = next(row for row in rows if row['source'] == 'userbet' and row['event_id'])
+        self.assertEqual(
+            (placed['event_name'], placed['outcome'], placed['amount'], placed['odds']),
+            ('Home vs Away', 'Home', '10.00', ''),
+        )
+        posted = next(row for row in rows if row['source'] == 'userbet' and not row['event_id'])
+        self.assertEqual((posted['event_name'], posted['outcome']), ('posted', 'Away'))
+
+    def test_ndjson_export(self):
+        rows = [json.loads(line) for line in self.export(output='ndjson').splitlines()]
+        self.assertEqual(len(rows), 3)
+        wager = next(row for row in rows if row['source'] == 'wager')
+        self.assertEqual((wager['amount'], wager['odds'], wager['kind']), ('12.50', 1.8, Wager.USER))
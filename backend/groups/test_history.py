@@ -0,0 +1,63 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from users.models import User
+from . import history
+from .models import Bet, League, LeagueEvent, UserBet, Wager
+
+
+class BetHistoryPageTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='bettor', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.league = League.objects.create(name='Test League', captain=self.user)
+        now = timezone.now()
+        # Pairs of a wager and a UserBet share each timestamp, so the page order
+        # has to break ties on source and id
+        for i in range(6):
+            placed = now - timedelta(hours=i // 2)
+            event = LeagueEvent.objects.create(
+                league=self.league, event_key=f'evt{i}', event_name='Home vs Away', sport='nba', completed=True
+            )
+            wager = Wager.objects.create(
+                league_event=event, user=self.user, outcome='Home', amount=Decimal('10.00'),
+                result='won' if i % 3 == 0 else 'lost'
+            )
+            bet = Bet.objects.create(league=self.league, name=f'evt{i}', type='moneyline', points=0, deadline=now)
+            user_bet = UserBet.objects.create(user=self.user, bet=bet, league_event=event, choice='Home', points_wagered=1)
+            Wager.objects.filter(pk=wager.pk).update(placed_at=placed)
+            UserBet.objects.filter(pk=user_bet.pk).update(created_at=placed)
+        Wager.objects.create(league_event=event, user=self.other, outcome='Home', amount=Decimal('10.00'))
+
+    def all_pages(self, **kwargs):
+        pages, cursor = [], None
+        while True:
+            page = history.bet_history_page(self.user, cursor=cursor, **kwargs)
+            pages.append(page['results'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                return pages
+
+    def test_pages_cover_every_entry_once_newest_first(self):
+        pages = self.all_pages(limit=5)
+
+        self.assertEqual([len(page) for page in pages], [5, 5, 2])
+        ids = [entry['id'] for page in pages for entry in page]
+        self.assertEqual(len(set(ids)), 12)
+        keys = list(history.history_keys(self.user))
+        self.assertEqual(keys, sorted(keys, reverse=True))
+        self.assertEqual([entry['id'] for entry in history.entries(keys)], ids)
+
+    def test_filters_apply_across_pages(self):
+        pages = self.all_pages(limit=1, result='won')
+
+        self.assertEqual(sum(len(page) for page in pages), 2)
+        self.assertTrue(all(entry['result'] == 'won' for page in pages for entry in page))
+
+    def test_invalid_cursor(self):
+        for cursor in ('nonsense', history.encode_cursor(timezone.now(), 'elsewhere', 1)):
+            with self.subTest(cursor=cursor), self.assertRaises(history.InvalidCursor):
+                history.bet_history_page(self.user, cursor=cursor)
@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from users.models import User
+from . import jobs
+from .models import Job, League, LeagueEvent
+
+
+@jobs.handler('test_flaky')
+def _flaky_job(job):
+    if job.attempts < job.payload['fail_times'] + 1:
+        raise RuntimeError('Temporary failure')
+    return {'attempts': job.attempts}
+
+
+@jobs.handler('test_invalid')
+def _invalid_job(job):
+    raise jobs.JobFailed('Bad input')
+
+
+class JobTests(TestCase):
+    def test_enqueue_deduplicates_active_jobs(self):
+        job = jobs.enqueue('test_flaky', {'fail_times': 0}, key='same')
+        self.assertEqual(jobs.enqueue('test_flaky', {'fail_times': 0}, key='same').id, job.id)
+        self.assertNotEqual(jobs.enqueue('test_flaky', {'fail_times': 0}, key='other').id, job.id)
+
+    def test_claim_retry_and_success(self):
+        job = jobs.enqueue('test_flaky', {'fail_times': 1})
+        claimed = jobs.claim('worker-1')
+        self.assertEqual((claimed.id, claimed.status, claimed.attempts), (job.id, Job.RUNNING, 1))
+        self.assertIsNone(jobs.claim('worker-2'))
+
+        self.assertEqual(jobs.run(claimed), Job.QUEUED)
+        job.refresh_from_db()
+        self.assertEqual(job.error, 'Temporary failure')
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertIsNone(jobs.claim('worker-2'))  # Backing off
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        claimed = jobs.claim('worker-2')
+        self.assertEqual(claimed.attempts, 2)
+        self.assertEqual(jobs.run(claimed), Job.SUCCEEDED)
+        job.refresh_from_db()
+        self.assertEqual(job.result, {'attempts': 2})
+
+    def test_job_failed_is_not_retried(self):
+        jobs.enqueue('test_invalid', {})
+        self.assertEqual(jobs.run(jobs.claim('worker-1')), Job.FAILED)
+        self.assertIsNone(jobs.claim('worker-1'))
+
+    def test_progress_extends_the_lock(self):
+        jobs.enqueue('test_flaky', {'fail_times': 0})
+        claimed = jobs.claim('worker-1')
+        Job.objects.filter(pk=claimed.pk).update(locked_until=timezone.now() + timedelta(seconds=1))
+
+        jobs.report_progress(claimed, 3, 10)
+        job = Job.objects.get(pk=claimed.pk)
+        self.assertEqual((job.progress, job.total), (3, 10))
+        self.assertGreater(job.locked_until, timezone.now() + jobs.visibility_timeout() - timedelta(seconds=5))
+
+    def test_expired_lock_is_reclaimed(self):
+        jobs.enqueue('test_flaky', {'fail_times': 0})
+        stale = jobs.claim('worker-1')
+        Job.objects.filter(pk=stale.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+
+        claimed = jobs.claim('worker-2')
+        self.assertEqual((claimed.id, claimed.attempts, claimed.locked_by), (stale.id, 2, 'worker-2'))
+        # The first worker's late outcome and progress are discarded
+        jobs.report_progress(stale, 1, 1)
+        jobs.run(stale)
+        job = Job.objects.get(pk=stale.pk)
+        self.assertEqual((job.status, job.locked_by, job.progress), (Job.RUNNING, 'worker-2', 0))
+        self.assertEqual(jobs.run(claimed), Job.SUCCEEDED)
+
+    def test_reclaimed_job_out_of_attempts_fails(self):
+        job = jobs.enqueue('test_flaky', {'fail_times': 0}, max_attempts=1)
+        jobs.claim('worker-1')
+        Job.objects.filter(pk=job.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+
+        self.assertIsNone(jobs.claim('worker-2'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn('Timed out', job.error)
+
+    def test_unknown_kind_fails(self):
+        jobs.enqueue('test_unregistered', {})
+        claimed = jobs.claim('worker-1')
+        self.assertEqual(jobs.run(claimed), Job.FAILED)
+        self.assertIn('No handler', claimed.error)
+
+
+class SettlementJobTests(APITestCase):
+    def setUp(self):
+        self.captain = User.objects.create_user(username='captain', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.league = League.objects.create(name='Test League', captain=self.captain)
+        self.event = LeagueEvent.objects.create(league=self.league, event_key='evt', event_name='Home vs Away', sport='nba')
+        self.client.force_authenticate(user=self.captain)
+        self.url = reverse('complete-league-event', args=[self.event.id])
+
+    def test_completing_an_event_runs_as_a_job(self):
+        response = self.client.post(self.url, {'winner': 'Home'}, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.client.post(self.url, {'winner': 'Home'}, format='json').data['job_id'], response.data['job_id'])
+        self.assertFalse(LeagueEvent.objects.get(pk=self.event.pk).completed)
+
+        self.assertEqual(jobs.run(jobs.claim('worker-1')), Job.SUCCEEDED)
+
+        self.assertTrue(LeagueEvent.objects.get(pk=self.event.pk).completed)
+        status = self.client.get(response.data['status_url'])
+        self.assertEqual((status.data['status'], status.data['result']['event']['id']), (Job.SUCCEEDED, self.event.id))
+        self.client.force_authenticate(user=self.other)
+        self.assertEqual(self.client.get(response.data['status_url']).status_code, 404)
+
+    def test_settling_a_missing_event_fails_without_retrying(self):
+        self.client.post(self.url, {'winner': 'Home'}, format='json')
+        self.event.delete()
+
+        self.assertEqual(jobs.run(jobs.claim('worker-1')), Job.FAILED)
+        self.assertIsNone(jobs.claim('worker-1'))
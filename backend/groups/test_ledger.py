@@ -0,0 +1,53 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import F
+from django.test import TestCase
+from django.utils import timezone
+
+from users.models import User
+from . import ledger
+from .models import LedgerEntry
+
+
+class LedgerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='spender', password='testpass123')
+
+    def test_debit_checks_the_current_balance(self):
+        # Another request spends most of the money after this user object was loaded
+        User.objects.filter(pk=self.user.pk).update(money=F('money') - Decimal('970.00'))
+        self.assertEqual(self.user.money, Decimal('1000.00'))
+
+        self.assertIsNone(ledger.debit(self.user, Decimal('50.00'), LedgerEntry.BET_STAKE))
+        self.assertEqual(User.objects.get(pk=self.user.pk).money, Decimal('30.00'))
+        self.assertFalse(LedgerEntry.objects.filter(user=self.user).exists())
+
+        entry = ledger.debit(self.user, Decimal('20.00'), LedgerEntry.BET_STAKE, 'league_event:1')
+        self.assertEqual(entry.amount, Decimal('-20.00'))
+        self.assertEqual(self.user.money, Decimal('10.00'))
+
+    def test_payouts_add_to_the_balance(self):
+        User.objects.filter(pk=self.user.pk).update(money=Decimal('5.00'))
+        ledger.record([
+            LedgerEntry(user_id=self.user.pk, amount=Decimal('2.50'), reason=LedgerEntry.BET_PAYOUT),
+            LedgerEntry(user_id=self.user.pk, amount=Decimal('0'), reason=LedgerEntry.BET_PAYOUT),
+            LedgerEntry(user_id=self.user.pk, amount=Decimal('7.50'), reason=LedgerEntry.CIRCUIT_PRIZE),
+        ])
+        self.assertEqual(User.objects.get(pk=self.user.pk).money, Decimal('15.00'))
+        self.assertEqual(LedgerEntry.objects.filter(user=self.user).count(), 2)
+
+    def test_balance_at(self):
+        start = timezone.now()
+        ledger.credit(self.user, Decimal('100.00'), LedgerEntry.ADJUSTMENT)
+        after_credit = timezone.now()
+        ledger.snapshot_balances([self.user.pk])
+        ledger.debit(self.user, Decimal('40.00'), LedgerEntry.BET_STAKE)
+        after_debit = timezone.now()
+        ledger.credit(self.user, Decimal('5.00'), LedgerEntry.ADJUSTMENT)
+
+        self.assertEqual(ledger.balance_at(self.user, start), Decimal('1000.00'))
+        self.assertEqual(ledger.balance_at(self.user, after_credit), Decimal('1100.00'))
+        self.assertEqual(ledger.balance_at(self.user, after_debit), Decimal('1060.00'))
+        self.assertEqual(ledger.balance_at(self.user, timezone.now()), Decimal('1065.00'))
+        self.assertEqual(ledger.balance_at(self.user, self.user.date_joined - timedelta(days=1)), Decimal('0.00'))
@@ -0,0 +1,192 @@
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from .models import OddsApiSnapshot
+from .odds import RETRY_STATUS_CODES, OddsApiClient, PoolStats, SingleFlight, get_session
+from .odds_cache import odds_cache
+from .odds_fixtures import fixture_path, record_stream
+
+
+class PooledSessionTests(SimpleTestCase):
+    def test_clients_share_one_session_that_never_replays_reads(self):
+        session = get_session()
+        self.assertIs(OddsApiClient().session, session)
+        self.assertIs(OddsApiClient().session, session)
+
+        retry = session.get_adapter('https://api.the-odds-api.com').max_retries
+        self.assertEqual(retry.read, 0)
+        self.assertEqual(tuple(retry.status_forcelist), RETRY_STATUS_CODES)
+        self.assertEqual(retry.allowed_methods, frozenset(['GET']))
+
+    def test_pool_stats_estimate_handshake_time_saved(self):
+        stats = PoolStats()
+        stats.record(0.2, opened_connection=True)
+        stats.record(0.05, opened_connection=False)
+        stats.record(0.05, opened_connection=False)
+        # Retried requests are counted but their backoff is not timed
+        stats.record(5.0, opened_connection=False, retried=True)
+        stats.record_error()
+
+        snapshot = stats.snapshot()
+        self.assertEqual(
+            (snapshot['requests'], snapshot['new_connections'], snapshot['reused_connections'], snapshot['retried'], snapshot['errors']),
+            (4, 1, 3, 1, 1),
+        )
+        self.assertEqual(snapshot['avg_new_connection_ms'], 200.0)
+        self.assertEqual(snapshot['avg_reused_connection_ms'], 50.0)
+        self.assertEqual(snapshot['estimated_handshake_ms_saved'], 450.0)
+
+
+class SingleFlightTests(SimpleTestCase):
+    def run_concurrently(self, flight, fn, callers=4):
+        """Start callers threads on one key while the first is still inside fn"""
+        release = threading.Event()
+        results = []
+
+        def call():
+            try:
+                results.append(flight.do('key', lambda: fn(release)))
+            except Exception as e:
+                results.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(callers)]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while flight.stats()['coalesced'] < callers - 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        return results
+
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight(wait_timeout=5)
+        fn = mock.Mock(side_effect=lambda release: release.wait(5) and 'odds')
+
+        results = self.run_concurrently(flight, fn)
+
+        self.assertEqual(results, ['odds'] * 4)
+        fn.assert_called_once()
+        self.assertEqual(flight.stats(), {'calls': 4, 'executed': 1, 'coalesced': 3, 'in_flight': 0})
+
+    def test_waiters_receive_the_error(self):
+        flight = SingleFlight(wait_timeout=5)
+
+        def fail(release):
+            release.wait(5)
+            raise requests.exceptions.ConnectionError('down')
+
+        results = self.run_concurrently(flight, fail, callers=3)
+
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(isinstance(result, requests.exceptions.ConnectionError) for result in results))
+        self.assertEqual(flight.do('key', lambda: 'retried'), 'retried')
+
+    def test_nested_call_for_the_same_key_runs_directly(self):
+        flight = SingleFlight(wait_timeout=1)
+
+        self.assertEqual(flight.do('key', lambda: flight.do('key', lambda: 'inner')), 'inner')
+        self.assertEqual(flight.stats()['coalesced'], 0)
+
+
+class OddsSelectionTests(TestCase):
+    def test_selections_are_validated_and_normalised(self):
+        client = OddsApiClient()
+        narrowed = client.with_options(markets='Totals, h2h,totals', regions='uk,us')
+
+        self.assertEqual((narrowed.markets, narrowed.regions), ('h2h,totals', 'uk,us'))
+        self.assertEqual(client.markets, OddsApiClient.DEFAULT_MARKETS)
+        self.assertTrue(client.is_default_selection())
+        self.assertFalse(narrowed.is_default_selection())
+        self.assertEqual(narrowed.sport_events_key('nba'), client.with_options(markets='totals,h2h', regions='us,uk').sport_events_key('nba'))
+        self.assertNotEqual(narrowed.sport_events_key('nba'), client.sport_events_key('nba'))
+        for options in ({'markets': 'h2h,corners'}, {'regions': 'mars'}, {'bookmakers': 'fan duel'}, {'markets': ' , '}):
+            with self.subTest(options=options), self.assertRaises(ValueError):
+                client.with_options(**options)
+
+    def test_bookmakers_replace_regions_upstream(self):
+        client = OddsApiClient().with_options(markets='h2h', bookmakers='fanduel,draftkings')
+
+        self.assertEqual(client._selection_params(), {'bookmakers': 'draftkings,fanduel', 'markets': 'h2h'})
+        self.assertIn('bookmakers=draftkings,fanduel', client.sport_events_key('nba'))
+
+    def test_narrower_markets_are_cut_from_the_default_snapshot(self):
+        def market(key):
+            return {'key': key, 'outcomes': [{'name': 'Home', 'price': -110}]}
+
+        client = OddsApiClient()
+        odds_cache.store('sport_events', client.sport_events_key('nba'), [{
+            'id': 'evt', 'sport_key': 'nba', 'commence_time': '2024-01-01T00:00:00Z', 'event_name': 'Away @ Home',
+            'bookmakers': [{'key': 'fanduel', 'markets': [market('h2h'), market('totals')]}],
+            'consensus': {'h2h': {}, 'totals': {}},
+        }])
+
+        with mock.patch.object(OddsApiClient, '_get') as get:
+            events = client.with_options(markets='h2h').get_sport_events('nba')
+            self.assertIsNone(client.with_options(regions='uk')._events_from_default('nba'))
+        get.assert_not_called()
+        self.assertEqual([m['key'] for m in events[0]['bookmakers'][0]['markets']], ['h2h'])
+        self.assertEqual(list(events[0]['consensus']), ['h2h'])
+        self.assertEqual(events[0]['event_name'], 'Away @ Home')
+
+
+class EventOddsLookupTests(TestCase):
+    def test_unknown_event_is_searched_for_once(self):
+        client = OddsApiClient()
+        feed = mock.MagicMock()
+        feed.__enter__.return_value = feed
+        feed.iter_content.return_value = [b'[]']
+        with mock.patch.object(client, '_get', return_value=feed) as get:
+            for _ in range(3):
+                with self.assertRaises(ValueError):
+                    client.get_event_odds('no-such-event')
+            self.assertEqual(get.call_count, 1)
+
+            # Once the not-found entry expires the feed is searched again
+            OddsApiSnapshot.objects.update(fetched_at=timezone.now() - timedelta(hours=1))
+            with self.assertRaises(ValueError):
+                client.get_event_odds('no-such-event')
+            self.assertEqual(get.call_count, 2)
+
+
+class FixtureRecordingTests(TestCase):
+    url = 'https://api.the-odds-api.com/v4/sports/upcoming/odds'
+
+    def streamed(self, body):
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = io.BytesIO(body)
+        return response
+
+    def test_streamed_body_is_recorded_as_read(self):
+        body = json.dumps([{'id': f'event{i}', 'sport_key': 'nba'} for i in range(50)]).encode()
+        with tempfile.TemporaryDirectory() as fixture_dir:
+            response = record_stream(fixture_dir, self.url, self.streamed(body))
+            path = fixture_path(fixture_dir, self.url)
+            chunks = response.iter_content(chunk_size=64)
+            self.assertEqual(next(chunks), body[:64])
+            self.assertFalse(os.path.exists(path))
+
+            self.assertEqual(b''.join(chunks), body[64:])
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(), body)
+            self.assertEqual(os.listdir(os.path.dirname(path)), ['odds.json'])
+
+    def test_partly_read_body_is_not_recorded(self):
+        with tempfile.TemporaryDirectory() as fixture_dir:
+            response = record_stream(fixture_dir, self.url, self.streamed(b'[' + b'{}, ' * 100 + b'{}]'))
+            chunks = response.iter_content(chunk_size=16)
+            next(chunks)
+            chunks.close()
+            self.assertEqual(os.listdir(os.path.dirname(fixture_path(fixture_dir, self.url))), [])
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.test import SimpleTestCase
+
+from .odds_async import AsyncOddsApiClient
+from .odds_breaker import mark_served
+
+
+class FakeClient:
+    """Blocking client that records how many calls overlap"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.calls = []
+
+    def get_sport_events(self, sport_key):
+        with self._lock:
+            self.calls.append(sport_key)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            time.sleep(0.05)
+            if sport_key == 'broken':
+                raise ValueError('upstream error')
+            # The staleness of a read is reported on the thread that made it
+            mark_served(datetime(2024, 1, 1, tzinfo=dt_timezone.utc) if sport_key == 'stale' else None)
+            return [{'id': f'{sport_key}-1'}]
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+class AsyncOddsApiClientTests(SimpleTestCase):
+    def test_sports_are_fetched_concurrently_within_the_limit(self):
+        client = FakeClient()
+        sports = ['nba', 'nhl', 'mlb', 'nfl', 'epl', 'nba']
+
+        results = asyncio.run(AsyncOddsApiClient(client, max_concurrency=2).get_many_sport_events(sports))
+
+        self.assertEqual(sorted(client.calls), ['epl', 'mlb', 'nba', 'nfl', 'nhl'])
+        self.assertEqual(client.max_running, 2)
+        self.assertEqual(results['nba'], {'events': [{'id': 'nba-1'}]})
+
+    def test_failed_and_stale_sports_are_reported_per_sport(self):
+        results = asyncio.run(AsyncOddsApiClient(FakeClient()).get_many_sport_events(['nba', 'broken', 'stale']))
+
+        self.assertEqual(results['broken'], {'error': 'upstream error'})
+        self.assertEqual(results['stale'], {'events': [{'id': 'stale-1'}], 'stale': True, 'fetched_at': '2024-01-01T00:00:00+00:00'})
+        self.assertNotIn('stale', results['nba'])
@@ -0,0 +1,80 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from . import odds_breaker
+from .odds_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, OddsApiUnavailable
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch.object(odds_breaker.time, 'monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(failure_threshold=3, slow_call_seconds=5, reset_seconds=30)
+
+    def open_breaker(self):
+        for _ in range(3):
+            self.breaker.record_failure(self.breaker.before_call())
+
+    def test_consecutive_failures_open_the_breaker(self):
+        self.breaker.record_failure(self.breaker.before_call())
+        self.breaker.record_success(0.1, self.breaker.before_call())
+        self.open_breaker()
+
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertTrue(self.breaker.is_open())
+        with self.assertRaises(OddsApiUnavailable):
+            self.breaker.before_call()
+        self.assertEqual(self.breaker.stats()['short_circuited'], 1)
+        self.assertEqual(self.breaker.stats()['times_opened'], 1)
+
+    def test_slow_calls_count_as_failures(self):
+        for _ in range(3):
+            self.breaker.record_success(6, self.breaker.before_call())
+
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_half_open_lets_one_probe_through(self):
+        self.open_breaker()
+        self.now += 30
+
+        probe = self.breaker.before_call()
+        self.assertTrue(probe)
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        with self.assertRaises(OddsApiUnavailable):
+            self.breaker.before_call()
+
+        self.breaker.record_success(0.1, probe)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertFalse(self.breaker.before_call())
+
+    def test_failed_probe_reopens(self):
+        self.open_breaker()
+        self.now += 30
+
+        self.breaker.record_failure(self.breaker.before_call())
+
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.breaker.stats()['times_opened'], 2)
+        with self.assertRaises(OddsApiUnavailable):
+            self.breaker.before_call()
+
+    def test_calls_started_before_opening_do_not_change_state(self):
+        straggler = self.breaker.before_call()
+        late_failure = self.breaker.before_call()
+        self.open_breaker()
+
+        self.breaker.record_success(0.1, straggler)
+        self.assertEqual(self.breaker.state, OPEN)
+
+        self.now += 30
+        probe = self.breaker.before_call()
+        self.breaker.record_failure(late_failure)
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        with self.assertRaises(OddsApiUnavailable):
+            self.breaker.before_call()
+
+        self.breaker.record_success(0.1, probe)
+        self.assertEqual(self.breaker.state, CLOSED)
@@ -0,0 +1,112 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from . import odds_cache as odds_cache_module
+from .models import OddsApiQuota, OddsApiSnapshot
+from .odds_cache import OddsApiQuotaExhausted, OddsCache, make_key
+from .odds_quota import QuotaTracker
+
+
+class OddsCacheTests(TestCase):
+    def setUp(self):
+        # A healthy quota, whatever earlier tests left in the shared tracker
+        patcher = mock.patch.multiple(
+            odds_cache_module.quota, is_low=mock.Mock(return_value=False),
+            is_exhausted=mock.Mock(return_value=False), ttl_factor=mock.Mock(return_value=1),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = OddsCache()
+        self.key = make_key('sport_events', 'nba', 'us', 'h2h', 'american')
+
+    def age(self, seconds):
+        OddsApiSnapshot.objects.filter(cache_key=self.key).update(fetched_at=timezone.now() - timedelta(seconds=seconds))
+
+    def test_miss_is_fetched_once_then_served_from_the_table(self):
+        fetch = mock.Mock(return_value=[{'id': 'evt'}])
+
+        self.assertEqual(self.cache.get_or_fetch('sport_events', self.key, fetch), [{'id': 'evt'}])
+        self.assertEqual(self.cache.get_or_fetch('sport_events', self.key, fetch), [{'id': 'evt'}])
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual((self.cache.misses, self.cache.hits), (1, 1))
+
+    def test_stale_entry_is_served_while_one_caller_refreshes_it(self):
+        self.cache.store('sport_events', self.key, ['old'])
+        self.age(5 * 60)
+        fetch = mock.Mock(return_value=['new'])
+
+        with mock.patch.object(self.cache, '_refresh_in_background') as refresh:
+            self.assertEqual(self.cache.get_or_fetch('sport_events', self.key, fetch), ['old'])
+            self.assertEqual(self.cache.get_or_fetch('sport_events', self.key, fetch), ['old'])
+        # The second reader found the lease taken
+        refresh.assert_called_once_with('sport_events', self.key, fetch)
+        fetch.assert_not_called()
+        self.assertEqual(self.cache.stale_hits, 2)
+
+        # Storing the refreshed payload releases the lease
+        self.cache.store('sport_events', self.key, ['new'])
+        self.assertIsNone(OddsApiSnapshot.objects.get(cache_key=self.key).refresh_lease_until)
+
+    def test_entry_past_the_stale_window_is_fetched_synchronously(self):
+        self.cache.store('sport_events', self.key, ['old'])
+        self.age(2 * 60 + self.cache.stale_seconds + 1)
+
+        self.assertEqual(self.cache.get_or_fetch('sport_events', self.key, lambda: ['new']), ['new'])
+        self.assertIsNone(self.cache.get_fresh('sport_events', make_key('sport_events', 'nhl')))
+        self.assertEqual(self.cache.get_fresh('sport_events', self.key), ['new'])
+        self.assertEqual(self.cache.last_good(self.key)[0], ['new'])
+
+    def test_make_key_orders_extra_parameters(self):
+        self.assertEqual(make_key('event_odds', 'nba', event='e1', bookmakers='fanduel'), make_key('event_odds', 'nba', bookmakers='fanduel', event='e1'))
+        self.assertNotEqual(make_key('sport_events', 'nba', markets='h2h'), make_key('sport_events', 'nba', markets='totals'))
+
+
+class QuotaThrottlingTests(TestCase):
+    def setUp(self):
+        self.tracker = QuotaTracker()
+        self.tracker.low_threshold = 500
+        patcher = mock.patch.object(odds_cache_module, 'quota', self.tracker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = OddsCache()
+        self.key = make_key('sport_events', 'nba', 'us', 'h2h', 'american')
+
+    def report(self, remaining):
+        self.tracker.record({'x-requests-remaining': str(remaining), 'x-requests-used': '100', 'x-requests-last': '3'})
+
+    def test_usage_headers_are_shared_through_the_table(self):
+        self.tracker.record({'content-type': 'application/json'})
+        self.assertFalse(OddsApiQuota.objects.exists())
+
+        self.report(420)
+
+        other_worker = QuotaTracker()
+        self.assertEqual(other_worker.remaining(), 420)
+        self.assertTrue(other_worker.is_low())
+        self.assertFalse(other_worker.is_exhausted())
+        self.assertEqual(other_worker.ttl_factor(), other_worker.ttl_multiplier)
+        self.assertEqual(other_worker.stats()['last_request_cost'], 3)
+
+    def test_low_quota_serves_old_copies_instead_of_refreshing(self):
+        self.cache.store('sport_events', self.key, ['old'])
+        OddsApiSnapshot.objects.update(fetched_at=timezone.now() - timedelta(days=1))
+        self.report(100)
+        fetch = mock.Mock(return_value=['new'])
+
+        self.assertEqual(self.cache.get_or_fetch('sport_events', self.key, fetch), ['old'])
+        self.assertIsNone(self.cache.refresh('sport_events', self.key, fetch))
+        self.assertIsNone(self.cache.get_or_fetch('sport_events', 'uncached', fetch, essential=False))
+        fetch.assert_not_called()
+        self.assertEqual(self.tracker.refused_refreshes, 3)
+
+        # An essential miss still spends a request while any quota is left
+        self.assertEqual(self.cache.get_or_fetch('sport_events', 'uncached', fetch), ['new'])
+
+    def test_exhausted_quota_without_a_copy_raises(self):
+        self.report(0)
+
+        with self.assertRaises(OddsApiQuotaExhausted):
+            self.cache.get_or_fetch('sport_events', self.key, mock.Mock())
@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from . import odds_history
+from .models import OddsPriceChange
+
+
+def snapshot(home_price, away_price, total_point=210.5):
+    return [{
+        'id': 'evt',
+        'bookmakers': [{'key': 'fanduel', 'markets': [
+            {'key': 'h2h', 'outcomes': [{'name': 'Home', 'price': home_price}, {'name': 'Away', 'price': away_price}]},
+            {'key': 'totals', 'outcomes': [{'name': 'Over', 'price': -110, 'point': total_point}, {'name': 'Under', 'price': None}]},
+        ]}],
+    }]
+
+
+class OddsHistoryTests(TestCase):
+    def setUp(self):
+        self.start = timezone.now() - timedelta(hours=2)
+
+    def test_only_changed_prices_are_written(self):
+        self.assertEqual(odds_history.record_changes(None, snapshot(-150, 130), self.start), 3)
+        self.assertEqual(odds_history.record_changes(snapshot(-150, 130), snapshot(-150, 130)), 0)
+        # A moved line counts as a change even when the price is the same
+        self.assertEqual(odds_history.record_changes(snapshot(-150, 130), snapshot(-160, 130, total_point=211.5)), 2)
+        self.assertEqual(OddsPriceChange.objects.count(), 5)
+
+    def test_history_is_one_ordered_series_per_outcome(self):
+        odds_history.record_changes(None, snapshot(-150, 130), self.start)
+        odds_history.record_changes(snapshot(-150, 130), snapshot(-160, 130), self.start + timedelta(hours=1))
+
+        series = {entry['outcome']: entry for entry in odds_history.price_history('evt')}
+        self.assertEqual([point['price'] for point in series['Home']['points']], [-150, -160])
+        self.assertEqual([point['price'] for point in series['Away']['points']], [130])
+        self.assertEqual(series['Over']['points'][0]['point'], 210.5)
+
+        recent = odds_history.price_history('evt', since=self.start + timedelta(minutes=30))
+        self.assertEqual([(entry['outcome'], len(entry['points'])) for entry in recent], [('Home', 1)])
+
+    def test_prune_drops_changes_past_retention(self):
+        odds_history.record_changes(None, snapshot(-150, 130), timezone.now() - timedelta(days=10))
+        odds_history.record_changes(snapshot(-150, 130), snapshot(-160, 130))
+
+        self.assertEqual(odds_history.prune(retention_days=7), 3)
+        self.assertEqual(OddsPriceChange.objects.count(), 1)
@@ -0,0 +1,82 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from users.models import User
+from .models import League, LeagueEvent, OddsEventIndex
+from .odds import OddsApiClient
+from .odds_index import EventIndex
+
+
+class EventIndexTests(TestCase):
+    def test_events_seen_by_one_worker_are_found_by_another(self):
+        EventIndex().add_events([
+            {'id': 'e1', 'sport_key': 'basketball_nba', 'commence_time': '2024-01-01T00:00:00Z'},
+            {'id': 'e2', 'sport_key': 'icehockey_nhl'},
+            {'sport_key': 'no_id'},
+        ])
+
+        other_worker = EventIndex()
+        self.assertEqual(other_worker.lookup('e1'), 'basketball_nba')
+        self.assertEqual(other_worker.lookup('e2'), 'icehockey_nhl')
+        self.assertIsNone(other_worker.lookup('unknown'))
+        self.assertEqual(OddsEventIndex.objects.count(), 2)
+
+    def test_league_events_fill_the_index(self):
+        captain = User.objects.create_user(username='captain', password='testpass123')
+        league = League.objects.create(name='Test League', captain=captain)
+        LeagueEvent.objects.create(league=league, event_key='evt', event_id='posted', event_name='Home vs Away', sport='basketball_nba')
+
+        self.assertEqual(EventIndex().lookup('posted'), 'basketball_nba')
+        self.assertEqual(OddsEventIndex.objects.get(event_id='posted').sport_key, 'basketball_nba')
+
+    def test_local_entries_are_bounded(self):
+        index = EventIndex(max_local_entries=2)
+        index.add_events([{'id': f'e{i}', 'sport_key': 'nba'} for i in range(2)])
+        index.add_events([{'id': 'e2', 'sport_key': 'nba'}])
+
+        self.assertEqual(list(index._local), ['e2'])
+        self.assertEqual(index.lookup('e0'), 'nba')
+
+
+def feed_event(event_id, last_update):
+    return {'id': event_id, 'sport_key': 'nba', 'bookmakers': [{'key': 'a', 'last_update': last_update}, {'key': 'b', 'last_update': '2024-01-01T00:00:00Z'}]}
+
+
+class ChangeTrackingTests(TestCase):
+    def setUp(self):
+        self.t0 = timezone.now() - timedelta(minutes=10)
+        self.t1 = self.t0 + timedelta(minutes=5)
+        index = EventIndex()
+        index.record_snapshot('nba', [feed_event('same', '2024-01-01T10:00:00Z'), feed_event('moved', '2024-01-01T10:00:00Z'), feed_event('gone', '2024-01-01T10:00:00Z')], at=self.t0)
+        index.record_snapshot('nba', [feed_event('same', '2024-01-01T10:00:00Z'), feed_event('moved', '2024-01-01T10:05:00Z'), feed_event('new', '2024-01-01T10:05:00Z')], at=self.t1)
+
+    def test_changes_since_a_cursor(self):
+        changed, removed = EventIndex().changes_since('nba', self.t0)
+
+        self.assertEqual(changed, {'moved', 'new'})
+        self.assertEqual(removed, ['gone'])
+        self.assertEqual(EventIndex().changes_since('nba', self.t1), (set(), []))
+
+    def test_relisted_event_is_no_longer_removed(self):
+        t2 = self.t1 + timedelta(minutes=1)
+        EventIndex().record_snapshot('nba', [feed_event('gone', '2024-01-01T10:00:00Z')], at=t2)
+
+        changed, removed = EventIndex().changes_since('nba', self.t1)
+        self.assertEqual(changed, {'gone'})
+        self.assertEqual(sorted(removed), ['moved', 'new', 'same'])
+        self.assertIsNone(OddsEventIndex.objects.get(event_id='gone').removed_at)
+
+    def test_client_serves_only_the_changes(self):
+        client = OddsApiClient()
+        events = [{'id': event_id} for event_id in ('same', 'moved', 'new')]
+        with mock.patch.object(client, 'get_sport_events', return_value=events):
+            full = client.get_sport_events_since('nba')
+            delta = client.get_sport_events_since('nba', since=self.t0)
+
+        self.assertEqual((full['events'], full['removed']), (events, []))
+        self.assertEqual([event['id'] for event in delta['events']], ['moved', 'new'])
+        self.assertEqual(delta['removed'], ['gone'])
+        self.assertLessEqual(delta['cursor'], timezone.now())
@@ -0,0 +1,43 @@
+import json
+
+from django.test import SimpleTestCase
+
+from .odds_stream import iter_json_array, project_event, selection
+
+
+class IterJsonArrayTests(SimpleTestCase):
+    def test_elements_split_across_chunks(self):
+        document = json.dumps([{'id': 'a', 'name': 'é'}, 12345, [1, 2], 'x', None]).encode()
+
+        for size in (1, 3, 7, len(document)):
+            chunks = [document[i:i + size] for i in range(0, len(document), size)]
+            self.assertEqual(list(iter_json_array(chunks)), [{'id': 'a', 'name': 'é'}, 12345, [1, 2], 'x', None])
+
+    def test_empty_array(self):
+        self.assertEqual(list(iter_json_array([b' [ ] '])), [])
+
+    def test_malformed_arrays_raise(self):
+        for document in (b'[1,,2]', b'[,1]', b'[1,]', b'[,]', b'[1 2]', b'[1, 2', b'{"a": 1}', b'[1] 2', b''):
+            with self.subTest(document=document), self.assertRaises(ValueError):
+                list(iter_json_array([document]))
+
+
+class ProjectEventTests(SimpleTestCase):
+    def test_keeps_selected_markets_and_bookmakers(self):
+        event = {
+            'id': 'evt', 'sport_key': 'nba', 'sport_title': 'NBA', 'commence_time': '2024-01-01T00:00:00Z',
+            'home_team': 'Home', 'away_team': 'Away', 'extra': 'dropped',
+            'bookmakers': [
+                {'key': 'fanduel', 'title': 'FanDuel', 'last_update': 't', 'markets': [
+                    {'key': 'h2h', 'outcomes': []}, {'key': 'totals', 'outcomes': []},
+                ]},
+                {'key': 'draftkings', 'title': 'DraftKings', 'last_update': 't', 'markets': []},
+            ],
+        }
+
+        projected = project_event(event, selection('h2h'), selection(' fanduel ,'))
+
+        self.assertNotIn('extra', projected)
+        self.assertEqual([book['key'] for book in projected['bookmakers']], ['fanduel'])
+        self.assertEqual([market['key'] for market in projected['bookmakers'][0]['markets']], ['h2h'])
+        self.assertIsNone(selection(''))
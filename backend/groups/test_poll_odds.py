@@ -0,0 +1,67 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from users.models import User
+from .management.commands.poll_odds import BACKGROUND_INTERVAL, Command, poll_interval
+from .models import League, LeagueEvent
+from .odds_cache import odds_cache
+
+
+class PollOddsTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        captain = User.objects.create_user(username='captain', password='testpass123')
+        self.league = League.objects.create(name='Test League', captain=captain, sports=['NHL'])
+        self.client = mock.Mock()
+        self.client.get_sports.return_value = {'sports': [
+            {'key': 'basketball_nba', 'title': 'NBA', 'group': 'Basketball', 'active': True},
+            {'key': 'icehockey_nhl', 'title': 'NHL', 'group': 'Ice Hockey', 'active': True},
+            {'key': 'baseball_mlb', 'title': 'MLB', 'group': 'Baseball', 'active': True},
+        ]}
+        self.client.sport_events_key.side_effect = lambda sport_key: f'sport_events:{sport_key}'
+
+    def event(self, sport, starts_in, **kwargs):
+        return LeagueEvent.objects.create(
+            league=self.league, event_key=f'{sport}{starts_in}', event_id=f'{sport}{starts_in}', event_name='Home vs Away',
+            sport=sport, commence_time=self.now + starts_in, **kwargs
+        )
+
+    def test_poll_interval_tiers(self):
+        self.assertEqual(poll_interval(self.now + timedelta(hours=1), self.now), timedelta(minutes=1))
+        self.assertEqual(poll_interval(self.now - timedelta(hours=1), self.now), timedelta(minutes=1))
+        self.assertEqual(poll_interval(self.now + timedelta(hours=12), self.now), timedelta(minutes=5))
+        self.assertEqual(poll_interval(self.now + timedelta(days=3), self.now), timedelta(minutes=20))
+        self.assertEqual(poll_interval(self.now + timedelta(days=30), self.now), BACKGROUND_INTERVAL)
+        self.assertEqual(poll_interval(None, self.now), BACKGROUND_INTERVAL)
+
+    def test_schedule_follows_the_next_open_game(self):
+        self.event('basketball_nba', timedelta(hours=1))
+        self.event('basketball_nba', timedelta(days=2))
+        # Finished games and sports the Odds API does not list are not polled
+        self.event('baseball_mlb', timedelta(hours=1), completed=True)
+        self.event('baseball_mlb', -timedelta(hours=6))
+        self.event('cricket_test', timedelta(hours=1))
+
+        schedule = Command().build_schedule(self.client, self.now)
+
+        self.assertEqual(schedule, {'basketball_nba': timedelta(minutes=1), 'icehockey_nhl': BACKGROUND_INTERVAL})
+
+    def test_poll_refreshes_due_sports_soonest_first_and_stops_when_quota_is_low(self):
+        self.event('basketball_nba', timedelta(hours=1))
+        odds_cache.store('sport_events', 'sport_events:icehockey_nhl', [])
+        command = Command()
+
+        self.client.refresh_sport_events.return_value = []
+        self.assertEqual(command.poll(self.client), 1)
+        self.client.refresh_sport_events.assert_called_once_with('basketball_nba')
+
+        # The NHL snapshot is fresh; once it is due, a refused refresh ends the pass
+        self.event('baseball_mlb', timedelta(hours=12))
+        self.client.refresh_sport_events.reset_mock()
+        self.client.refresh_sport_events.return_value = None
+        with mock.patch.object(odds_cache, 'fetched_at', return_value={}):
+            self.assertEqual(command.poll(self.client), 0)
+        self.client.refresh_sport_events.assert_called_once_with('basketball_nba')
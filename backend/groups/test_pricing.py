@@ -0,0 +1,62 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from . import pricing
+
+
+def event(*books):
+    return {'id': 'evt', 'bookmakers': [{'key': key, 'markets': markets} for key, markets in books]}
+
+
+def h2h(home, away):
+    return {'key': 'h2h', 'outcomes': [{'name': 'Home', 'price': home}, {'name': 'Away', 'price': away}]}
+
+
+class PricingTests(SimpleTestCase):
+    def test_american_and_decimal_conversion(self):
+        american = np.array([150.0, -200.0, 100.0, np.nan])
+
+        decimal = pricing.to_decimal(american)
+
+        np.testing.assert_allclose(decimal[:3], [2.5, 1.5, 2.0])
+        self.assertTrue(np.isnan(decimal[3]))
+        np.testing.assert_array_equal(pricing.from_decimal(decimal[:3]), [150, -200, 100])
+        self.assertIs(pricing.to_decimal(decimal, 'decimal'), decimal)
+
+    def test_best_price_consensus_and_fair_odds(self):
+        events = [event(('fanduel', [h2h(-110, -110)]), ('draftkings', [h2h(100, -120)])), {'id': 'empty', 'bookmakers': []}]
+
+        consensus = pricing.consensus_for_events(events)
+
+        self.assertEqual(consensus[1], {})
+        market = consensus[0]['h2h']
+        self.assertAlmostEqual(market['overround'], 1.046, places=3)
+        home, away = market['outcomes']
+        self.assertEqual((home['name'], home['books'], home['best_price'], home['best_bookmaker']), ('Home', 2, 100, 'draftkings'))
+        self.assertEqual((away['best_price'], away['best_bookmaker']), (-110, 'fanduel'))
+        self.assertEqual((home['consensus_price'], away['consensus_price']), (-105, -115))
+        self.assertIsNone(home['consensus_point'])
+        # With the margin removed the market's probabilities sum to 1
+        self.assertAlmostEqual(home['fair_probability'] + away['fair_probability'], 1, places=3)
+        self.assertAlmostEqual(home['fair_probability'], 0.4891, places=3)
+
+    def test_lines_and_outcomes_missing_at_some_books(self):
+        def spreads(point):
+            return {'key': 'spreads', 'outcomes': [{'name': 'Home', 'price': -110, 'point': point}]}
+
+        events = [event(('a', [spreads(-3.5)]), ('b', [spreads(-4.5)]), ('c', [spreads(-4.0), h2h(2.1, 1.8)]))]
+
+        consensus = pricing.consensus_for_events(events, 'decimal')[0]
+
+        self.assertEqual(consensus['spreads']['outcomes'][0]['consensus_point'], -4.0)
+        self.assertEqual(consensus['spreads']['outcomes'][0]['books'], 3)
+        home = consensus['h2h']['outcomes'][0]
+        self.assertEqual((home['books'], home['best_price'], home['best_bookmaker']), (1, 2.1, 'c'))
+
+    def test_attach_consensus_is_best_effort(self):
+        events = [event(('a', [h2h(-110, -110)]))]
+        self.assertIn('h2h', pricing.attach_consensus(events)[0]['consensus'])
+
+        broken = [{'id': 'evt', 'bookmakers': [{'markets': []}]}]
+        self.assertEqual(pricing.attach_consensus(broken), broken)
+        self.assertNotIn('consensus', broken[0])
@@ -0,0 +1,78 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from users.models import User
+from .management.commands import settle_events as command_module
+from .management.commands.settle_events import Command, retry_delay
+from .models import League, LeagueEvent
+from .odds_scores import FINAL, MANUAL, PENDING, decide, expected_duration
+
+
+def game(home_score, away_score, completed=True, sport_key='basketball_nba'):
+    return {
+        'id': 'g', 'sport_key': sport_key, 'completed': completed,
+        'scores': [{'name': 'Home', 'score': str(home_score)}, {'name': 'Away', 'score': str(away_score)}],
+    }
+
+
+class DecideTests(SimpleTestCase):
+    def test_results(self):
+        self.assertEqual(decide(None), (PENDING, None))
+        self.assertEqual(decide(game(1, 0, completed=False)), (PENDING, None))
+        self.assertEqual(decide(game(101, 99), 'Home', 'Away'), (FINAL, 'Home'))
+        self.assertEqual(decide(game(99, 101), 'home', 'away'), (FINAL, 'Away'))
+        self.assertEqual(decide(game(1, 1, sport_key='soccer_epl')), (FINAL, 'Draw'))
+
+    def test_games_needing_a_person(self):
+        self.assertEqual(decide(game(3, 3))[0], MANUAL)
+        self.assertEqual(decide(game(1, 0), 'Home', 'Visitors')[0], MANUAL)
+        self.assertEqual(decide(dict(game(1, 0), scores=[{'name': 'Home', 'score': 'n/a'}]))[0], MANUAL)
+
+    def test_timing(self):
+        self.assertEqual(expected_duration('soccer_epl'), timedelta(hours=1, minutes=55))
+        self.assertEqual(expected_duration('cricket_test'), timedelta(hours=3))
+        self.assertEqual([retry_delay(attempts) for attempts in (1, 2, 3)], [timedelta(minutes=m) for m in (10, 20, 40)])
+        self.assertEqual(retry_delay(10), timedelta(hours=2))
+
+
+class SettlePassTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        captain = User.objects.create_user(username='captain', password='testpass123')
+        self.leagues = [League.objects.create(name=f'League {i}', captain=captain) for i in range(2)]
+        patcher = mock.patch.object(command_module.quota, 'is_exhausted', return_value=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.command = Command()
+        self.command.backoff, self.command.manual = {}, set()
+        self.client = mock.Mock()
+
+    def event(self, event_id, started_ago, league=0):
+        return LeagueEvent.objects.create(
+            league=self.leagues[league], event_key=event_id, event_id=event_id, event_name='Away @ Home', sport='basketball_nba',
+            home_team='Home', away_team='Away', commence_time=self.now - started_ago,
+        )
+
+    def test_final_games_are_settled_in_every_league(self):
+        final = [self.event('final', timedelta(hours=3), league=i) for i in range(2)]
+        self.event('pending', timedelta(hours=3))
+        self.event('tied', timedelta(hours=3))
+        self.event('playing', timedelta(hours=1))
+        self.client.get_scores.return_value = [
+            dict(game(100, 90), id='final'), dict(game(50, 40, completed=False), id='pending'), dict(game(80, 80), id='tied'),
+        ]
+
+        self.assertEqual(sorted(self.command.settle_pass(self.client)), [event.id for event in final])
+
+        self.assertEqual(LeagueEvent.objects.filter(completed=True).count(), 2)
+        self.assertEqual(LeagueEvent.objects.get(pk=final[1].pk).market_data['winner'], 'Home')
+        sport_key, event_ids, days_from = self.client.get_scores.call_args.args
+        self.assertEqual((sport_key, sorted(event_ids), days_from), ('basketball_nba', ['final', 'pending', 'tied'], 1))
+        self.assertEqual(self.command.manual, {'tied'})
+        self.assertEqual(self.command.backoff['pending'][0], 1)
+
+        # Neither the game waiting out its backoff nor the manual one is asked about again
+        self.assertEqual(self.command.due_events(self.now), {})
@@ -0,0 +1,153 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from users.models import User
+from . import settlement
+from .models import (
+    Bet, Circuit, CircuitComponentEvent, CircuitParticipant, League, LeagueEvent, LedgerEntry, SettlementChunk,
+    UserBet, Wager,
+)
+
+
+class SettlementTests(TestCase):
+    def setUp(self):
+        self.captain = User.objects.create_user(username='captain', password='testpass123')
+        self.bettors = [User.objects.create_user(username=f'bettor{i}', password='testpass123') for i in range(5)]
+        self.league = League.objects.create(name='Test League', captain=self.captain)
+        self.event = LeagueEvent.objects.create(
+            league=self.league, event_key='evt', event_name='Home vs Away', sport='nba'
+        )
+        # Bettors 0, 2 and 4 pick the home side
+        self.wagers = [
+            Wager.objects.create(
+                league_event=self.event, user=user, outcome='Home' if i % 2 == 0 else 'Away',
+                amount=Decimal('10.00'), odds=2.5
+            )
+            for i, user in enumerate(self.bettors)
+        ]
+
+    def balances(self):
+        return list(User.objects.filter(id__in=[user.id for user in self.bettors]).order_by('id').values_list('money', flat=True))
+
+    def test_chunked_settlement_resumes_and_pays_once(self):
+        # An earlier attempt committed the first chunk of two bets and then stopped
+        self.assertTrue(settlement._apply_chunk(self.event, 'user_bets', 0, 2, 'Home'))
+        self.assertFalse(settlement._apply_chunk(self.event, 'user_bets', 0, 2, 'Home'))
+
+        with mock.patch.object(settlement, 'BATCH_SIZE', 100):
+            # Chunk boundaries come from the recorded chunks, not the current batch size
+            settlement.settle_league_event(self.event, 'home')
+            settled = self.balances()
+            settlement.settle_league_event(self.event, 'Home')
+
+        self.assertEqual(self.balances(), settled)
+        self.assertEqual(settled, [Decimal('1025.00'), Decimal('1000.00')] * 2 + [Decimal('1025.00')])
+        self.assertEqual(SettlementChunk.objects.filter(league_event=self.event).count(), 3)
+        self.assertEqual(LedgerEntry.objects.filter(reason=LedgerEntry.BET_PAYOUT).count(), 3)
+        self.assertEqual(
+            list(Wager.objects.filter(league_event=self.event).order_by('id').values_list('result', flat=True)),
+            ['won', 'lost', 'won', 'lost', 'won'],
+        )
+        self.event.refresh_from_db()
+        self.assertTrue(self.event.completed)
+
+    def test_settlement_rejects_another_winner(self):
+        settlement._apply_chunk(self.event, 'user_bets', 0, 2, 'Home')
+        with self.assertRaises(ValueError):
+            settlement.settle_league_event(self.event, 'Away')
+
+        settlement.settle_league_event(self.event, 'Home')
+        with self.assertRaises(ValueError):
+            settlement.settle_league_event(self.event, 'Away')
+        self.assertEqual(LedgerEntry.objects.filter(reason=LedgerEntry.BET_PAYOUT).count(), 3)
+
+    def test_user_bets_are_resolved_by_their_own_choice(self):
+        outsider = User.objects.create_user(username='outsider', password='testpass123')
+
+        def user_bet(user, choice):
+            bet = Bet.objects.create(league=self.league, name='evt', type='moneyline', points=0, deadline=timezone.now())
+            return UserBet.objects.create(user=user, bet=bet, league_event=self.event, choice=choice, points_wagered=5)
+
+        # Bettor 0 holds a winning wager, and UserBets on both sides
+        backed = user_bet(self.bettors[0], ' home ')
+        opposed = user_bet(self.bettors[0], 'Away')
+        # Bettor 1 lost their wager but this UserBet wins; the outsider holds no wager at all
+        changed_mind = user_bet(self.bettors[1], 'Home')
+        no_wager = user_bet(outsider, 'HOME')
+
+        settlement.settle_league_event(self.event, 'Home')
+
+        results = {bet.id: bet.result for bet in UserBet.objects.filter(league_event=self.event)}
+        self.assertEqual(
+            [results[bet.id] for bet in (backed, opposed, changed_mind, no_wager)],
+            ['won', 'lost', 'won', 'won'],
+        )
+
+    def test_circuit_event_settled_twice_scores_once(self):
+        circuit = Circuit.objects.create(league=self.league, name='Circuit', entry_fee=Decimal('10'), captain=self.captain)
+        other = Circuit.objects.create(league=self.league, name='Other', entry_fee=Decimal('10'), captain=self.captain)
+        bet = Bet.objects.create(league=self.league, name='evt', type='moneyline', points=0, deadline=timezone.now())
+        for i, user in enumerate(self.bettors[:2]):
+            CircuitParticipant.objects.create(circuit=circuit, user=user)
+            CircuitParticipant.objects.create(circuit=other, user=user)
+            UserBet.objects.create(user=user, bet=bet, league_event=self.event, choice='Home' if i == 0 else 'Away', points_wagered=3)
+        component = CircuitComponentEvent.objects.create(circuit=circuit, league_event=self.event, weight=3)
+        other_component = CircuitComponentEvent.objects.create(circuit=other, league_event=self.event, weight=2)
+
+        updates = settlement.settle_circuit_event(circuit, self.event, component, 'Home')
+        self.assertEqual(list(updates), [self.bettors[0].id])
+        self.assertIsNone(settlement.settle_circuit_event(circuit, self.event, component, 'Home'))
+        with self.assertRaises(ValueError):
+            settlement.settle_circuit_event(other, self.event, other_component, 'Away')
+        # A circuit sharing the event is still scored on it
+        self.assertEqual(list(settlement.settle_circuit_event(other, self.event, other_component, 'Home')), [self.bettors[0].id])
+
+        scores = dict(CircuitParticipant.objects.filter(user=self.bettors[0]).values_list('circuit_id', 'score'))
+        self.assertEqual(scores, {circuit.id: 3, other.id: 2})
+        self.assertEqual(CircuitParticipant.objects.get(circuit=circuit, user=self.bettors[1]).score, 0)
+
+
+class SettleEventsTests(TestCase):
+    def setUp(self):
+        self.captain = User.objects.create_user(username='captain', password='testpass123')
+        self.player = User.objects.create_user(username='player', password='testpass123')
+        self.punter = User.objects.create_user(username='punter', password='testpass123')
+        self.league = League.objects.create(name='Test League', captain=self.captain)
+        self.event = LeagueEvent.objects.create(league=self.league, event_key='evt', event_name='Home vs Away', sport='nba')
+        self.circuit = Circuit.objects.create(league=self.league, name='Circuit', entry_fee=Decimal('10'), captain=self.captain)
+        CircuitComponentEvent.objects.create(circuit=self.circuit, league_event=self.event, weight=2)
+        CircuitParticipant.objects.create(circuit=self.circuit, user=self.player)
+        bet = Bet.objects.create(league=self.league, name='evt', type='moneyline', points=0, deadline=timezone.now())
+        UserBet.objects.create(user=self.player, bet=bet, league_event=self.event, choice='Home', points_wagered=2)
+        # The punter is not in the circuit: a money stake and a plain UserBet
+        Wager.objects.create(league_event=self.event, user=self.punter, outcome='Home', amount=Decimal('10.00'), odds=2)
+        UserBet.objects.create(user=self.punter, bet=bet, league_event=self.event, choice='Away', points_wagered=10)
+
+    def assert_settled_once(self):
+        self.event.refresh_from_db()
+        self.assertTrue(self.event.completed)
+        self.assertEqual(self.event.market_data['settled_circuits'], [self.circuit.id])
+        self.assertEqual(CircuitParticipant.objects.get(user=self.player).score, 2)
+        self.assertEqual(User.objects.get(pk=self.punter.pk).money, Decimal('1020.00'))
+        self.assertEqual(
+            dict(UserBet.objects.filter(league_event=self.event).values_list('user_id', 'result')),
+            {self.player.id: 'won', self.punter.id: 'lost'},
+        )
+
+    def test_circuit_component_with_a_money_stake(self):
+        self.assertEqual(settlement.settle_events([(self.event, 'Home')]), [self.event.id])
+        self.assert_settled_once()
+        self.assertEqual(settlement.settle_events([(self.event, 'Home')]), [])
+        self.assert_settled_once()
+
+    def test_resumes_after_circuits_were_scored(self):
+        component = CircuitComponentEvent.objects.get(league_event=self.event)
+        settlement.settle_circuit_event(self.circuit, self.event, component, 'Home', complete=False)
+        self.event.refresh_from_db()
+        self.assertFalse(self.event.completed)
+
+        settlement.settle_events([(self.event, 'Home')])
+        self.assert_settled_once()
@@ -0,0 +1,50 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from users.models import User
+from . import settlement, stats
+from .models import BettingStats, League, LeagueEvent, Wager
+
+
+class BettingStatsTests(TestCase):
+    def setUp(self):
+        self.users = [User.objects.create_user(username=f'player{i}', password='testpass123') for i in range(3)]
+        self.league = League.objects.create(name='Stats League', captain=self.users[0])
+
+    def place(self, event, picks):
+        Wager.objects.bulk_create([
+            Wager(league_event=event, user=user, outcome=pick, amount=Decimal('10.00'), odds=1.5)
+            for user, pick in zip(self.users, picks)
+        ])
+        stats.record_placed([user.id for user in self.users])
+
+    def stats_rows(self):
+        return list(
+            BettingStats.objects.filter(user__in=self.users).order_by('user_id')
+            .values_list('user_id', 'total_bets', 'won_bets', 'current_streak', 'lifetime_winnings', 'level')
+        )
+
+    def test_incremental_updates_match_rebuild(self):
+        stats.rebuild([user.id for user in self.users])
+        results = ['Home', 'Home', 'Away', 'Home', 'Away', 'Home', 'Home']
+        for i, winner in enumerate(results):
+            event = LeagueEvent.objects.create(league=self.league, event_key=f'evt{i}', event_name=f'Event {i}', sport='nba')
+            self.place(event, ['Home', 'Away', 'Home' if i % 3 else 'Away'])
+            settlement.settle_league_event(event, winner)
+
+        incremental = self.stats_rows()
+        stats.rebuild([user.id for user in self.users])
+        self.assertEqual(incremental, self.stats_rows())
+        # Player 0 won the last two, player 1 lost the last two and player 2 lost the last one
+        self.assertEqual([row[3] for row in incremental], [2, -2, -1])
+        self.assertEqual(incremental[0][1:3], (7, 5))
+        self.assertEqual(incremental[0][4], Decimal('75.00'))
+
+    def test_missing_row_is_built_from_bets(self):
+        event = LeagueEvent.objects.create(league=self.league, event_key='evt', event_name='Event', sport='nba')
+        Wager.objects.create(league_event=event, user=self.users[0], outcome='Home', amount=Decimal('10.00'), odds=2)
+        settlement.settle_league_event(event, 'Home')
+
+        row = stats.for_user(self.users[0].id)
+        self.assertEqual((row.total_bets, row.won_bets, row.current_streak, row.lifetime_winnings), (1, 1, 1, Decimal('20.00')))
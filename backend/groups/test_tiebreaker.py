@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from users.models import User
+from .models import Bet, Circuit, CircuitParticipant, League, LeagueEvent, UserBet
+from .tiebreaker import CLOSEST, UNIQUE, resolve_tiebreaker
+
+
+class TiebreakerTests(TestCase):
+    def setUp(self):
+        captain = User.objects.create_user(username='captain', password='testpass123')
+        self.league = League.objects.create(name='Test League', captain=captain)
+        self.circuit = Circuit.objects.create(league=self.league, name='Circuit', entry_fee=Decimal('10'), captain=captain)
+        self.event = LeagueEvent.objects.create(league=self.league, event_key='tb', event_name='Total points', sport='nba')
+        self.bet = Bet.objects.create(league=self.league, name='tb', type='moneyline', points=0, deadline=timezone.now())
+        self.users = [User.objects.create_user(username=f'entrant{i}', password='testpass123') for i in range(4)]
+        # The first three share the top score
+        for user, score in zip(self.users, (5, 5, 5, 3)):
+            CircuitParticipant.objects.create(circuit=self.circuit, user=user, score=score)
+        self.ids = [user.id for user in self.users]
+
+    def guess(self, user_index, numeric=None, choice=''):
+        UserBet.objects.create(
+            user=self.users[user_index], bet=self.bet, league_event=self.event, choice=choice, numeric_choice=numeric, points_wagered=0
+        )
+
+    def test_closest_guesses_share_the_win(self):
+        self.guess(0, 10)
+        self.guess(1, 12)
+        self.guess(2, 8)
+        self.guess(3, 11)  # Not tied, so not counted
+
+        result = resolve_tiebreaker(self.circuit, self.event, '11', CLOSEST)
+
+        self.assertEqual(result['tied'], self.ids[:3])
+        self.assertEqual(result['winners'], self.ids[:2])
+        self.assertEqual((result['score'], result['reason']), (5, 'closest guess'))
+
+    def test_unique_ignores_copied_guesses(self):
+        self.guess(0, 10)
+        self.guess(1, 10)
+        self.guess(2, 14)
+
+        result = resolve_tiebreaker(self.circuit, self.event, 10, UNIQUE)
+
+        self.assertEqual((result['winners'], result['reason']), ([self.ids[2]], 'closest unique guess'))
+
+        UserBet.objects.filter(user=self.users[2]).update(numeric_choice=10)
+        result = resolve_tiebreaker(self.circuit, self.event, 10, UNIQUE)
+        self.assertEqual((result['winners'], result['reason']), (self.ids[:3], 'closest guess, no guess was unique'))
+
+    def test_entrants_without_a_guess_never_win_against_one(self):
+        self.guess(0, choice='about twenty')
+        self.guess(1, choice='25')
+
+        self.assertEqual(resolve_tiebreaker(self.circuit, self.event, 20)['winners'], [self.ids[1]])
+
+    def test_non_numeric_tiebreaker_is_an_exact_match(self):
+        self.guess(0, choice='Home')
+        self.guess(1, choice='Away')
+
+        self.assertEqual(resolve_tiebreaker(self.circuit, self.event, 'Away')['winners'], [self.ids[1]])
+        result = resolve_tiebreaker(self.circuit, self.event, 'Draw')
+        self.assertEqual((result['winners'], result['reason']), (self.ids[:3], 'no exact match'))
+
+    def test_no_tie_or_no_guesses(self):
+        self.assertEqual(resolve_tiebreaker(self.circuit, self.event, 10)['reason'], 'no tiebreaker bets')
+
+        CircuitParticipant.objects.filter(user=self.users[0]).update(score=9)
+        result = resolve_tiebreaker(self.circuit, self.event, 10)
+        self.assertEqual((result['winners'], result['reason']), ([self.ids[0]], 'no tie'))
@@ -0,0 +1,95 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from users.models import User
+from . import settlement, wagers
+from .models import Circuit, League, LeagueEvent, LedgerEntry, Wager
+
+
+class PostLeagueEventWagerTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='bettor', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.league = League.objects.create(name='Test League', captain=self.user)
+        self.league.members.add(self.user)
+        self.url = reverse('post-league-event')
+
+    def post_bet(self, amount):
+        return self.client.post(self.url, {
+            'league_id': self.league.id,
+            'event_key': 'evt',
+            'event_name': 'Home vs Away',
+            'sport': 'nba',
+            'outcomeKey': 'Home',
+            'market_data': {'marketKey': 'h2h', 'outcomeKey': 'Home', 'odds': 2.5, 'amount': amount},
+        }, format='json')
+
+    def test_stake_is_recorded_as_a_wager_and_paid_on_settlement(self):
+        response = self.post_bet(40)
+
+        self.assertEqual(response.status_code, 201)
+        wager = Wager.objects.get(user=self.user)
+        self.assertEqual((wager.kind, wager.outcome, wager.amount, wager.odds), (Wager.USER, 'Home', Decimal('40.00'), 2.5))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.money, Decimal('960.00'))
+
+        settlement.settle_league_event(LeagueEvent.objects.get(league=self.league), 'Home')
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.money, Decimal('1060.00'))
+        self.assertEqual(Wager.objects.get(pk=wager.pk).result, 'won')
+
+    def test_insufficient_funds_records_no_wager(self):
+        response = self.post_bet(5000)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Wager.objects.exists())
+        self.assertFalse(LedgerEntry.objects.filter(reason=LedgerEntry.BET_STAKE).exists())
+
+
+class LegacyBetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='bettor', password='testpass123')
+        self.league = League.objects.create(name='Test League', captain=self.user)
+        self.circuit = Circuit.objects.create(league=self.league, name='Circuit', entry_fee=Decimal('10'), captain=self.user)
+        self.user_bets = [
+            {'user_id': self.user.id, 'outcomeKey': 'Home', 'amount': 25, 'odds': 1.8, 'bet_time': '2024-01-01T12:00:00Z'},
+            {'user_id': self.user.id, 'outcomeKey': 'Away', 'amount': 'lots', 'note': 'kept'},
+            {'user_id': 999999, 'outcomeKey': 'Home', 'amount': 5},
+            {'outcomeKey': 'Home', 'amount': 5},
+        ]
+        self.circuit_bets = [{'user_id': self.user.id, 'circuit_id': self.circuit.id, 'outcome': 'Home', 'weight': 3}]
+        self.event = LeagueEvent.objects.create(
+            league=self.league, event_key='evt', event_name='Home vs Away', sport='nba',
+            market_data={'h2h': [], 'user_bets': list(self.user_bets), 'circuit_bets': list(self.circuit_bets)},
+        )
+
+    def test_entries_convert_without_losing_values(self):
+        wager = wagers.from_legacy(self.event, Wager.USER, 1, self.user_bets[1])
+
+        self.assertEqual((wager.outcome, wager.amount, wager.odds), ('Away', Decimal('0.00'), 2.0))
+        self.assertEqual(wager.extra, {'amount': 'lots', 'note': 'kept'})
+        self.assertEqual(wagers.as_legacy(wager)['amount'], 'lots')
+        self.assertIsNone(wagers.from_legacy(self.event, Wager.USER, 3, self.user_bets[3]))
+        self.assertIsNone(wagers.from_legacy(self.event, Wager.CIRCUIT, 0, {'user_id': self.user.id}))
+
+        placed = wagers.from_legacy(self.event, Wager.USER, 0, self.user_bets[0])
+        self.assertEqual(placed.placed_at.isoformat(), '2024-01-01T12:00:00+00:00')
+
+    def test_absorbing_moves_entries_once(self):
+        self.assertEqual(len(wagers.event_bets(self.event, Wager.USER)), 4)
+
+        self.assertEqual(wagers.absorb_legacy_bets(self.event), 3)
+        self.assertEqual(wagers.absorb_legacy_bets(LeagueEvent.objects.get(pk=self.event.pk)), 0)
+
+        event = LeagueEvent.objects.get(pk=self.event.pk)
+        # Entries naming no user, or a user who no longer exists, stay where they were
+        self.assertCountEqual(event.market_data['user_bets'], self.user_bets[2:])
+        self.assertNotIn('circuit_bets', event.market_data)
+        self.assertEqual(list(Wager.objects.filter(kind=Wager.USER).values_list('legacy_index', flat=True).order_by('id')), [0, 1])
+        circuit_bet = wagers.event_bets(event, Wager.CIRCUIT, circuit=self.circuit)
+        self.assertEqual([(bet['outcome'], bet['weight']) for bet in circuit_bet], [('Home', 3)])
+        self.assertEqual(len(wagers.event_bets(event, Wager.USER)), 4)
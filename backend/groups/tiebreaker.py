@@ -0,0 +1,119 @@
+"""
+Tiebreaker resolution for circuits.
+
+When several participants share a circuit's top score, their guesses on the
+tiebreaker event decide the winner. All the tied entrants' guesses are loaded
+in one query and ranked in a single vectorized pass:
+
+    closest     the guesses nearest the correct value win; everyone at that
+                distance shares the win
+    unique      as closest, but only guesses no other tied entrant made count,
+                so entrants who copied each other cannot win together. If every
+                guess was shared the closest guesses win as usual.
+
+A tiebreaker whose correct value is not a number is settled by exact match.
+Entrants without a usable guess never beat one with a guess; if no one has
+one, every tied entrant wins.
+"""
+import logging
+
+import numpy as np
+from django.db.models import Max
+
+from .models import CircuitParticipant, UserBet
+
+logger = logging.getLogger(__name__)
+
+CLOSEST = 'tiebreaker_closest'
+UNIQUE = 'tiebreaker_unique'
+
+# Distances this close are treated as equal, so 9.9 and 10.1 tie for 10.0
+TOLERANCE = 1e-9
+
+
+def resolve_tiebreaker(circuit, event, correct_value, method=None):
+    """
+    Work out which of a circuit's top scorers win on the tiebreaker
+
+    Parameters:
+    circuit (Circuit): The circuit being completed
+    event (LeagueEvent): Its tiebreaker event
+    correct_value: The tiebreaker's actual value, a number or a string outcome
+    method (str): CLOSEST or UNIQUE; defaults to the event's betting type
+
+    Returns:
+    dict: 'score' (the top score), 'tied' and 'winners' (user IDs, in participant
+    order), 'method' and 'reason' (how the winners were chosen)
+    """
+    if method is None:
+        method = UNIQUE if event.betting_type == UNIQUE else CLOSEST
+
+    participants = CircuitParticipant.objects.filter(circuit=circuit)
+    top_score = participants.aggregate(top=Max('score'))['top']
+    if top_score is None:
+        return {'score': None, 'tied': [], 'winners': [], 'method': method, 'reason': 'no participants'}
+
+    tied = list(participants.filter(score=top_score).order_by('id').values_list('user_id', flat=True))
+    result = {'score': top_score, 'tied': tied, 'winners': tied, 'method': method}
+    if len(tied) == 1:
+        result['reason'] = 'no tie'
+        return result
+
+    # Each tied entrant's latest guess, in one query
+    guesses = {}
+    for user_id, numeric_choice, choice in UserBet.objects.filter(
+        league_event=event,
+        user__circuit_participations__circuit=circuit,
+        user__circuit_participations__score=top_score,
+    ).order_by('id').values_list('user_id', 'numeric_choice', 'choice'):
+        guesses[user_id] = (numeric_choice, choice)
+    if not guesses:
+        result['reason'] = 'no tiebreaker bets'
+        return result
+
+    try:
+        target = float(correct_value)
+    except (TypeError, ValueError):
+        # Not a number: exact matches win
+        matched = [user_id for user_id in tied if user_id in guesses and guesses[user_id][1] == correct_value]
+        if matched:
+            result.update(winners=matched, reason='exact match')
+        else:
+            result['reason'] = 'no exact match'
+        return result
+
+    user_ids = np.fromiter(guesses, dtype=np.int64, count=len(guesses))
+    values = np.fromiter((_numeric(*guess) for guess in guesses.values()), dtype=float, count=len(guesses))
+    valid = np.isfinite(values)
+    if not valid.any():
+        result['reason'] = 'no numeric guesses'
+        return result
+
+    reason = 'closest guess'
+    if method == UNIQUE:
+        # How many tied entrants made each guess, counted in one pass
+        _, inverse, counts = np.unique(values[valid], return_inverse=True, return_counts=True)
+        unique = np.zeros(len(values), dtype=bool)
+        unique[np.flatnonzero(valid)] = counts[inverse] == 1
+        if unique.any():
+            valid = unique
+            reason = 'closest unique guess'
+        else:
+            reason = 'closest guess, no guess was unique'
+
+    distances = np.where(valid, np.abs(values - target), np.inf)
+    best = distances.min()
+    closest = set(user_ids[distances <= best + TOLERANCE].tolist())
+    result.update(winners=[user_id for user_id in tied if user_id in closest], reason=reason)
+    logger.info(f"Circuit {circuit.id} tiebreaker: {len(tied)} tied on {top_score}, {len(result['winners'])} won by {reason} (distance {best})")
+    return result
+
+
+def _numeric(numeric_choice, choice):
+    """A guess as a float, preferring numeric_choice; NaN if there is no number"""
+    if numeric_choice is not None:
+        return float(numeric_choice)
+    try:
+        return float(choice)
+    except (TypeError, ValueError):
+        return np.nan
@@ -22,8 +22,13 @@ urlpatterns = [
     path('circuits/<int:circuit_id>/events/<int:event_id>/bets/', views.get_circuit_event_bets, name='get_circuit_event_bets'),
     path('circuits/<int:circuit_id>/completed-bets/', views.get_circuit_completed_bets, name='get_circuit_completed_bets'),
     
+    # Background jobs, e.g. event settlement
+    path('jobs/<int:job_id>/', views.get_job, name='get-job'),
+    
     # Market browsing endpoints
     path('market/browse/', views.browse_market, name='browse_market'),
+    path('market/metrics/', views.odds_api_metrics, name='odds_api_metrics'),
+    path('market/events/', views.get_multi_sport_events, name='get_multi_sport_events'),
     
     # Specific endpoints first
     path('leagues/bets/post_league_event/', views.post_league_event, name='post_league_event'),
@@ -43,8 +48,10 @@ urlpatterns = [
     
     # League events
     path('leagues/<int:league_id>/events/', views.get_league_events, name='get-league-events'),
+    path('leagues/<int:league_id>/wagers/export/', views.export_league_wagers, name='export-league-wagers'),
     path('leagues/events/create/', views.create_custom_event, name='create-custom-event'),
     path('leagues/events/<int:event_id>/complete/', views.complete_league_event, name='complete-league-event'),
+    path('leagues/events/<str:event_id>/odds-history/', views.get_event_odds_history, name='get-event-odds-history'),
     path('leagues/events/<str:event_id>/', views.get_event_details, name='get-event-details'),
     
     # Market browsing 
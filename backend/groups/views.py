@@ -2,18 +2,32 @@ from django.shortcuts import render, get_object_or_404
 from django.conf import settings
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework import generics, status
-from .models import League, Bet, UserBet, LeagueInvite, LeagueEvent, ChatMessage, Circuit, CircuitComponentEvent, CircuitParticipant
+from .models import League, Bet, UserBet, LeagueInvite, LeagueEvent, ChatMessage, Circuit, CircuitComponentEvent, CircuitParticipant, Job, Wager, LedgerEntry
 from users.models import User, Notification, FriendRequest
-from .serializers import LeagueSerializer, BetSerializer, LeagueEventSerializer, ChatMessageSerializer, CircuitSerializer, CircuitCreateSerializer, CircuitDetailSerializer, UserBetSerializer, LeagueInviteSerializer, CircuitComponentEventSerializer
+from .serializers import LeagueSerializer, BetSerializer, LeagueEventSerializer, ChatMessageSerializer, CircuitSerializer, CircuitCreateSerializer, CircuitDetailSerializer, UserBetSerializer, LeagueInviteSerializer, CircuitComponentEventSerializer, JobSerializer
 import logging
 import json
 import requests
 import uuid
-from decimal import Decimal
+from django.db import transaction
 from django.utils import timezone
-from .odds import OddsApiClient
+from django.utils.dateparse import parse_datetime
+from .odds import get_odds_client, get_pool_stats, single_flight
+from .odds_cache import odds_cache
+from .odds_quota import quota
+from .odds_breaker import breaker, served_stale, OddsApiUnavailable
+from .odds_history import price_history
+from .odds_async import AsyncOddsApiClient
+from . import exports, jobs, ledger, stats
+from .wagers import event_bets
+from .settlement import circuit_event_settled
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.urls import reverse
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework import serializers
 
 logger = logging.getLogger(__name__)
@@ -197,6 +211,32 @@ def get_league(request, league_id):
         print(f"Error: {str(e)}")
         return Response({'error': str(e)}, status=500)
 
+def _odds_response(data):
+    """
+    Response for Odds API data. When the data is the last good snapshot served
+    because the API is unavailable, X-Odds-Stale and X-Odds-Fetched-At say so.
+    """
+    response = Response(data)
+    stale_fetched_at = served_stale()
+    if stale_fetched_at is not None:
+        response['X-Odds-Stale'] = 'true'
+        response['X-Odds-Fetched-At'] = stale_fetched_at.isoformat()
+    return response
+
+def _job_accepted_response(job):
+    """202 pointing the client at the progress of a queued job"""
+    return Response({
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': reverse('get-job', args=[job.id]),
+    }, status=status.HTTP_202_ACCEPTED)
+
+def _odds_unavailable_response(error):
+    """503 for when the Odds API circuit is open and nothing is cached"""
+    response = Response({'error': str(error)}, status=503)
+    response['Retry-After'] = str(breaker.reset_seconds)
+    return response
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_available_bets(request, sport=None):
@@ -204,18 +244,47 @@ def get_available_bets(request, sport=None):
         print("\nDEBUG: Fetching bets")
         print(f"Sport param: {sport}")
         
-        client = OddsApiClient()
+        client = get_odds_client()
         if sport:
             print(f"Fetching events for sport: {sport}")
-            # Get events for the specified sport
-            events = client.get_sport_events(sport)
-            print(f"Events response: {events}")
-            return Response(events)
+            # Narrower selections, e.g. ?markets=h2h for pickers that only show moneylines,
+            # cost fewer quota credits and return smaller payloads
+            try:
+                client = client.with_options(
+                    markets=request.query_params.get('markets'),
+                    regions=request.query_params.get('regions'),
+                    bookmakers=request.query_params.get('bookmakers'),
+                )
+            except ValueError as e:
+                return Response({'error': str(e)}, status=400)
+            since = request.query_params.get('since')
+            if since:
+                # Delta: only events whose odds changed after the cursor, plus removed IDs
+                since_time = parse_datetime(since)
+                if since_time is None:
+                    return Response({'error': 'since must be an ISO 8601 cursor from a previous response'}, status=400)
+                delta = client.get_sport_events_since(sport, since_time)
+                response = _odds_response({
+                    'since': since_time,
+                    'cursor': delta['cursor'],
+                    'events': delta['events'],
+                    'removed': delta['removed'],
+                })
+            else:
+                # Get events for the specified sport
+                delta = client.get_sport_events_since(sport)
+                print(f"Events response: {delta['events']}")
+                response = _odds_response(delta['events'])
+            # 'Z' rather than '+00:00' so the cursor survives being put in a query string unencoded
+            response['X-Odds-Cursor'] = delta['cursor'].isoformat().replace('+00:00', 'Z')
+            return response
         else:
             print("Fetching all sports")
             sports_data = client.get_sports()
             print(f"Sports response: {sports_data}")
-            return Response(sports_data)
+            return _odds_response(sports_data)
+    except OddsApiUnavailable as e:
+        return _odds_unavailable_response(e)
     except Exception as e:
         print(f"ERROR in get_available_bets: {str(e)}")
         print(f"Error type: {type(e)}")
@@ -245,13 +314,35 @@ def get_event_details(request, event_id):
             print(f"Event {event_id} not found in local DB, trying external API")
         
         # If not found locally or not an integer ID, try the external API
-        client = OddsApiClient()
+        client = get_odds_client()
         event_details = client.get_event_odds(event_id)
-        return Response(event_details)
+        return _odds_response(event_details)
+    except OddsApiUnavailable as e:
+        return _odds_unavailable_response(e)
     except Exception as e:
         print(f"ERROR in get_event_details: {str(e)}")
         return Response({'error': str(e)}, status=500)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_event_odds_history(request, event_id):
+    """
+    Line movement for an Odds API event: one series of price changes per
+    bookmaker, market and outcome. Optional ?since= and ?until= ISO timestamps.
+    """
+    try:
+        since = request.query_params.get('since')
+        until = request.query_params.get('until')
+        since = parse_datetime(since) if since else None
+        until = parse_datetime(until) if until else None
+        return Response({
+            'event_id': event_id,
+            'series': price_history(event_id, since=since, until=until)
+        })
+    except Exception as e:
+        logger.error(f"Error fetching odds history for event {event_id}: {str(e)}", exc_info=True)
+        return Response({'error': str(e)}, status=500)
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def place_bet(request):
@@ -304,6 +395,7 @@ def place_bet(request):
             choice=outcome_key,
             points_wagered=amount
         )
+        stats.record_placed([request.user.id])
         
         # Handle circuit bet if specified
         if 'circuitId' in request.data or request.data.get('isCircuitBet'):
@@ -344,6 +436,7 @@ def place_bet(request):
                             points_earned=0,  # Will be calculated when event is completed
                             result='pending'
                         )
+                        stats.record_placed([request.user.id])
                         
                         # Add this event to the participant's completed_bets
                         participant.completed_bets.add(league_event)
@@ -379,13 +472,15 @@ def place_bet(request):
 def get_competition_events(request, competition_key):
     try:
         print(f"\nFetching events for sport: {competition_key}")
-        client = OddsApiClient()
+        client = get_odds_client()
         
         # In Odds API, we don't have competitions, we directly get events for a sport
         events = client.get_sport_events(competition_key)
         print(f"Sport events response: {events}")
-        return Response(events)
+        return _odds_response(events)
             
+    except OddsApiUnavailable as e:
+        return _odds_unavailable_response(e)
     except Exception as e:
         print(f"ERROR in get_competition_events: {str(e)}")
         print(f"Error type: {type(e)}")
@@ -406,7 +501,10 @@ def post_league_event(request):
         away_team = data.get('away_team', '')
         market_data = data.get('market_data', {})
         outcome_key = data.get('outcomeKey', None)
-        wager_amount = data.get('amount', 0)
+        # The stake and odds come at the top level or, from the web client, in market_data
+        bet_details = json.loads(market_data) if isinstance(market_data, str) else market_data or {}
+        wager_amount = data.get('amount') or bet_details.get('amount') or 0
+        wager_odds = data.get('odds') or bet_details.get('odds')
         
         # Check if this is a circuit bet
         is_circuit_bet = data.get('isCircuitBet', False)
@@ -509,6 +607,7 @@ def post_league_event(request):
                         points_earned=0,  # Will be calculated when event is completed
                         result='pending'
                     )
+                    stats.record_placed([request.user.id])
                     
                     # Add this event to the participant's completed_bets
                     participant.completed_bets.add(league_event)
@@ -540,18 +639,26 @@ def post_league_event(request):
             choice=outcome_key,
             points_wagered=10  # Default
         )
+        stats.record_placed([request.user.id])
         
         # Handle monetary wager if provided
         if wager_amount and float(wager_amount) > 0:
-            # Check if user has enough money
-            if request.user.money < Decimal(str(wager_amount)):
-                return Response({
-                    'error': 'Insufficient funds'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Deduct money from user
-            request.user.money -= Decimal(str(wager_amount))
-            request.user.save()
+            with transaction.atomic():
+                # Deduct money from user, if they have enough, and record the bet that settlement pays out
+                stake = ledger.debit(request.user, wager_amount, LedgerEntry.BET_STAKE, f'league_event:{league_event.id}')
+                if not stake:
+                    return Response({
+                        'error': 'Insufficient funds'
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                Wager.objects.create(
+                    league_event=league_event,
+                    user=request.user,
+                    kind=Wager.USER,
+                    outcome=outcome_key or '',
+                    amount=-stake.amount,
+                    odds=float(wager_odds or 2.0),
+                )
+            stats.record_placed([request.user.id])
                   
         # Regular bet response
         response_data = {
@@ -593,6 +700,35 @@ def get_league_events(request, league_id):
         logger.error(f"Error fetching league events: {str(e)}", exc_info=True)
         return Response({'error': str(e)}, status=500)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_league_wagers(request, league_id):
+    """
+    Download every bet placed in a league, Wagers and UserBets, with results and
+    payouts, streamed as CSV or NDJSON (?output=csv, the default, or ?output=ndjson)
+    """
+    try:
+        league = League.objects.get(id=league_id)
+        
+        # Ensure user is a member of the league
+        if not league.members.filter(id=request.user.id).exists():
+            return Response({'error': 'You are not a member of this league'}, status=403)
+        
+        export_format = request.query_params.get('output', 'csv')
+        if export_format not in exports.FORMATS:
+            return Response({'error': f"output must be one of {', '.join(exports.FORMATS)}"}, status=400)
+        
+        return exports.streaming_export(
+            exports.league_wager_rows(league), exports.LEAGUE_WAGER_COLUMNS, export_format,
+            f'league-{league.id}-wagers',
+        )
+        
+    except League.DoesNotExist:
+        return Response({'error': 'League not found'}, status=404)
+    except Exception as e:
+        logger.error(f"Error exporting league wagers: {str(e)}", exc_info=True)
+        return Response({'error': str(e)}, status=500)
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def browse_market(request):
@@ -601,7 +737,7 @@ def browse_market(request):
     Returns sports grouped by their category.
     """
     try:
-        client = OddsApiClient()
+        client = get_odds_client()
         # Log API key for debugging (mask most of it for security)
         masked_key = client.api_key[:4] + '...' + client.api_key[-4:] if len(client.api_key) > 8 else '***'
         logger.debug(f"Using Odds API key: {masked_key}")
@@ -610,10 +746,15 @@ def browse_market(request):
         
         logger.debug(f"Retrieved sports data: {sports_data}")
         
-        return Response({
+        stale_fetched_at = served_stale()
+        return _odds_response({
             'message': 'Sports data retrieved successfully',
-            'data': sports_data
+            'data': sports_data,
+            'stale': stale_fetched_at is not None,
+            'fetched_at': stale_fetched_at,
         })
+    except OddsApiUnavailable as e:
+        return _odds_unavailable_response(e)
     except requests.exceptions.HTTPError as http_err:
         error_msg = f"HTTP error occurred: {http_err}"
         if hasattr(http_err.response, 'status_code') and http_err.response.status_code == 422:
@@ -624,6 +765,58 @@ def browse_market(request):
         logger.error(f"Error in browse_market: {str(e)}", exc_info=True)
         return Response({'error': str(e)}, status=500)
 
+# Upper bound on sports per multi-sport request
+MAX_SPORTS_PER_REQUEST = 12
+
+def _authenticate_token(request):
+    """Resolve the DRF token on a plain Django request; returns the user or None."""
+    try:
+        result = TokenAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+async def get_multi_sport_events(request):
+    """
+    Events for several sports at once: GET ?sports=key1,key2,...
+    Sports are fetched concurrently. This is a plain async Django view (DRF views
+    are sync only), so the auth token is checked here.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    user = await sync_to_async(_authenticate_token)(request)
+    if user is None:
+        return JsonResponse({'error': 'Authentication credentials were not provided.'}, status=401)
+
+    sport_keys = [key.strip() for key in request.GET.get('sports', '').split(',') if key.strip()]
+    if not sport_keys:
+        return JsonResponse({'error': 'At least one sport is required'}, status=400)
+    if len(sport_keys) > MAX_SPORTS_PER_REQUEST:
+        return JsonResponse({'error': f'At most {MAX_SPORTS_PER_REQUEST} sports can be requested at once'}, status=400)
+
+    try:
+        results = await AsyncOddsApiClient().get_many_sport_events(sport_keys)
+        return JsonResponse(results)
+    except Exception as e:
+        logger.error(f"Error in get_multi_sport_events: {str(e)}", exc_info=True)
+        return JsonResponse({'error': str(e)}, status=500)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def odds_api_metrics(request):
+    """
+    Operational metrics for the Odds API client in this worker process.
+    Staff only.
+    """
+    return Response({
+        'pool': get_pool_stats(),
+        'cache': odds_cache.stats(),
+        'coalescing': single_flight.stats(),
+        'quota': quota.stats(),
+        'breaker': breaker.stats(),
+    })
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def complete_league_event(request, event_id):
@@ -646,164 +839,13 @@ def complete_league_event(request, event_id):
         if not winner:
             return Response({'error': 'Winner must be specified'}, status=400)
         
-        # Mark the event as completed
-        event.completed = True
-        
-        # Process results for all user bets
-        if event.market_data and 'user_bets' in event.market_data:
-            user_bets = event.market_data.get('user_bets', [])
-            logger.info(f"Found {len(user_bets)} user bets in market_data")
-            
-            for i, user_bet in enumerate(user_bets):
-                try:
-                    # Get user bet details
-                    user_id = user_bet.get('user_id')
-                    choice = user_bet.get('outcomeKey')
-                    amount = float(user_bet.get('amount', 0))
-                    odds = float(user_bet.get('odds', 2.0))
-                    
-                    if not user_id or not choice or amount <= 0:
-                        logger.warning(f"Incomplete bet data: {user_bet}")
-                        continue
-                    
-                    # Determine the result
-                    result = 'lost'
-                    payout = 0
-                    
-                    # Check if the user bet matches the winning outcome
-                    if choice.lower() == winner.lower():
-                        result = 'won'
-                        # Calculate payout with odds
-                        payout = amount * odds
-                        
-                        # Find user and update their money
-                        try:
-                            user = User.objects.get(id=user_id)
-                            user.money += Decimal(str(payout))
-                            user.save()
-                            logger.info(f"User {user.username} won {payout} on event {event.event_name}")
-                            
-                            # Create notification for the win
-                            Notification.objects.create(
-                                user=user,
-                                message=f"You won ${payout:.2f} on {event.event_name}!",
-                                notification_type='info'
-                            )
-                            logger.info(f"Created win notification for user {user.username}")
-                        except User.DoesNotExist:
-                            logger.warning(f"User with ID {user_id} not found for payout")
-                    else:
-                        # User lost - create notification
-                        try:
-                            user = User.objects.get(id=user_id)
-                            Notification.objects.create(
-                                user=user,
-                                message=f"You lost your bet of ${amount:.2f} on {event.event_name}",
-                                notification_type='info'
-                            )
-                            logger.info(f"Created loss notification for user {user.username}")
-                        except User.DoesNotExist:
-                            logger.warning(f"User with ID {user_id} not found for loss notification")
-                    
-                    # Update the user bet with the result
-                    event.market_data['user_bets'][i]['result'] = result
-                    event.market_data['user_bets'][i]['payout'] = payout
-                    
-                    # Also update any UserBet model instances linked to this event
-                    try:
-                        user_bet_instances = UserBet.objects.filter(
-                            user_id=user_id,
-                            league_event=event
-                        )
-                        for user_bet_instance in user_bet_instances:
-                            user_bet_instance.result = result
-                            user_bet_instance.save()
-                            logger.info(f"Updated UserBet model instance for user {user_id}, result: {result}")
-                    except Exception as ube:
-                        logger.warning(f"Could not update UserBet model instances: {str(ube)}")
-                    
-                except Exception as e:
-                    logger.error(f"Error processing bet for user {user_id}: {str(e)}")
-        
-        # Process results for all circuit bets
-        if event.market_data and 'circuit_bets' in event.market_data:
-            circuit_bets = event.market_data.get('circuit_bets', [])
-            logger.info(f"Found {len(circuit_bets)} circuit bets in market_data")
-            
-            for i, circuit_bet in enumerate(circuit_bets):
-                try:
-                    # Get circuit bet details
-                    user_id = circuit_bet.get('user_id')
-                    circuit_id = circuit_bet.get('circuit_id')
-                    choice = circuit_bet.get('outcome')
-                    weight = int(circuit_bet.get('weight', 1))
-                    
-                    if not user_id or not circuit_id or not choice:
-                        logger.warning(f"Incomplete circuit bet data: {circuit_bet}")
-                        continue
-                    
-                    # Determine the result
-                    result = 'lost'
-                    points = 0
-                    
-                    # Check if the user bet matches the winning outcome
-                    if choice.lower() == winner.lower():
-                        result = 'won'
-                        # Calculate points with weight
-                        points = 1 * weight
-                        
-                        # Find circuit participant and update their score
-                        try:
-                            circuit = Circuit.objects.get(id=circuit_id)
-                            participant = CircuitParticipant.objects.get(
-                                circuit=circuit,
-                                user_id=user_id
-                            )
-                            participant.score += points
-                            participant.save()
-                            logger.info(f"User {user_id} earned {points} points in circuit {circuit_id} for event {event.event_name}")
-                            
-                            # Create notification for the correct prediction
-                            try:
-                                user = User.objects.get(id=user_id)
-                                Notification.objects.create(
-                                    user=user,
-                                    message=f"Your prediction for {event.event_name} in circuit {circuit.name} was correct! (+{points} points)",
-                                    notification_type='info'
-                                )
-                                logger.info(f"Created win notification for user {user_id} in circuit {circuit_id}")
-                            except User.DoesNotExist:
-                                logger.warning(f"User with ID {user_id} not found for notification")
-                        except (Circuit.DoesNotExist, CircuitParticipant.DoesNotExist) as e:
-                            logger.warning(f"Could not update circuit participant score: {str(e)}")
-                    else:
-                        # Incorrect prediction - create notification
-                        try:
-                            user = User.objects.get(id=user_id)
-                            circuit = Circuit.objects.get(id=circuit_id)
-                            Notification.objects.create(
-                                user=user,
-                                message=f"Your prediction for {event.event_name} in circuit {circuit.name} was incorrect.",
-                                notification_type='info'
-                            )
-                            logger.info(f"Created loss notification for user {user_id} in circuit {circuit_id}")
-                        except (User.DoesNotExist, Circuit.DoesNotExist) as e:
-                            logger.warning(f"Error creating notification: {str(e)}")
-                    
-                    # Update the circuit bet with the result
-                    event.market_data['circuit_bets'][i]['result'] = result
-                    event.market_data['circuit_bets'][i]['points'] = points
-                    
-                except Exception as e:
-                    logger.error(f"Error processing circuit bet for user {user_id} in circuit {circuit_id}: {str(e)}")
-        
-        # Save the updated event
-        event.save()
+        if event.completed:
+            return Response({'error': 'Event is already completed'}, status=400)
         
-        return Response({
-            'message': 'Event marked as completed successfully',
-            'event': LeagueEventSerializer(event).data
-        })
+        # Paying out can take a while on popular events, so a worker does it
+        job = jobs.enqueue('settle_league_event', {'event_id': event.id, 'winner': winner},
+                           user=request.user, key=f'league_event:{event.id}')
+        return _job_accepted_response(job)
     except Exception as e:
         logger.error(f"Error completing league event: {str(e)}", exc_info=True)
         return Response({'error': str(e)}, status=500)
@@ -1099,20 +1141,17 @@ def join_circuit(request, circuit_id):
     if CircuitParticipant.objects.filter(circuit=circuit, user=user).exists():
         return Response({'error': 'You have already joined this circuit.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Check if user has sufficient funds
-    if user.money < circuit.entry_fee:
-        return Response({'error': 'Insufficient funds to join this circuit.'}, status=status.HTTP_400_BAD_REQUEST)
+    with transaction.atomic():
+        # Deduct entry fee, if the user has sufficient funds
+        if not ledger.debit(user, circuit.entry_fee, LedgerEntry.CIRCUIT_ENTRY, f'circuit:{circuit.id}'):
+            return Response({'error': 'Insufficient funds to join this circuit.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Deduct entry fee
-    user.money -= Decimal(str(circuit.entry_fee))
-    user.save()
-
-    # Create CircuitParticipant entry
-    CircuitParticipant.objects.create(
-        circuit=circuit,
-        user=user,
-        paid_entry=True
-    )
+        # Create CircuitParticipant entry
+        CircuitParticipant.objects.create(
+            circuit=circuit,
+            user=user,
+            paid_entry=True
+        )
 
     return Response({'message': 'Successfully joined the circuit!'}, status=status.HTTP_201_CREATED)
 
@@ -1151,8 +1190,7 @@ def complete_circuit(request, circuit_id):
 
     # Transfer total entry fees to winner
     total_prize = circuit.entry_fee * participants.count()
-    winner.money += Decimal(str(total_prize))
-    winner.save()
+    ledger.credit(winner, total_prize, LedgerEntry.CIRCUIT_PRIZE, f'circuit:{circuit.id}')
 
     return Response({'message': f'Circuit completed successfully! Winner: {winner.username}', 'prize': str(total_prize)}, status=status.HTTP_200_OK)
 
@@ -1182,12 +1220,8 @@ def get_circuit_event_bets(request, circuit_id, event_id):
         if not is_participant:
             return Response({'error': 'You are not a participant in this circuit'}, status=403)
         
-        # Check if the event has user bets in its market_data
-        user_bets = []
-        if league_event.market_data and 'circuit_bets' in league_event.market_data:
-            circuit_bets = league_event.market_data['circuit_bets']
-            # Filter bets for this specific circuit
-            user_bets = [bet for bet in circuit_bets if bet.get('circuit_id') == int(circuit_id)]
+        # The circuit's bets on this event, by index
+        user_bets = event_bets(league_event, Wager.CIRCUIT, circuit=circuit)
         
         return Response(user_bets)
         
@@ -1224,286 +1258,14 @@ def complete_circuit_with_tiebreaker(request, circuit_id, event_id):
     if 'tiebreaker_value' not in request.data:
         return Response({"error": "Tiebreaker value is required"}, status=status.HTTP_400_BAD_REQUEST)
     
-    tiebreaker_value = request.data.get('tiebreaker_value')
-    
-    print(f"[TIEBREAKER] Starting circuit completion with tiebreaker. Circuit: {circuit_id}, Event: {event_id}, Value: {tiebreaker_value}")
-    
-    # Complete the tiebreaker event if it's not already completed
-    if not tiebreaker_event.completed:
-        print(f"[TIEBREAKER] Tiebreaker event not completed yet, completing it now with value: {tiebreaker_value}")
-        # Set the correct outcome in market_data
-        market_data = tiebreaker_event.market_data or {}
-        market_data['winner'] = tiebreaker_value
-        tiebreaker_event.market_data = market_data
-        tiebreaker_event.completed = True
-        tiebreaker_event.save()
-    else:
-        print(f"[TIEBREAKER] Tiebreaker event already completed, using existing value: {tiebreaker_event.market_data.get('winner', 'N/A')}")
-
-    # Find participants with the highest score
-    participants = CircuitParticipant.objects.filter(circuit=circuit).order_by('-score')
-    
-    if not participants.exists():
-        return Response({"error": "No participants found in this circuit"}, status=status.HTTP_400_BAD_REQUEST)
-    
-    highest_score = participants.first().score
-    tied_participants = participants.filter(score=highest_score)
-    
-    print(f"[TIEBREAKER] Found {tied_participants.count()} participants tied with highest score {highest_score}")
-    for p in tied_participants:
-        print(f"[TIEBREAKER] Tied participant: {p.user.username} with score {p.score}")
-    
-    # Determine the winner(s) based on the tiebreaker
-    if tied_participants.count() == 1:
-        # Only one participant with the highest score, no tiebreaker needed
-        print(f"[TIEBREAKER] Only one participant with highest score: {tied_participants.first().user.username}. No tiebreaker needed.")
-        winners = tied_participants
-    else:
-        # Multiple participants tied for the highest score
-        print(f"[TIEBREAKER] Multiple participants tied, resolving with tiebreaker")
-        
-        # Check if there are any UserBet records for the tiebreaker event
-        tiebreaker_bets = UserBet.objects.filter(
-            user__in=[p.user.id for p in tied_participants],
-            league_event=tiebreaker_event
-        )
-        
-        print(f"[TIEBREAKER] Found {tiebreaker_bets.count()} tiebreaker bets")
-        
-        if tiebreaker_bets.exists():
-            print(f"[TIEBREAKER] Using existing tiebreaker bets to determine winner")
-            for bet in tiebreaker_bets:
-                print(f"[TIEBREAKER] Bet from {bet.user.username}: {bet.choice}")
-            
-            # Determine the winner based on the closest guess to the tiebreaker value
-            try:
-                # Try to parse the tiebreaker value as a number
-                tiebreaker_numeric = float(tiebreaker_value)
-                print(f"[TIEBREAKER] Tiebreaker value is numeric: {tiebreaker_numeric}")
-                
-                # Calculate the distances for each participant's bet
-                bet_distances = {}
-                for bet in tiebreaker_bets:
-                    try:
-                        print(f"[TIEBREAKER] Processing bet for {bet.user.username}: choice='{bet.choice}', numeric_choice={bet.numeric_choice}")
-                        
-                        # Prioritize numeric_choice if available, otherwise try to convert choice
-                        if bet.numeric_choice is not None:
-                            bet_value = float(bet.numeric_choice)
-                            print(f"[TIEBREAKER] Using numeric_choice: {bet_value}")
-                        elif bet.choice and bet.choice.strip():
-                            bet_value = float(bet.choice)
-                            print(f"[TIEBREAKER] Converting choice to number: {bet_value}")
-                        else:
-                            raise ValueError("No valid numeric value in bet")
-                            
-                        distance = abs(bet_value - tiebreaker_numeric)
-                        bet_distances[bet.user.id] = distance
-                        print(f"[TIEBREAKER] User {bet.user.username} (ID: {bet.user.id}) bet {bet_value}, distance: {distance}")
-                    except (ValueError, TypeError) as e:
-                        # If the bet value can't be converted to a number, use a large distance
-                        bet_distances[bet.user.id] = float('inf')
-                        print(f"[TIEBREAKER] User {bet.user.username} bet has invalid numeric value: {e}. Setting distance to infinity")
-                
-                if bet_distances:
-                    # Find the minimum distance
-                    min_distance = min(bet_distances.values())
-                    print(f"[TIEBREAKER] Minimum distance found: {min_distance}")
-                    
-                    # Get all users with the minimum distance
-                    closest_users = [user_id for user_id, distance in bet_distances.items() if distance == min_distance]
-                    print(f"[TIEBREAKER] Users with closest guess: {len(closest_users)}")
-                    for user_id in closest_users:
-                        user = User.objects.get(id=user_id)
-                        print(f"[TIEBREAKER] Closest user: {user.username}")
-                    
-                    # Filter participants to only include those with the closest tiebreaker guess
-                    winners = tied_participants.filter(user__id__in=closest_users)
-                else:
-                    print(f"[TIEBREAKER] No valid numeric bets found, keeping all tied participants as winners")
-                    winners = tied_participants
-            except (ValueError, TypeError):
-                # If tiebreaker value is not a number, use string comparison
-                print(f"[TIEBREAKER] Tiebreaker value is not numeric: {tiebreaker_value}. Using string comparison.")
-                
-                # For non-numeric tiebreakers, exact matches win
-                exact_matches = [bet.user.id for bet in tiebreaker_bets if bet.choice == tiebreaker_value]
-                
-                if exact_matches:
-                    print(f"[TIEBREAKER] Found {len(exact_matches)} users with exact match.")
-                    for user_id in exact_matches:
-                        user = User.objects.get(id=user_id)
-                        print(f"[TIEBREAKER] Exact match user: {user.username}")
-                    
-                    winners = tied_participants.filter(user__id__in=exact_matches)
-                else:
-                    print(f"[TIEBREAKER] No exact matches found, keeping all tied participants as winners")
-                    winners = tied_participants
-        else:
-            # No UserBet records found for the tiebreaker event
-            print(f"[TIEBREAKER] No existing tiebreaker bets found. Looking for UserBet records for the tied participants.")
-            
-            # If no bets for tiebreaker event, look for UserBet records for the tied participants
-            all_user_bets = UserBet.objects.filter(
-                user__in=[p.user.id for p in tied_participants],
-                league_event=tiebreaker_event
-            )
-            
-            print(f"[TIEBREAKER] Found {all_user_bets.count()} user bets for the tiebreaker event")
-            
-            if all_user_bets.exists():
-                print(f"[TIEBREAKER] Using user bets to determine winner")
-                
-                try:
-                    # Try to parse the tiebreaker value as a number
-                    tiebreaker_numeric = float(tiebreaker_value)
-                    print(f"[TIEBREAKER] Tiebreaker value is numeric: {tiebreaker_numeric}")
-                    
-                    # Calculate the distances for each participant's bet
-                    bet_distances = {}
-                    for bet in all_user_bets:
-                        try:
-                            print(f"[TIEBREAKER] Processing bet for {bet.user.username}: choice='{bet.choice}', numeric_choice={bet.numeric_choice}")
-                            
-                            # Prioritize numeric_choice if available, otherwise try to convert choice
-                            if bet.numeric_choice is not None:
-                                bet_value = float(bet.numeric_choice)
-                                print(f"[TIEBREAKER] Using numeric_choice: {bet_value}")
-                            elif bet.choice and bet.choice.strip():
-                                bet_value = float(bet.choice)
-                                print(f"[TIEBREAKER] Converting choice to number: {bet_value}")
-                            else:
-                                raise ValueError("No valid numeric value in bet")
-                                
-                            distance = abs(bet_value - tiebreaker_numeric)
-                            bet_distances[bet.user.id] = distance
-                            print(f"[TIEBREAKER] User {bet.user.username} (ID: {bet.user.id}) bet {bet_value}, distance: {distance}")
-                        except (ValueError, TypeError) as e:
-                            # If the bet value can't be converted to a number, use a large distance
-                            bet_distances[bet.user.id] = float('inf')
-                            print(f"[TIEBREAKER] User {bet.user.username} bet has invalid numeric value: {e}. Setting distance to infinity")
-                    
-                    if bet_distances:
-                        # Find the minimum distance
-                        min_distance = min(bet_distances.values())
-                        print(f"[TIEBREAKER] Minimum distance found: {min_distance}")
-                        
-                        # Get all users with the minimum distance
-                        closest_users = [user_id for user_id, distance in bet_distances.items() if distance == min_distance]
-                        print(f"[TIEBREAKER] Users with closest guess: {closest_users}")
-                        for user_id in closest_users:
-                            try:
-                                user = User.objects.get(id=user_id)
-                                print(f"[TIEBREAKER] Closest user: {user.username} (ID: {user_id})")
-                            except User.DoesNotExist:
-                                print(f"[TIEBREAKER] User with ID {user_id} not found")
-                        
-                        # Filter participants to only include those with the closest tiebreaker guess
-                        winners = tied_participants.filter(user__id__in=closest_users)
-                        print(f"[TIEBREAKER] Winners after filtering for closest guess: {winners.count()}")
-                        for winner in winners:
-                            print(f"[TIEBREAKER] Winner: {winner.user.username} (ID: {winner.user.id})")
-                    else:
-                        print(f"[TIEBREAKER] No valid numeric bets found, keeping all tied participants as winners")
-                        winners = tied_participants
-                except (ValueError, TypeError):
-                    # If tiebreaker value is not a number, use string comparison
-                    print(f"[TIEBREAKER] Tiebreaker value is not numeric: {tiebreaker_value}. Using string comparison.")
-                    
-                    # For non-numeric tiebreakers, exact matches win
-                    exact_matches = [bet.user.id for bet in all_user_bets if bet.choice == tiebreaker_value]
-                    
-                    if exact_matches:
-                        print(f"[TIEBREAKER] Found {len(exact_matches)} users with exact match.")
-                        for user_id in exact_matches:
-                            user = User.objects.get(id=user_id)
-                            print(f"[TIEBREAKER] Exact match user: {user.username}")
-                        
-                        winners = tied_participants.filter(user__id__in=exact_matches)
-                    else:
-                        print(f"[TIEBREAKER] No exact matches found, keeping all tied participants as winners")
-                        winners = tied_participants
-            else:
-                print(f"[TIEBREAKER] No bets found for tied participants and tiebreaker event, keeping all tied participants as winners")
-                winners = tied_participants
-
-    # Calculate the prize amount
-    total_participants = participants.count()
-    total_prize = circuit.entry_fee * total_participants
-    
-    print(f"[TIEBREAKER] Total prize pool: {total_prize}")
-    print(f"[TIEBREAKER] Number of winners: {winners.count()}")
-    
-    # If there's only one winner, they get the full prize
-    if winners.count() == 1:
-        winner = winners.first()
-        prize_per_winner = total_prize
-        print(f"[TIEBREAKER] Single winner: {winner.user.username} gets full prize: {prize_per_winner}")
-        
-        # Update winner's money balance
-        winner.user.money = winner.user.money + Decimal(str(prize_per_winner))
-        winner.user.save()
-        print(f"[TIEBREAKER] Added {prize_per_winner} to {winner.user.username}'s account balance")
-        
-        # Create notification for the winner
-        Notification.objects.create(
-            user=winner.user,
-            message=f"Congratulations! You won circuit '{circuit.name}' with {winner.score} points and earned ${prize_per_winner}!",
-            notification_type='info'
-        )
-        print(f"[TIEBREAKER] Created win notification for {winner.user.username}")
-    else:
-        # Otherwise, split the prize equally
-        prize_per_winner = total_prize / winners.count()
-        print(f"[TIEBREAKER] Multiple winners, each gets: {prize_per_winner}")
-        
-        # Update each winner's money balance and create notification
-        for winner in winners:
-            # Update winner's money balance
-            winner.user.money = winner.user.money + Decimal(str(prize_per_winner))
-            winner.user.save()
-            print(f"[TIEBREAKER] Added {prize_per_winner} to {winner.user.username}'s account balance")
-            
-            # Create notification
-            Notification.objects.create(
-                user=winner.user,
-                message=f"Congratulations! You tied for 1st place in circuit '{circuit.name}' with {winner.score} points and earned ${prize_per_winner}!",
-                notification_type='info'
-            )
-            print(f"[TIEBREAKER] Created win notification for {winner.user.username}")
-    
-    winner_data = []
-    
-    # Award the prize to the winner(s)
-    for winner in winners:
-        winner.prize_amount = prize_per_winner
-        winner.save()
-        
-        # Add winner data for the response
-        winner_data.append({
-            'id': winner.user.id,
-            'username': winner.user.username,
-            'score': winner.score,
-            'prize': prize_per_winner
-        })
-        
-        print(f"[TIEBREAKER] Prize of {prize_per_winner} awarded to {winner.user.username}")
-    
-    # Complete the circuit
-    circuit.status = 'completed'
-    circuit.save()
-    
-    print(f"[TIEBREAKER] Circuit {circuit_id} marked as completed")
-    
-    # Return the winners and prize information
-    return Response({
-        'message': 'Circuit completed successfully',
-        'circuit_id': circuit.id,
-        'circuit_name': circuit.name,
-        'total_prize': total_prize,
-        'prize_per_winner': prize_per_winner,
-        'winners': winner_data
-    })
+    # Complete the tiebreaker event and pay out in the background, reporting progress on the job
+    job = jobs.enqueue(
+        'complete_circuit_with_tiebreaker',
+        {'circuit_id': circuit.id, 'event_id': tiebreaker_event.id, 'tiebreaker_value': request.data.get('tiebreaker_value')},
+        user=request.user,
+        key=f'circuit:{circuit.id}:complete',
+    )
+    return _job_accepted_response(job)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -1567,15 +1329,15 @@ def complete_circuit_event(request, circuit_id, event_id):
         
         # Check if event belongs to this circuit
         try:
-            component_event = CircuitComponentEvent.objects.get(circuit=circuit, league_event=event)
+            CircuitComponentEvent.objects.get(circuit=circuit, league_event=event)
         except CircuitComponentEvent.DoesNotExist:
             return Response(
                 {"error": "This event is not part of the specified circuit"},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Check if event is already completed
-        if event.completed:
+        # Check if event is already completed in this circuit (other circuits may share it)
+        if circuit_event_settled(event, circuit):
             return Response(
                 {"error": "This event has already been completed"},
                 status=status.HTTP_400_BAD_REQUEST
@@ -1597,201 +1359,40 @@ def complete_circuit_event(request, circuit_id, event_id):
         if event.betting_type in ['tiebreaker_closest', 'tiebreaker_unique']:
             try:
                 correct_numeric_value = float(request.data.get('numeric_value'))
-                event.tiebreaker_correct_value = correct_numeric_value
             except (ValueError, TypeError):
                 return Response(
                     {"error": "Valid numeric value is required for tiebreaker events"},
                     status=status.HTTP_400_BAD_REQUEST
                 )
         
-        # Mark the event as completed
-        event.completed = True
-        if event.market_data is None:
-            event.market_data = {}
-        
-        # Update market data with winning outcome
-        event.market_data['winner'] = winning_outcome
-        if correct_numeric_value is not None:
-            event.market_data['correct_numeric_value'] = correct_numeric_value
-        
-        event.save()
-        
-        # Initialize circuit_bets in market_data if it doesn't exist
-        if 'circuit_bets' not in event.market_data:
-            event.market_data['circuit_bets'] = []
-        
-        all_circuit_bets = event.market_data.get('circuit_bets', [])
-        this_circuit_bets = [bet for bet in all_circuit_bets if bet.get('circuit_id') == int(circuit_id)]
-        
-        # Track participants with correct predictions
-        updated_participants = []
-        participant_updates = {}
-        
-        # Fetch all UserBet models for this event to avoid repeated queries
-        all_user_bets = {bet.user_id: bet for bet in UserBet.objects.filter(league_event=event)}
-        logger.info(f"Found {len(all_user_bets)} user bets for event {event_id}")
-        
-        # Calculate points for each participant who bet on this event
-        for participant in circuit.participants.all():
-            logger.info(f"Processing participant: {participant.user.username} (ID: {participant.user.id})")
-            
-            # Find bet in the UserBet model
-            user_bet = all_user_bets.get(participant.user.id)
-            if user_bet:
-                logger.info(f"Found UserBet for {participant.user.username}: choice='{user_bet.choice}', result={user_bet.result}")
-                
-                # For tiebreaker events with numeric values
-                if event.betting_type in ['tiebreaker_closest', 'tiebreaker_unique'] and correct_numeric_value is not None:
-                    # Store numeric choice for tiebreaker resolution later
-                    user_bet.result = 'pending_tiebreaker'
-                    user_bet.save()
-                    
-                    # Add to circuit_bets for tracking if not already there
-                    if not any(bet.get('user_id') == participant.user.id for bet in this_circuit_bets):
-                        new_bet = {
-                            'user_id': participant.user.id,
-                            'circuit_id': int(circuit_id),
-                            'outcome': str(user_bet.numeric_choice) if user_bet.numeric_choice is not None else user_bet.choice,
-                            'weight': component_event.weight,
-                            'result': 'pending_tiebreaker'
-                        }
-                        all_circuit_bets.append(new_bet)
-                else:
-                    # Ensure clean string comparison by trimming whitespace
-                    user_prediction = user_bet.choice.strip() if user_bet.choice else ""
-                    winning_outcome_clean = winning_outcome.strip() if winning_outcome else ""
-                    
-                    # Case-insensitive comparison for text-based choices
-                    is_correct = user_prediction.lower() == winning_outcome_clean.lower()
-                    
-                    if is_correct:
-                        # Correct prediction
-                        logger.info(f"Correct prediction for {participant.user.username}! '{user_prediction}' matches '{winning_outcome_clean}'")
-                        # Calculate points based on event weight
-                        points_earned = component_event.weight
-                        participant.score += points_earned
-                        
-                        # Update UserBet model
-                        user_bet.result = 'won'
-                        user_bet.points_earned = points_earned
-                        user_bet.save()
-                        
-                        # Track for UI updates
-                        participant_updates[participant.user.id] = {
-                            'points': points_earned,
-                            'username': participant.user.username
-                        }
-                        
-                        # Add to circuit_bets for tracking if not already there
-                        if not any(bet.get('user_id') == participant.user.id for bet in this_circuit_bets):
-                            new_bet = {
-                                'user_id': participant.user.id,
-                                'circuit_id': int(circuit_id),
-                                'outcome': user_prediction,
-                                'weight': component_event.weight,
-                                'result': 'won',
-                                'points_earned': points_earned
-                            }
-                            all_circuit_bets.append(new_bet)
-                    else:
-                        # Incorrect prediction
-                        logger.info(f"Incorrect prediction for {participant.user.username}. '{user_prediction}' does not match '{winning_outcome_clean}'")
-                        user_bet.result = 'lost'
-                        user_bet.points_earned = 0
-                        user_bet.save()
-                        
-                        # Add to circuit_bets for tracking if not already there
-                        if not any(bet.get('user_id') == participant.user.id for bet in this_circuit_bets):
-                            new_bet = {
-                                'user_id': participant.user.id,
-                                'circuit_id': int(circuit_id),
-                                'outcome': user_prediction,
-                                'weight': component_event.weight,
-                                'result': 'lost',
-                                'points_earned': 0
-                            }
-                            all_circuit_bets.append(new_bet)
-                
-                participant.save()
-                updated_participants.append(participant.id)
-            else:
-                # Also check in market_data circuit_bets if no UserBet found
-                matching_bets = [bet for bet in this_circuit_bets if bet.get('user_id') == participant.user.id]
-                if matching_bets:
-                    logger.info(f"Found circuit_bet in market_data for {participant.user.username}")
-                    bet = matching_bets[0]
-                    
-                    # Process bet similarly to UserBet
-                    if event.betting_type in ['tiebreaker_closest', 'tiebreaker_unique'] and correct_numeric_value is not None:
-                        bet['result'] = 'pending_tiebreaker'
-                    else:
-                        user_prediction = bet.get('outcome', '').strip()
-                        winning_outcome_clean = winning_outcome.strip()
-                        
-                        is_correct = user_prediction.lower() == winning_outcome_clean.lower()
-                        
-                        if is_correct:
-                            points_earned = component_event.weight
-                            participant.score += points_earned
-                            bet['result'] = 'won'
-                            bet['points_earned'] = points_earned
-                            
-                            participant_updates[participant.user.id] = {
-                                'points': points_earned,
-                                'username': participant.user.username
-                            }
-                        else:
-                            bet['result'] = 'lost'
-                            bet['points_earned'] = 0
-                    
-                    participant.save()
-                    updated_participants.append(participant.id)
-        
-        # Update the circuit_bets in market_data
-        event.market_data['circuit_bets'] = all_circuit_bets
-        event.save()
-        
-        # Add notifications for users who earned points
-        for user_id, update in participant_updates.items():
-            try:
-                user = User.objects.get(id=user_id)
-                Notification.objects.create(
-                    user=user,
-                    message=f"Your prediction for {event.event_name} in circuit {circuit.name} was correct! (+{update['points']} points)",
-                    notification_type='info'
-                )
-                logger.info(f"Created win notification for user {user.username} in circuit {circuit.name}")
-            except User.DoesNotExist:
-                logger.warning(f"User with ID {user_id} not found for notification")
-        
-        # Fetch updated circuit data for response
-        updated_circuit = Circuit.objects.get(id=circuit_id)
-        serializer = CircuitDetailSerializer(updated_circuit)
-        
-        # Include information about completed event and participant updates
-        response_data = dict(serializer.data)  # Convert to regular dict to ensure mutability
-        
-        # Add completed event info to response
-        response_data['completed_event'] = {
-            'id': event.id,
-            'name': event.event_name,
+        # Scoring runs on a worker; the job's result is the updated circuit
+        job = jobs.enqueue('settle_circuit_event', {
+            'circuit_id': circuit.id,
+            'event_id': event.id,
             'winning_outcome': winning_outcome,
             'numeric_value': correct_numeric_value,
-            'weight': component_event.weight
-        }
-        
-        # Ensure participant_updates is included in the response
-        logger.info(f"Adding participant updates to response: {participant_updates}")
-        response_data['participant_updates'] = participant_updates
-        
-        # Log the final response structure to confirm participant_updates is included
-        logger.info(f"Response keys: {response_data.keys()}")
-        
-        return Response(response_data, status=status.HTTP_200_OK)
+        }, user=request.user, key=f'circuit:{circuit.id}:league_event:{event.id}')
+        return _job_accepted_response(job)
         
     except Exception as e:
         logger.error(f"Error completing circuit event: {str(e)}", exc_info=True)
         return Response(
             {"error": str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
+        )
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_job(request, job_id):
+    """
+    Progress of a background job, and its result once it has succeeded
+
+    Only the user who queued the job (or staff) can see it.
+    """
+    try:
+        job = Job.objects.get(id=job_id)
+    except Job.DoesNotExist:
+        return Response({'error': 'Job not found'}, status=404)
+    if job.created_by_id != request.user.id and not request.user.is_staff:
+        return Response({'error': 'Job not found'}, status=404)
+    return Response(JobSerializer(job).data)
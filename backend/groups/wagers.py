@@ -0,0 +1,217 @@
+"""
+Bets on league events, one Wager row each.
+
+Bets used to be kept as JSON lists in LeagueEvent.market_data['user_bets'] and
+['circuit_bets'], so every new bet rewrote the event's whole blob and finding a
+user's bets meant scanning every event. Migration 0026 moves the lists into the
+Wager table. While anything may still write the old lists, event reads go
+through event_bets(), which returns the rows plus any entries left in the
+lists, and settlement calls absorb_legacy_bets() to move such entries in first.
+"""
+import logging
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from users.models import User
+from . import stats
+from .models import Circuit, LeagueEvent, Wager
+
+logger = logging.getLogger(__name__)
+
+# market_data list -> Wager kind
+LEGACY_LISTS = {'user_bets': Wager.USER, 'circuit_bets': Wager.CIRCUIT}
+
+# Keys of a market_data entry stored in Wager columns; any others go to Wager.extra
+LEGACY_FIELDS = {
+    Wager.USER: {'user_id', 'outcomeKey', 'amount', 'odds', 'result', 'payout', 'bet_time'},
+    Wager.CIRCUIT: {'user_id', 'circuit_id', 'outcome', 'weight', 'result', 'points_earned', 'points'},
+}
+
+
+def from_legacy(event, kind, index, entry):
+    """
+    Build an unsaved Wager from one entry of a market_data bet list
+
+    Values that do not parse are kept as they were in Wager.extra, with the column
+    left at its default, so the conversion loses nothing.
+
+    Parameters:
+    event (LeagueEvent): Event whose market_data held the entry
+    kind (str): Wager.USER or Wager.CIRCUIT
+    index (int): Position of the entry in its list
+    entry (dict): The entry
+
+    Returns:
+    Wager: The unsaved wager, or None if the entry names no user (or no circuit)
+    """
+    if not isinstance(entry, dict):
+        return None
+    try:
+        user_id = int(entry.get('user_id'))
+        circuit_id = int(entry.get('circuit_id')) if kind == Wager.CIRCUIT else None
+    except (TypeError, ValueError):
+        return None  # No user, or no circuit for a circuit bet
+
+    extra = {key: value for key, value in entry.items() if key not in LEGACY_FIELDS[kind]}
+    wager = Wager(
+        league_event=event,
+        user_id=user_id,
+        circuit_id=circuit_id,
+        kind=kind,
+        result=str(entry.get('result') or 'pending'),
+        placed_at=event.created_at,
+        legacy_index=index,
+        extra=extra,
+    )
+
+    def parse(key, convert):
+        if entry.get(key) is None:
+            return None
+        try:
+            return convert(entry[key])
+        except (TypeError, ValueError, InvalidOperation):
+            extra[key] = entry[key]
+            return None
+
+    if kind == Wager.USER:
+        wager.outcome = str(entry.get('outcomeKey') or '')
+        wager.amount = parse('amount', lambda value: Decimal(str(value)).quantize(Decimal('0.01'))) or Decimal('0.00')
+        wager.odds = parse('odds', float) or 2.0
+        wager.payout = parse('payout', lambda value: Decimal(str(value)).quantize(Decimal('0.01'))) or Decimal('0.00')
+        placed_at = parse('bet_time', lambda value: parse_datetime(str(value)))
+        if placed_at:
+            wager.placed_at = placed_at if timezone.is_aware(placed_at) else timezone.make_aware(placed_at)
+        elif entry.get('bet_time') is not None:
+            extra['bet_time'] = entry['bet_time']
+    else:
+        wager.outcome = str(entry.get('outcome') or '')
+        wager.weight = parse('weight', int) or 1
+        wager.points_earned = parse('points_earned', int) or parse('points', int) or 0
+    return wager
+
+
+def as_legacy(wager):
+    """
+    The market_data entry a wager stands for, in the shape clients used to read
+
+    Parameters:
+    wager (Wager): The wager
+
+    Returns:
+    dict: The entry
+    """
+    if wager.kind == Wager.USER:
+        entry = {
+            'user_id': wager.user_id,
+            'outcomeKey': wager.outcome,
+            'amount': float(wager.amount),
+            'odds': wager.odds,
+            'bet_time': wager.placed_at.isoformat(),
+        }
+        if wager.result != 'pending':
+            entry['result'] = wager.result
+            entry['payout'] = float(wager.payout)
+    else:
+        entry = {
+            'user_id': wager.user_id,
+            'circuit_id': wager.circuit_id,
+            'outcome': wager.outcome,
+            'weight': wager.weight,
+            'result': wager.result,
+            'points_earned': wager.points_earned,
+        }
+    return {**entry, **wager.extra}  # extra holds values that did not parse, as they were
+
+
+def event_bets(event, kind, circuit=None):
+    """
+    An event's bets of one kind, as market_data-style entries
+
+    Reads the event's wagers by index, plus any entries still in its market_data
+    list that have not been moved to the table yet.
+
+    Parameters:
+    event (LeagueEvent): The event
+    kind (str): Wager.USER or Wager.CIRCUIT
+    circuit (Circuit): Only circuit bets for this circuit
+
+    Returns:
+    list: Bet entries, oldest first
+    """
+    wagers = Wager.objects.filter(league_event=event, kind=kind)
+    if circuit is not None:
+        wagers = wagers.filter(circuit=circuit)
+    bets = [as_legacy(wager) for wager in wagers.order_by('id')]
+
+    list_name = next(name for name, list_kind in LEGACY_LISTS.items() if list_kind == kind)
+    for entry in (event.market_data or {}).get(list_name) or []:
+        if circuit is not None and (not isinstance(entry, dict) or entry.get('circuit_id') != circuit.id):
+            continue
+        bets.append(entry)
+    return bets
+
+
+def absorb_legacy_bets(event):
+    """
+    Move any bets left in an event's market_data lists into the Wager table
+
+    Entries that name a user or circuit that no longer exists stay in the list.
+    Safe to call repeatedly and concurrently: the event row is locked while the
+    moved entries are inserted and removed from the list in one transaction.
+
+    Parameters:
+    event (LeagueEvent): The event
+
+    Returns:
+    int: Wagers created
+    """
+    if not any((event.market_data or {}).get(name) for name in LEGACY_LISTS):
+        return 0
+
+    with transaction.atomic():
+        event = LeagueEvent.objects.select_for_update().get(pk=event.pk)
+        market_data = event.market_data or {}
+        wagers, kept = {}, {}
+        for name, kind in LEGACY_LISTS.items():
+            # Entries are numbered after any moved before, as the list restarts from what was kept
+            last = Wager.objects.filter(league_event=event, kind=kind).aggregate(last=Max('legacy_index'))['last']
+            offset = 0 if last is None else last + 1
+            for index, entry in enumerate(market_data.get(name) or []):
+                wager = from_legacy(event, kind, offset + index, entry)
+                if wager is None:
+                    kept.setdefault(name, []).append(entry)
+                else:
+                    wagers.setdefault(name, []).append((wager, entry))
+
+        all_wagers = [wager for pairs in wagers.values() for wager, _ in pairs]
+        users = set(User.objects.filter(id__in={wager.user_id for wager in all_wagers}).values_list('id', flat=True))
+        circuits = set(Circuit.objects.filter(
+            id__in={wager.circuit_id for wager in all_wagers if wager.circuit_id}
+        ).values_list('id', flat=True))
+
+        moved = []
+        for name, pairs in wagers.items():
+            for wager, entry in pairs:
+                if wager.user_id in users and (wager.circuit_id is None or wager.circuit_id in circuits):
+                    moved.append(wager)
+                else:
+                    kept.setdefault(name, []).append(entry)
+        Wager.objects.bulk_create(moved, batch_size=1000)
+        # Moved bets may already be settled, so their bettors' stats are recounted
+        stats.rebuild({wager.user_id for wager in moved if wager.kind == Wager.USER})
+
+        for name in LEGACY_LISTS:
+            if name in kept:
+                market_data[name] = kept[name]
+            else:
+                market_data.pop(name, None)
+        event.market_data = market_data
+        event.save(update_fields=['market_data'])
+
+    if moved:
+        logger.info(f"Moved {len(moved)} market_data bets of event {event.id} to the wager table")
+    return len(moved)
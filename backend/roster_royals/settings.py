@@ -150,6 +150,40 @@ AUTH_USER_MODEL = 'users.User'
 # Odds API settings
 ODDS_API_KEY = os.environ.get('ODDS_API_KEY')
 ODDS_API_BASE_URL = 'https://api.the-odds-api.com'  # Base URL for the Odds API
+ODDS_API_POOL_MAXSIZE = int(os.environ.get('ODDS_API_POOL_MAXSIZE', 10))  # Keep-alive connections per worker
+ODDS_API_CONNECT_TIMEOUT = float(os.environ.get('ODDS_API_CONNECT_TIMEOUT', 3.05))  # Seconds
+ODDS_API_READ_TIMEOUT = float(os.environ.get('ODDS_API_READ_TIMEOUT', 10))  # Seconds
+ODDS_API_MAX_RETRIES = int(os.environ.get('ODDS_API_MAX_RETRIES', 3))  # Retries on 429/5xx and connect errors
+ODDS_API_BACKOFF_FACTOR = 0.5  # Exponential backoff base in seconds
+ODDS_API_BACKOFF_JITTER = 0.25  # Random jitter added to each backoff in seconds
+# Seconds a cached response is considered fresh, per endpoint; other endpoints get the
+# 'sport_events' TTL. The sports list changes a few times a day, odds every few minutes.
+ODDS_API_CACHE_TTLS = {
+    'sports': 6 * 60 * 60,
+    'sport_events': 2 * 60,
+    'event_odds': 2 * 60,
+    'event_not_found': 60,  # Event IDs an upcoming-feed search did not find
+}
+ODDS_API_CACHE_STALE_SECONDS = 60 * 60  # How long past its TTL an entry may be served while refreshing
+ODDS_API_COALESCE_WAIT_SECONDS = 60  # Max time a caller waits on an identical in-flight request
+ODDS_API_ASYNC_CONCURRENCY = 4  # Max concurrent upstream calls per multi-sport async request
+ODDS_API_QUOTA_LOW_THRESHOLD = int(os.environ.get('ODDS_API_QUOTA_LOW_THRESHOLD', 500))  # Credits left before throttling
+ODDS_API_QUOTA_TTL_MULTIPLIER = 4  # Cache TTL stretch factor while the quota is low
+ODDS_API_BREAKER_FAILURE_THRESHOLD = 5  # Consecutive failed or slow calls before failing fast
+ODDS_API_BREAKER_SLOW_CALL_SECONDS = 5  # Calls slower than this count as failures
+ODDS_API_BREAKER_RESET_SECONDS = 30  # How long the breaker stays open before probing upstream
+ODDS_HISTORY_RETENTION_DAYS = 180  # Odds price changes older than this are pruned by poll_odds
+# Offline testing: point ODDS_API_BASE_URL at `manage.py fake_odds_api`, or set the
+# fixture mode to 'record' (save live responses) or 'replay' (serve them, no network)
+ODDS_API_BASE_URL = os.environ.get('ODDS_API_BASE_URL', ODDS_API_BASE_URL)
+ODDS_API_FIXTURE_MODE = os.environ.get('ODDS_API_FIXTURE_MODE') or None
+ODDS_API_FIXTURE_DIR = os.environ.get('ODDS_API_FIXTURE_DIR', str(BASE_DIR / 'odds_fixtures'))
+
+# Background jobs (`manage.py run_workers`)
+JOBS_VISIBILITY_TIMEOUT_SECONDS = 300  # A claimed job is reclaimed if its worker goes quiet this long
+JOBS_MAX_ATTEMPTS = 5  # Attempts before a failing job is given up on
+JOBS_RETRY_BACKOFF_SECONDS = 10  # Wait before the first retry, doubling per attempt
+JOBS_MAX_RETRY_BACKOFF_SECONDS = 600
 
 # Add to your existing settings
 SOCIAL_AUTH_GOOGLE_OAUTH2_KEY = os.environ.get('GOOGLE_OAUTH2_CLIENT_ID')
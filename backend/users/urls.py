@@ -17,10 +17,13 @@ urlpatterns = [
     path('profile/<int:user_id>/', views.view_user_profile, name='view-user-profile'),
     path('profile/update/', views.update_profile, name='user-update'),
     path('profile/settings/', views.update_user_settings, name='user-settings-update'),
+    path('profile/balance/', views.get_user_balance, name='user-balance'),
     path('profile/betting-stats/', views.get_user_betting_stats, name='user-betting-stats'),
     path('profile/bet-history/', views.get_user_bet_history, name='user-bet-history'),
+    path('profile/bet-history/export/', views.export_user_bet_history, name='user-bet-history-export'),
     path('profile/<int:user_id>/betting-stats/', views.get_other_user_betting_stats, name='view-user-betting-stats'),
     path('profile/<int:user_id>/bet-history/', views.get_other_user_bet_history, name='view-user-bet-history'),
+    path('profile/<int:user_id>/bet-history/export/', views.export_other_user_bet_history, name='view-user-bet-history-export'),
     path('update-password/', views.update_password, name='update-password'),
     path('delete-account/', views.delete_account, name='delete-account'),
 ] 
\ No newline at end of file
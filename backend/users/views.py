@@ -10,11 +10,15 @@ from django.db.models import Q
 from google.oauth2 import id_token
 from google.auth.transport import requests
 from django.conf import settings
-from groups.models import LeagueEvent, UserBet  # Add this import
+from groups import ledger
+from groups import stats as betting_stats
+from groups import exports, history
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import Group
 from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 import datetime
 import json
 import logging
@@ -470,6 +474,31 @@ def update_user_settings(request):
     
     return Response({'error': 'No settings provided'}, status=400)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_user_balance(request):
+    """
+    Get the current user's balance, now or at a past time
+
+    Query parameters:
+    at (str): ISO 8601 time to reconstruct the balance at; defaults to now
+    """
+    when = timezone.now()
+    if request.query_params.get('at'):
+        when = parse_datetime(request.query_params['at'])
+        if when is None:
+            return Response({'error': 'Invalid time, expected ISO 8601'}, status=400)
+        if timezone.is_naive(when):
+            when = timezone.make_aware(when)
+
+    try:
+        return Response({
+            'balance': str(ledger.balance_at(request.user, when)),
+            'at': when.isoformat(),
+        })
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_user_betting_stats(request):
@@ -477,113 +506,18 @@ def get_user_betting_stats(request):
     user = request.user
     
     try:
-        # Find all of the user's bets across all leagues
-        # We'll check both the UserBet model and the user_bets in LeagueEvent market_data
-        
-        # Stats to collect
-        total_bets = 0
-        won_bets = 0
-        current_streak = 0
-        lifetime_winnings = 0
-        
-        # Get all league events with user bets
-        league_events = LeagueEvent.objects.filter(market_data__has_key='user_bets')
-        
-        # Track all bets chronologically for streak calculation
-        all_bets_results = []
-        
-        # Process bets from LeagueEvent market_data
-        for event in league_events:
-            if event.market_data and 'user_bets' in event.market_data:
-                user_bets = [bet for bet in event.market_data.get('user_bets', []) 
-                            if bet.get('user_id') == user.id]
-                
-                for bet in user_bets:
-                    total_bets += 1
-                    # Check if the event is completed and has a result
-                    if event.completed and 'result' in bet:
-                        result = bet.get('result', '').lower()
-                        if result == 'won':
-                            won_bets += 1
-                            # Add payout to lifetime winnings
-                            payout = float(bet.get('payout', 0))
-                            lifetime_winnings += payout
-                        
-                        # Add to chronological list for streak calculation
-                        all_bets_results.append({
-                            'date': bet.get('bet_time', event.created_at),
-                            'result': result
-                        })
-        
-        # Process UserBet model if it's used in the system
-        user_bet_objects = UserBet.objects.filter(user=user)
-        for bet in user_bet_objects:
-            total_bets += 1
-            if bet.result == 'won':
-                won_bets += 1
-                # Need to calculate payout based on points_wagered and the odds if available
-                payout = bet.points_wagered * 2  # Default multiplier if we don't have odds
-                lifetime_winnings += payout
-            
-            # Add to chronological list for streak calculation
-            all_bets_results.append({
-                'date': bet.created_at,
-                'result': bet.result
-            })
-        
-        # Sort all bets by date
-        all_bets_results = sorted(all_bets_results, key=lambda x: x['date'], reverse=True)
-        
-        # Calculate current streak
-        if all_bets_results:
-            current_result = all_bets_results[0]['result']
-            for bet in all_bets_results:
-                if bet['result'] == current_result:
-                    if current_result == 'won':
-                        current_streak += 1
-                    elif current_result == 'lost':
-                        current_streak -= 1
-                else:
-                    break
-        
-        # Calculate win rate
-        win_rate = 0
-        if total_bets > 0:
-            win_rate = (won_bets / total_bets) * 100
-        
-        # Calculate user level based on total bets and win rate
-        # Level 1: New user (0-5 bets)
-        # Level 2: Regular bettor (6-15 bets)
-        # Level 3: Advanced bettor (16-30 bets)
-        # Level 4: Expert bettor (31-50 bets)
-        # Level 5: Pro bettor (51+ bets)
-        # Add a bonus level for high win rates
-        base_level = 1
-        if total_bets > 50:
-            base_level = 5
-        elif total_bets > 30:
-            base_level = 4
-        elif total_bets > 15:
-            base_level = 3
-        elif total_bets > 5:
-            base_level = 2
-        
-        # Bonus for high win rate
-        win_rate_bonus = 0
-        if win_rate > 65:
-            win_rate_bonus = 1
-        
-        user_level = min(10, base_level + win_rate_bonus)  # Cap at level 10
+        # One row, kept current by bet placement and settlement
+        stats = betting_stats.for_user(user.id)
         
         # Format the date joined
         date_joined = user.date_joined.strftime('%b %Y') if user.date_joined else 'Unknown'
         
         return Response({
-            'total_bets': total_bets,
-            'win_rate': round(win_rate, 1),
-            'current_streak': current_streak,
-            'lifetime_winnings': round(lifetime_winnings, 2),
-            'user_level': user_level,
+            'total_bets': stats.total_bets,
+            'win_rate': round(stats.win_rate, 1),
+            'current_streak': stats.current_streak,
+            'lifetime_winnings': round(float(stats.lifetime_winnings), 2),
+            'user_level': stats.level,
             'date_joined': date_joined
         })
     
@@ -722,106 +656,20 @@ def get_other_user_betting_stats(request, user_id):
         if not is_friend and not show_stats:
             return Response(hidden_stats)
             
-        # Otherwise, calculate and return the actual stats
+        # Otherwise, return the actual stats
         try:
-            # Find all of the user's bets across all leagues
-            total_bets = 0
-            won_bets = 0
-            current_streak = 0
-            lifetime_winnings = 0
-            
-            # Get all league events with user bets
-            league_events = LeagueEvent.objects.filter(market_data__has_key='user_bets')
-            
-            # Track all bets chronologically for streak calculation
-            all_bets_results = []
-            
-            # Process bets from LeagueEvent market_data
-            for event in league_events:
-                if event.market_data and 'user_bets' in event.market_data:
-                    user_bets = [bet for bet in event.market_data.get('user_bets', []) 
-                                if bet.get('user_id') == viewed_user.id]
-                    
-                    for bet in user_bets:
-                        total_bets += 1
-                        # Check if the event is completed and has a result
-                        if event.completed and 'result' in bet:
-                            result = bet.get('result', '').lower()
-                            if result == 'won':
-                                won_bets += 1
-                                # Add payout to lifetime winnings
-                                payout = float(bet.get('payout', 0))
-                                lifetime_winnings += payout
-                            
-                            # Add to chronological list for streak calculation
-                            all_bets_results.append({
-                                'date': bet.get('bet_time', event.created_at),
-                                'result': result
-                            })
-            
-            # Process UserBet model if it's used in the system
-            user_bet_objects = UserBet.objects.filter(user=viewed_user)
-            for bet in user_bet_objects:
-                total_bets += 1
-                if bet.result == 'won':
-                    won_bets += 1
-                    # Need to calculate payout based on points_wagered and the odds if available
-                    payout = bet.points_wagered * 2  # Default multiplier if we don't have odds
-                    lifetime_winnings += payout
-                
-                # Add to chronological list for streak calculation
-                all_bets_results.append({
-                    'date': bet.created_at,
-                    'result': bet.result
-                })
-            
-            # Sort all bets by date
-            all_bets_results = sorted(all_bets_results, key=lambda x: x['date'], reverse=True)
-            
-            # Calculate current streak
-            if all_bets_results:
-                current_result = all_bets_results[0]['result']
-                for bet in all_bets_results:
-                    if bet['result'] == current_result:
-                        if current_result == 'won':
-                            current_streak += 1
-                        elif current_result == 'lost':
-                            current_streak -= 1
-                    else:
-                        break
-            
-            # Calculate win rate
-            win_rate = 0
-            if total_bets > 0:
-                win_rate = (won_bets / total_bets) * 100
-            
-            # Calculate user level
-            base_level = 1
-            if total_bets > 50:
-                base_level = 5
-            elif total_bets > 30:
-                base_level = 4
-            elif total_bets > 15:
-                base_level = 3
-            elif total_bets > 5:
-                base_level = 2
-            
-            # Bonus for high win rate
-            win_rate_bonus = 0
-            if win_rate > 65:
-                win_rate_bonus = 1
-            
-            user_level = min(10, base_level + win_rate_bonus)  # Cap at level 10
+            # One row, kept current by bet placement and settlement
+            stats = betting_stats.for_user(viewed_user.id)
             
             # Format the date joined
             date_joined = viewed_user.date_joined.strftime('%b %Y') if viewed_user.date_joined else 'Unknown'
             
             return Response({
-                'total_bets': total_bets if show_betting_history else 0,
-                'win_rate': round(win_rate, 1) if show_win_rate else 0,
-                'current_streak': current_streak if show_betting_history else 0,
-                'lifetime_winnings': round(lifetime_winnings, 2) if show_betting_history else 0,
-                'user_level': user_level,
+                'total_bets': stats.total_bets if show_betting_history else 0,
+                'win_rate': round(stats.win_rate, 1) if show_win_rate else 0,
+                'current_streak': stats.current_streak if show_betting_history else 0,
+                'lifetime_winnings': round(float(stats.lifetime_winnings), 2) if show_betting_history else 0,
+                'user_level': stats.level,
                 'date_joined': date_joined,
                 'stats_visible': {
                     'betting_history': show_betting_history,
@@ -846,60 +694,106 @@ def get_other_user_betting_stats(request, user_id):
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
+def _bet_history_filters(params):
+    """
+    Bet history filters from query parameters
+
+    Query parameters:
+    league (int): Only bets in this league
+    result (str): won, lost, push or pending
+    from, to (str): ISO 8601 dates or times; bets placed from, and before, these
+
+    Returns:
+    dict: league_id, result, since and until
+
+    Raises:
+    ValueError: With a message for the client, if a parameter is invalid
+    """
+    try:
+        league_id = int(params['league']) if params.get('league') else None
+    except ValueError:
+        raise ValueError('league must be an integer')
+    result = (params.get('result') or '').lower() or None
+    if result and result not in history.RESULTS:
+        raise ValueError(f"result must be one of {', '.join(history.RESULTS)}")
+
+    bounds = {}
+    for name in ('from', 'to'):
+        if not params.get(name):
+            continue
+        try:
+            when = parse_datetime(params[name])
+            if when is None and parse_date(params[name]):
+                when = datetime.datetime.combine(parse_date(params[name]), datetime.time())
+        except ValueError:
+            when = None
+        if when is None:
+            raise ValueError(f'{name} must be an ISO 8601 date or time')
+        bounds[name] = timezone.make_aware(when) if timezone.is_naive(when) else when
+
+    return {'league_id': league_id, 'result': result, 'since': bounds.get('from'), 'until': bounds.get('to')}
+
+def _bet_history_page(request, user):
+    """
+    One page of a user's bet history, from the request's query parameters
+
+    Query parameters:
+    cursor (str): next_cursor from the previous page
+    limit (int): Entries per page
+    Filters as for _bet_history_filters()
+
+    Returns:
+    Response: The page, or 400 for bad parameters
+    """
+    params = request.query_params
+    try:
+        limit = int(params['limit']) if params.get('limit') else None
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=400)
+    try:
+        filters = _bet_history_filters(params)
+        return Response(history.bet_history_page(user, cursor=params.get('cursor'), limit=limit, **filters))
+    except ValueError as e:
+        # Bad filters, or a history.InvalidCursor
+        return Response({'error': str(e)}, status=400)
+
+def _bet_history_export(request, user):
+    """
+    A user's whole bet history as a streamed CSV or NDJSON download
+
+    Query parameters:
+    output (str): csv (default) or ndjson
+    Filters as for _bet_history_filters()
+
+    Returns:
+    StreamingHttpResponse: The download, or a 400 Response for bad parameters
+    """
+    export_format = request.query_params.get('output', 'csv')
+    if export_format not in exports.FORMATS:
+        return Response({'error': f"output must be one of {', '.join(exports.FORMATS)}"}, status=400)
+    try:
+        filters = _bet_history_filters(request.query_params)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    return exports.streaming_export(
+        exports.bet_history_rows(user, **filters), exports.HISTORY_COLUMNS, export_format,
+        f'bet-history-{user.username}',
+    )
+
+def _bet_history_visible(viewer, viewed_user):
+    """Whether viewer may see viewed_user's bet history, respecting their privacy settings"""
+    # Friends always can
+    if viewer.friends.filter(id=viewed_user.id).exists():
+        return True
+    user_settings = viewed_user.settings or {}
+    return user_settings.get('showHistory', True) and user_settings.get('showAchievements', True)
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_user_bet_history(request):
-    """Get the current user's betting history"""
-    user = request.user
-    
+    """Get a page of the current user's betting history"""
     try:
-        bet_history = []
-        
-        # Get all league events with user bets
-        league_events = LeagueEvent.objects.filter(market_data__has_key='user_bets').order_by('-commence_time')
-        
-        # Process bets from LeagueEvent market_data
-        for event in league_events:
-            if event.market_data and 'user_bets' in event.market_data:
-                user_bets = [bet for bet in event.market_data.get('user_bets', []) 
-                            if bet.get('user_id') == user.id]
-                
-                for bet in user_bets:
-                    # Only add to history if the event is completed or the bet has a result
-                    if event.completed or 'result' in bet:
-                        bet_entry = {
-                            'id': f"{event.id}_{bet.get('user_id')}",
-                            'date': bet.get('bet_time', event.created_at),
-                            'event': event.event_name or f"{event.home_team} vs {event.away_team}",
-                            'pick': bet.get('outcomeKey', 'Unknown'),
-                            'amount': bet.get('amount', 0),
-                            'result': bet.get('result', 'Pending') if event.completed else 'Pending',
-                            'payout': bet.get('payout', 0) if event.completed and bet.get('result', '').lower() == 'won' else 0,
-                            'league_id': event.league.id if event.league else None,
-                            'event_id': event.id
-                        }
-                        bet_history.append(bet_entry)
-        
-        # Process UserBet model if it's used in the system
-        user_bet_objects = UserBet.objects.filter(user=user).order_by('-created_at')
-        for bet in user_bet_objects:
-            bet_entry = {
-                'id': f"userbet_{bet.id}",
-                'date': bet.created_at.strftime('%Y-%m-%d'),
-                'event': bet.bet.name if bet.bet else 'Unknown Event',
-                'pick': bet.choice,
-                'amount': bet.points_wagered,
-                'result': bet.result.capitalize() if bet.result else 'Pending',
-                'payout': bet.points_earned if bet.result == 'won' else 0,
-                'league_id': bet.bet.league.id if bet.bet and bet.bet.league else None,
-                'event_id': bet.league_event.id if bet.league_event else None
-            }
-            bet_history.append(bet_entry)
-        
-        # Sort the combined history by date, most recent first
-        bet_history.sort(key=lambda x: x['date'], reverse=True)
-        
-        return Response(bet_history)
+        return _bet_history_page(request, request.user)
     
     except Exception as e:
         print(f"Error getting bet history: {str(e)}")
@@ -913,72 +807,12 @@ def get_other_user_bet_history(request, user_id):
         # Get the requested user
         viewed_user = User.objects.get(id=user_id)
         
-        # Check if the viewer is a friend of the user
-        is_friend = request.user.friends.filter(id=user_id).exists()
-        
-        # Check if viewing user is allowed to see betting history
-        show_betting_history = True
-        show_achievements = True
-        
-        # If the viewed user has set privacy settings, respect them
-        if hasattr(viewed_user, 'settings') and viewed_user.settings:
-            # Get user settings
-            user_settings = viewed_user.settings
-            show_betting_history = user_settings.get('showHistory', True)
-            show_achievements = user_settings.get('showAchievements', True)
-        
         # If user is not a friend and settings are private, return empty history
-        if not is_friend and (not show_betting_history or not show_achievements):
-            return Response([])
+        if not _bet_history_visible(request.user, viewed_user):
+            return Response({'results': [], 'next_cursor': None})
             
         try:
-            bet_history = []
-            
-            # Get all league events with user bets
-            league_events = LeagueEvent.objects.filter(market_data__has_key='user_bets').order_by('-commence_time')
-            
-            # Process bets from LeagueEvent market_data
-            for event in league_events:
-                if event.market_data and 'user_bets' in event.market_data:
-                    user_bets = [bet for bet in event.market_data.get('user_bets', []) 
-                                if bet.get('user_id') == viewed_user.id]
-                    
-                    for bet in user_bets:
-                        # Only add to history if the event is completed or the bet has a result
-                        if event.completed or 'result' in bet:
-                            bet_entry = {
-                                'id': f"{event.id}_{bet.get('user_id')}",
-                                'date': bet.get('bet_time', event.created_at),
-                                'event': event.event_name or f"{event.home_team} vs {event.away_team}",
-                                'pick': bet.get('outcomeKey', 'Unknown'),
-                                'amount': bet.get('amount', 0),
-                                'result': bet.get('result', 'Pending') if event.completed else 'Pending',
-                                'payout': bet.get('payout', 0) if event.completed and bet.get('result', '').lower() == 'won' else 0,
-                                'league_id': event.league.id if event.league else None,
-                                'event_id': event.id
-                            }
-                            bet_history.append(bet_entry)
-            
-            # Process UserBet model if it's used in the system
-            user_bet_objects = UserBet.objects.filter(user=viewed_user).order_by('-created_at')
-            for bet in user_bet_objects:
-                bet_entry = {
-                    'id': f"userbet_{bet.id}",
-                    'date': bet.created_at.strftime('%Y-%m-%d'),
-                    'event': bet.bet.name if bet.bet else 'Unknown Event',
-                    'pick': bet.choice,
-                    'amount': bet.points_wagered,
-                    'result': bet.result.capitalize() if bet.result else 'Pending',
-                    'payout': bet.points_earned if bet.result == 'won' else 0,
-                    'league_id': bet.bet.league.id if bet.bet and bet.bet.league else None,
-                    'event_id': bet.league_event.id if bet.league_event else None
-                }
-                bet_history.append(bet_entry)
-            
-            # Sort the combined history by date, most recent first
-            bet_history.sort(key=lambda x: x['date'], reverse=True)
-            
-            return Response(bet_history)
+            return _bet_history_page(request, viewed_user)
             
         except Exception as e:
             print(f"Error getting other user's bet history: {str(e)}")
@@ -987,4 +821,27 @@ def get_other_user_bet_history(request, user_id):
     except User.DoesNotExist:
         return Response({'error': 'User not found'}, status=404)
     except Exception as e:
-        return Response({'error': str(e)}, status=500) 
\ No newline at end of file
+        return Response({'error': str(e)}, status=500) 
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_user_bet_history(request):
+    """Download the current user's whole betting history as CSV or NDJSON"""
+    try:
+        return _bet_history_export(request, request.user)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_other_user_bet_history(request, user_id):
+    """Download another user's whole betting history, with privacy settings respected"""
+    try:
+        viewed_user = User.objects.get(id=user_id)
+        if not _bet_history_visible(request.user, viewed_user):
+            return Response({'error': "This user's betting history is private"}, status=403)
+        return _bet_history_export(request, viewed_user)
+    except User.DoesNotExist:
+        return Response({'error': 'User not found'}, status=404)
+    except Exception as e:
+        return Response({'error': str(e)}, status=500)
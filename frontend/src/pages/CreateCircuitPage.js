@@ -561,7 +561,8 @@ function CreateCircuitPage() {
     setLoadingMarket(true);
     setMarketError(null);
     
-    getAvailableSportEvents(formattedSport)
+    // Components are picked by winner, so only the moneyline is needed
+    getAvailableSportEvents(formattedSport, { markets: 'h2h' })
       .then(events => {
         console.log('Received events:', events);
         if (Array.isArray(events)) {
@@ -38,7 +38,7 @@ import AttachMoneyIcon from '@mui/icons-material/AttachMoney';
 import ScoreboardIcon from '@mui/icons-material/Scoreboard';
 import NavBar from '../components/NavBar';
 import CircularImageCropper from '../components/CircularImageCropper';
-import { getUserProfile, updateUserProfile, getUserBettingStats, getUserBetHistory } from '../services/api';
+import { getUserProfile, updateUserProfile, getUserBettingStats, getUserBetHistoryPage } from '../services/api';
 import {
   Chart as ChartJS,
   CategoryScale,
@@ -68,6 +68,9 @@ ChartJS.register(
   Filler
 );
 
+// Bets fetched per page of history
+const HISTORY_PAGE_SIZE = 50;
+
 function ProfilePage() {
   const navigate = useNavigate();
   const [user, setUser] = useState(JSON.parse(localStorage.getItem('user') || '{}'));
@@ -84,6 +87,8 @@ function ProfilePage() {
   });
   const [betHistory, setBetHistory] = useState([]);
   const [loadingHistory, setLoadingHistory] = useState(false);
+  const [historyCursor, setHistoryCursor] = useState(null);
+  const [loadingMoreHistory, setLoadingMoreHistory] = useState(false);
   const [showAllHistory, setShowAllHistory] = useState(false);
   const [selectedBet, setSelectedBet] = useState(null);
   const [betDetailsOpen, setBetDetailsOpen] = useState(false);
@@ -200,12 +205,14 @@ function ProfilePage() {
   const fetchBetHistory = useCallback(async () => {
     try {
       setLoadingHistory(true);
-      const history = await getUserBetHistory();
+      // Only the newest page; older bets are fetched when the user asks for them
+      const page = await getUserBetHistoryPage({ limit: HISTORY_PAGE_SIZE });
       // Log the first bet object to see its structure
-      if (history && history.length > 0) {
-        console.log("Sample bet object structure:", history[0]);
+      if (page.results.length > 0) {
+        console.log("Sample bet object structure:", page.results[0]);
       }
-      setBetHistory(history);
+      setBetHistory(page.results);
+      setHistoryCursor(page.next_cursor);
     } catch (error) {
       console.error('Failed to fetch bet history:', error);
       setError('Failed to load betting history. Please try again later.');
@@ -214,6 +221,22 @@ function ProfilePage() {
     }
   }, []);
 
+  // Fetch the next page of bet history and append it
+  const loadMoreBetHistory = async () => {
+    if (!historyCursor) return;
+    try {
+      setLoadingMoreHistory(true);
+      const page = await getUserBetHistoryPage({ limit: HISTORY_PAGE_SIZE, cursor: historyCursor });
+      setBetHistory(prev => [...prev, ...page.results]);
+      setHistoryCursor(page.next_cursor);
+    } catch (error) {
+      console.error('Failed to fetch more bet history:', error);
+      setError('Failed to load betting history. Please try again later.');
+    } finally {
+      setLoadingMoreHistory(false);
+    }
+  };
+
   // Make an explicit call to log the user's profile image
   useEffect(() => {
     if (user && user.profile_image_url) {
@@ -1848,6 +1871,24 @@ function ProfilePage() {
                         ))}
                       </TableBody>
                     </Table>
+                    {showAllHistory && historyCursor && (
+                      <Box sx={{ display: 'flex', justifyContent: 'center', pt: 2 }}>
+                        <Button
+                          variant="text"
+                          sx={{ 
+                            color: '#8B5CF6',
+                            textTransform: 'none',
+                            '&:hover': {
+                              backgroundColor: 'rgba(139, 92, 246, 0.1)'
+                            }
+                          }}
+                          onClick={loadMoreBetHistory}
+                          disabled={loadingMoreHistory}
+                        >
+                          {loadingMoreHistory ? <CircularProgress size={20} sx={{ color: '#8B5CF6' }} /> : 'Load More'}
+                        </Button>
+                      </Box>
+                    )}
                   </TableContainer>
                 )}
               </Box>
@@ -21,7 +21,7 @@ import LockIcon from '@mui/icons-material/Lock';
 import ScoreboardIcon from '@mui/icons-material/Scoreboard';
 import EmojiEventsIcon from '@mui/icons-material/EmojiEvents';
 import NavBar from '../components/NavBar';
-import { getOtherUserProfile, getOtherUserBettingStats, getOtherUserBetHistory } from '../services/api';
+import { getOtherUserProfile, getOtherUserBettingStats, getOtherUserBetHistoryPage } from '../services/api';
 
 function UserProfilePage() {
   const { userId } = useParams();
@@ -165,8 +165,9 @@ function UserProfilePage() {
     const fetchBetHistory = async () => {
       try {
         setLoadingHistory(true);
-        const history = await getOtherUserBetHistory(userId);
-        setBetHistory(history);
+        // Achievements are worked out from the newest page rather than the whole history
+        const page = await getOtherUserBetHistoryPage(userId, { limit: 200 });
+        setBetHistory(page.results);
       } catch (error) {
         console.error('Failed to fetch bet history:', error);
         setErrorHistory('Failed to load betting history');
@@ -242,13 +242,18 @@ export const getAvailableSports = async () => {
   return handleResponse(response);
 }; 
 
-export const getAvailableSportEvents = async (sport) => {
+export const getAvailableSportEvents = async (sport, options = {}) => {
   // If sport parameter is provided, fetch data for that sport using the new endpoint
   const endpoint = sport ? 
     `${API_URL}/api/leagues/bets/${sport}/` : 
     `${API_URL}/api/leagues/bets/`;
   
-  const response = await fetch(endpoint, {
+  // Optional markets / regions / bookmakers selection, e.g. { markets: 'h2h' }
+  const params = new URLSearchParams(
+    Object.entries(options).filter(([, value]) => value)
+  ).toString();
+  
+  const response = await fetch(params ? `${endpoint}?${params}` : endpoint, {
     headers: getHeaders(),
   });
   
@@ -378,6 +383,38 @@ export const placeBet = async (betData) => {
   }
 };
 
+/**
+ * Wait for a background job queued by the API (a 202 response) to finish
+ * @param {Object} accepted - The 202 response body, with job_id and status_url
+ * @param {number} intervalMs - How often to check the job's progress
+ * @returns {Promise<Object>} - The job's result once it has succeeded
+ */
+export const waitForJob = async (accepted, intervalMs = 1000) => {
+  for (;;) {
+    const response = await fetch(`${API_URL}${accepted.status_url}`, {
+      headers: getHeaders(),
+    });
+    const job = await handleResponse(response);
+    if (job.status === 'succeeded') {
+      return job.result;
+    }
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Background job failed');
+    }
+    await new Promise(resolve => setTimeout(resolve, intervalMs));
+  }
+};
+
+/**
+ * Read a response that may be a 202 for a background job, waiting for its result
+ * @param {Response} response - The fetch response
+ * @returns {Promise<Object>} - The response body, or the job's result
+ */
+const handleJobResponse = async (response) => {
+  const data = await handleResponse(response);
+  return response.status === 202 && data.job_id ? waitForJob(data) : data;
+};
+
 /**
  * Complete a league event and determine winners/losers
  * @param {number} eventId - The ID of the event to complete
@@ -394,7 +431,8 @@ export const completeLeagueEvent = async (eventId, winningOutcome) => {
       }),
     });
     
-    return handleResponse(response);
+    // Settlement runs in the background; resolve once payouts are done
+    return handleJobResponse(response);
   } catch (error) {
     console.error('Error completing league event:', error);
     throw error;
@@ -616,22 +654,26 @@ export const getUserBettingStats = async () => {
   return handleResponse(response);
 };
 
-export const getUserBetHistory = async () => {
-  const response = await fetch(`${API_URL}/api/profile/bet-history/`, {
+// One page of bet history: { results, next_cursor }. params may include
+// cursor, limit, league, result ('won', 'lost', 'push', 'pending'), from and to.
+export const getUserBetHistoryPage = async (params = {}) => {
+  const query = new URLSearchParams(params).toString();
+  const response = await fetch(`${API_URL}/api/profile/bet-history/${query ? `?${query}` : ''}`, {
     headers: getHeaders(),
   });
   return handleResponse(response);
 };
 
-export const getOtherUserBettingStats = async (userId) => {
-  const response = await fetch(`${API_URL}/api/profile/${userId}/betting-stats/`, {
+export const getOtherUserBetHistoryPage = async (userId, params = {}) => {
+  const query = new URLSearchParams(params).toString();
+  const response = await fetch(`${API_URL}/api/profile/${userId}/bet-history/${query ? `?${query}` : ''}`, {
     headers: getHeaders(),
   });
   return handleResponse(response);
 };
 
-export const getOtherUserBetHistory = async (userId) => {
-  const response = await fetch(`${API_URL}/api/profile/${userId}/bet-history/`, {
+export const getOtherUserBettingStats = async (userId) => {
+  const response = await fetch(`${API_URL}/api/profile/${userId}/betting-stats/`, {
     headers: getHeaders(),
   });
   return handleResponse(response);
@@ -704,7 +746,8 @@ export const completeCircuitWithTiebreaker = async (circuitId, tiebreakerEventId
       body: JSON.stringify(requestBody),
     });
     
-    const data = await handleResponse(response);
+    // The circuit is completed in a background job; wait for its result
+    const data = await handleJobResponse(response);
     
     // Log the response to help diagnose issues
     console.log(`[completeCircuitWithTiebreaker] Response received:`, data);
@@ -778,7 +821,8 @@ export const completeCircuitEvent = async (circuitId, eventId, winningOutcome, n
       body: JSON.stringify(requestData),
     });
     
-    const data = await handleResponse(response);
+    // Scoring runs in the background; the job's result is the updated circuit
+    const data = await handleJobResponse(response);
     
     // Check for participant_updates in the response
     if (data.participant_updates) {